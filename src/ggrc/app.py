@@ -156,9 +156,13 @@ def init_extra_listeners():
   from ggrc.automapper import register_automapping_listeners
   from ggrc.snapshotter.listeners import register_snapshot_listeners
   from ggrc.fulltext import listeners
+  from ggrc.query.result_cache import register_result_cache_listeners
+  from ggrc.models import relationship_cache
   register_automapping_listeners()
   register_snapshot_listeners()
   listeners.register_fulltext_listeners()
+  register_result_cache_listeners()
+  relationship_cache.register_relationship_cache_listeners()
 
 
 def _enable_debug_toolbar():
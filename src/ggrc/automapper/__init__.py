@@ -3,14 +3,17 @@
 
 """Automapper generator."""
 
+import collections
 from datetime import datetime
 from logging import getLogger
 
+import flask
 import sqlalchemy as sa
 from sqlalchemy.orm import load_only
 from sqlalchemy.sql.expression import literal_column
 
 from ggrc import db
+from ggrc import settings
 from ggrc.automapper import rules
 from ggrc import login
 from ggrc.models import all_models
@@ -19,8 +22,10 @@ from ggrc.models.automapping import Automapping
 from ggrc.models.relationship import Relationship, RelationshipsCache, Stub
 from ggrc.models.issue import Issue
 from ggrc.models import exceptions
-from ggrc.rbac.permissions import is_allowed_update
+from ggrc.models import relationship_cache
+from ggrc.rbac.permissions import filter_allowed_update
 from ggrc.models.cache import Cache
+from ggrc.services import signals
 from ggrc.utils import benchmark
 
 
@@ -75,29 +80,35 @@ class AutomapperGenerator(object):
       dst = Stub.from_destination(relationship)
       self._step(src, dst)
       self._step(dst, src)
-      while self.queue:
-        if len(self.auto_mappings) > self.COUNT_LIMIT:
-          break
-        src, dst = entry = self.queue.pop()
-
-        if {src.type, dst.type} != {"Audit", "Issue"}:
-          # Auditor doesn't have edit (+map) permission on the Audit,
-          # but the Auditor should be allowed to Raise an Issue.
-          # Since Issue-Assessment-Audit is the only rule that
-          # triggers Issue to Audit mapping, we should skip the
-          # permission check for it
-          if not (self._can_map_to(src, relationship) and
-                  self._can_map_to(dst, relationship)):
+      while self.queue and len(self.auto_mappings) <= self.COUNT_LIMIT:
+        # the queue is expanded level by level so that neighborhoods and
+        # permissions are fetched once for all entries of a level
+        level, self.queue = self.queue, set()
+        self._prefetch_related({stub for entry in level for stub in entry})
+        allowed = self._get_allowed_stubs(
+            {stub for entry in level
+             if not self._skip_permission_check(entry)
+             for stub in entry},
+            relationship,
+        )
+        for entry in level:
+          if len(self.auto_mappings) > self.COUNT_LIMIT:
+            break
+          if entry in self.processed:
+            continue
+          src, dst = entry
+          if not self._skip_permission_check(entry) and \
+             not (src in allowed and dst in allowed):
             continue
 
-        created = self._ensure_relationship(src, dst)
-        self.processed.add(entry)
-        if not created:
-          # If the edge already exists it means that auto mappings for it have
-          # already been processed and it is safe to cut here.
-          continue
-        self._step(src, dst)
-        self._step(dst, src)
+          created = self._ensure_relationship(src, dst)
+          self.processed.add(entry)
+          if not created:
+            # If the edge already exists it means that auto mappings for it
+            # have already been processed and it is safe to cut here.
+            continue
+          self._step(src, dst)
+          self._step(dst, src)
 
       if len(self.auto_mappings) <= self.COUNT_LIMIT:
         self._flush(relationship)
@@ -107,8 +118,18 @@ class AutomapperGenerator(object):
         }
 
   @staticmethod
-  def _can_map_to(obj, parent_relationship):
-    """True if the current user can edit obj in parent_relationship.context."""
+  def _skip_permission_check(entry):
+    """True if mapping of the entry is allowed without update permissions."""
+    # Auditor doesn't have edit (+map) permission on the Audit,
+    # but the Auditor should be allowed to Raise an Issue.
+    # Since Issue-Assessment-Audit is the only rule that
+    # triggers Issue to Audit mapping, we should skip the
+    # permission check for it
+    return {stub.type for stub in entry} == {"Audit", "Issue"}
+
+  @staticmethod
+  def _get_context_id(parent_relationship):
+    """Get id of the context in which automappings are checked."""
     context_id = None
     if parent_relationship.context:
       context_id = parent_relationship.context.id
@@ -118,7 +139,29 @@ class AutomapperGenerator(object):
                      parent_relationship, parent_relationship.context,
                      parent_relationship.context_id)
       context_id = parent_relationship.context_id
-    return is_allowed_update(obj.type, obj.id, context_id)
+    return context_id
+
+  def _get_allowed_stubs(self, stubs, parent_relationship):
+    """Get stubs the current user can edit in parent_relationship.context."""
+    context_id = self._get_context_id(parent_relationship)
+    ids_by_type = collections.defaultdict(set)
+    for stub in stubs:
+      ids_by_type[stub.type].add(stub.id)
+    return {
+        Stub(type_, id_)
+        for type_, ids in ids_by_type.iteritems()
+        for id_ in filter_allowed_update(type_, ids, context_id)
+    }
+
+  def _prefetch_related(self, stubs):
+    """Fetch neighborhoods of all uncached stubs with a single query."""
+    stubs = {stub for stub in stubs if stub not in self.related_cache.cache}
+    if not stubs:
+      return
+    self.related_cache.populate_cache(stubs)
+    for stub in stubs:
+      # objects without relationships are not added by populate_cache
+      self.related_cache.cache.setdefault(stub, set())
 
   def _flush(self, parent_relationship):
     """Manually INSERT generated automappings."""
@@ -146,23 +189,26 @@ class AutomapperGenerator(object):
       inserter = Relationship.__table__.insert().prefix_with("IGNORE")
       original = self.order(Stub.from_source(parent_relationship),
                             Stub.from_destination(parent_relationship))
-      db.session.execute(inserter.values([{
-          "id": None,
-          "modified_by_id": current_user_id,
-          "created_at": now,
-          "updated_at": now,
-          "source_id": src.id,
-          "source_type": src.type,
-          "destination_id": dst.id,
-          "destination_type": dst.type,
-          "context_id": None,
-          "status": None,
-          "parent_id": parent_relationship.id,
-          "automapping_id": automapping_id}
-          for src, dst in self.auto_mappings
-          if (src, dst) != original]))  # (src, dst) is sorted
-
-      self._set_audit_id_for_issues(automapping_id)
+      written = {stub for mapping in self.auto_mappings for stub in mapping}
+      with relationship_cache.declare_writes(written):
+        db.session.execute(inserter.values([{
+            "id": None,
+            "modified_by_id": current_user_id,
+            "created_at": now,
+            "updated_at": now,
+            "source_id": src.id,
+            "source_type": src.type,
+            "destination_id": dst.id,
+            "destination_type": dst.type,
+            "context_id": None,
+            "status": None,
+            "parent_id": parent_relationship.id,
+            "automapping_id": automapping_id}
+            for src, dst in self.auto_mappings
+            if (src, dst) != original]))  # (src, dst) is sorted
+
+        # joins relationships, but writes only to issues
+        self._set_audit_id_for_issues(automapping_id)
 
       cache = Cache.get_cache(create=True)
       if cache:
@@ -305,16 +351,99 @@ class AutomapperGenerator(object):
         )
 
 
+def generate_deferred_automappings(relationship_ids):
+  """Generate automappings of committed relationships.
+
+  Used by the background task of deferred automappings. Running it again for
+  the same relationships creates nothing, since existing edges are skipped.
+
+  Returns:
+    ids of relationships that exceeded the automapping limit.
+  """
+  automapper = AutomapperGenerator()
+  limit_exceeded = []
+  relationships = Relationship.query.filter(
+      Relationship.id.in_(relationship_ids),
+  ).order_by(Relationship.id)
+  for relationship in relationships:
+    automapper.generate_automappings(relationship)
+    if getattr(relationship, "_json_extras", {}).get(
+        "automapping_limit_exceeded"):
+      limit_exceeded.append(relationship.id)
+  automapper.propagate_acl()
+  return limit_exceeded
+
+
+def _get_deferred_automappings():
+  """Get ids of relationships with deferred automappings of this request.
+
+  Returns:
+    dict with lists of "flushed" ids that are not committed yet and
+    "committed" ids waiting for the background task.
+  """
+  if not hasattr(flask.g, "deferred_automappings"):
+    flask.g.deferred_automappings = {"flushed": [], "committed": []}
+  return flask.g.deferred_automappings
+
+
+def _defer_automappings(sender, objects=None, **kwargs):
+  """Mark POSTed relationships for automapping in a background task."""
+  # pylint: disable=unused-argument,protected-access
+  if not settings.AUTOMAPPING_ASYNC:
+    return
+  for obj in objects:
+    obj._automapping_deferred = True
+
+
+def _start_automappings(response):
+  """Start a single background task for all deferred automappings.
+
+  Relationships committed by any handler of the request are automapped,
+  those of rolled back transactions are skipped.
+  """
+  if not hasattr(flask.g, "deferred_automappings"):
+    return response
+  relationship_ids = flask.g.deferred_automappings["committed"]
+  del flask.g.deferred_automappings
+  if relationship_ids:
+    from ggrc import views
+    views.start_generate_automappings(relationship_ids)
+  return response
+
+
 def register_automapping_listeners():
   """Register event listeners for auto mapper."""
-  # pylint: disable=unused-variable,unused-argument
+  # pylint: disable=unused-variable,unused-argument,protected-access
+  from ggrc.app import app
 
   def automap(session, _):
     """Automap after_flush handler."""
     automapper = AutomapperGenerator()
     for obj in session.new:
       if isinstance(obj, Relationship):
+        if getattr(obj, "_automapping_deferred", False):
+          # automappings are generated after commit, see _start_automappings
+          obj._json_extras = {"automapping_pending": True}
+          _get_deferred_automappings()["flushed"].append(obj.id)
+          continue
         automapper.generate_automappings(obj)
     automapper.propagate_acl()
 
+  def commit_deferred(session):
+    """Keep ids of committed relationships with deferred automappings."""
+    if flask.has_app_context() and hasattr(flask.g, "deferred_automappings"):
+      deferred = flask.g.deferred_automappings
+      deferred["committed"].extend(deferred["flushed"])
+      deferred["flushed"] = []
+
+  def forget_deferred(session):
+    """Forget ids of rolled back relationships."""
+    if flask.has_app_context() and hasattr(flask.g, "deferred_automappings"):
+      flask.g.deferred_automappings["flushed"] = []
+
   sa.event.listen(sa.orm.session.Session, "after_flush", automap)
+  sa.event.listen(sa.orm.session.Session, "after_commit", commit_deferred)
+  sa.event.listen(sa.orm.session.Session, "after_rollback", forget_deferred)
+  signals.Restful.collection_posted.connect(_defer_automappings,
+                                            sender=Relationship)
+  app.after_request(_start_automappings)
@@ -521,7 +521,17 @@ def publish_representation(resource):
 
 
 class Builder(AttributeInfo):
-  """JSON Dictionary builder for ggrc.models.* objects and their mixins."""
+  """JSON Dictionary builder for ggrc.models.* objects and their mixins.
+
+  The way every published attribute is translated depends only on the class
+  of the object, so it is compiled once into a publish plan - a list of JSON
+  keys with functions publishing their values - that is reused for every
+  published instance.
+  """
+
+  def __init__(self, tgt_class):
+    super(Builder, self).__init__(tgt_class)
+    self._publish_plans = {}
 
   def generate_link_object_for(
           self, obj, inclusions, include, inclusion_filter):
@@ -615,109 +625,133 @@ class Builder(AttributeInfo):
                   target_type, getattr(o, target_name))
               for o in join_objects]
 
-  def publish_relationship(
-          self, obj, attr_name, class_attr, inclusions, include,
-          inclusion_filter):
-    uselist = class_attr.property.uselist
-    if uselist:
-      join_objects = getattr(obj, attr_name)
-      return self.publish_link_collection(
-          join_objects, inclusions, include, inclusion_filter)
-    elif include or class_attr.property.backref:
-      return self.publish_link(
+  def _compile_relationship_publisher(
+          self, attr_name, prop, inclusions, include):
+    """Get a function publishing a relationship attribute of an object."""
+    if prop.uselist:
+      return lambda obj, inclusion_filter: self.publish_link_collection(
+          getattr(obj, attr_name), inclusions, include, inclusion_filter)
+    if include or prop.backref:
+      return lambda obj, inclusion_filter: self.publish_link(
           obj, attr_name, inclusions, include, inclusion_filter)
-    else:
-      if class_attr.property.mapper.class_.__mapper__.polymorphic_on \
-              is not None:
-        target = getattr(obj, attr_name)
-        target_type = target.__class__.__name__
-      else:
-        target_type = class_attr.property.mapper.class_.__name__
-      target_name = list(class_attr.property.local_columns)[0].key
-      attr_value = getattr(obj, target_name)
-      if attr_value is not None:
-        return LazyStubRepresentation(target_type, attr_value)
-      else:
-        return None
 
-  def _process_custom_publish(self, obj, attr_name):
-    """Processes _custom_publish logic and returns value if any or None."""
-    if attr_name in getattr(obj.__class__, '_custom_publish', {}):
-      # The attribute has a custom publish logic.
-      return True, obj.__class__._custom_publish[attr_name](obj)
+    target_name = list(prop.local_columns)[0].key
+    target_type = prop.mapper.class_.__name__
+    polymorphic = prop.mapper.class_.__mapper__.polymorphic_on is not None
 
-    for base in obj.__class__.__bases__:
+    def publish_stub(obj, _):
+      """Publish a stub of the related object without loading it."""
+      attr_value = getattr(obj, target_name)
+      if attr_value is None:
+        return None
+      if polymorphic:
+        return LazyStubRepresentation(
+            getattr(obj, attr_name).__class__.__name__, attr_value)
+      return LazyStubRepresentation(target_type, attr_value)
+    return publish_stub
+
+  @staticmethod
+  def _get_custom_publish(model, attr_name):
+    """Get _custom_publish function of model or its mixins for attr_name."""
+    if attr_name in getattr(model, '_custom_publish', {}):
+      return model._custom_publish[attr_name]
+    for base in model.__bases__:
       # Inspect all mixins for custom publish logic.
       if attr_name in getattr(base, '_custom_publish', {}):
-        return True, base._custom_publish[attr_name](obj)
+        return base._custom_publish[attr_name]
+    return None
 
-    return False, None
+  def _compile_attr_publisher(self, cls, attr_name, inclusions, include):
+    """Get a function publishing attr_name of instances of cls.
 
-  def publish_attr(
-          self, obj, attr_name, inclusions, include, inclusion_filter):
-    """Publish obj attr."""
-    value_exists, value = self._process_custom_publish(obj, attr_name)
-    if value_exists:
-      return value
+    Everything that depends only on the class is resolved here, so the
+    returned function(obj, inclusion_filter) does only the per object work.
+    """
+    # pylint: disable=too-many-return-statements
+    custom_publish = self._get_custom_publish(cls, attr_name)
+    if custom_publish is not None:
+      return lambda obj, _: custom_publish(obj)
 
-    class_attr = getattr(obj.__class__, attr_name)
-    result = None
+    class_attr = getattr(cls, attr_name)
 
     if isinstance(class_attr, AssociationProxy):
       if getattr(class_attr, 'publish_raw', False):
-        published_attr = getattr(obj, attr_name)
-        if hasattr(published_attr, "copy"):
-          result = published_attr.copy()
-        else:
-          result = published_attr
-      else:
-        result = self.publish_association_proxy(
-            obj, attr_name, class_attr, inclusions, include, inclusion_filter)
-    elif (isinstance(class_attr, InstrumentedAttribute) and
-          isinstance(class_attr.property, RelationshipProperty)):
-      result = self.publish_relationship(
+        def publish_raw(obj, _):
+          published_attr = getattr(obj, attr_name)
+          if hasattr(published_attr, "copy"):
+            return published_attr.copy()
+          return published_attr
+        return publish_raw
+      return lambda obj, inclusion_filter: self.publish_association_proxy(
           obj, attr_name, class_attr, inclusions, include, inclusion_filter)
-    elif class_attr.__class__.__name__ == 'property':
-      if not inclusions or include:
-        if getattr(obj, '{0}_id'.format(attr_name)):
-          result = LazyStubRepresentation(
-              getattr(obj, '{0}_type'.format(attr_name)),
-              getattr(obj, '{0}_id'.format(attr_name)))
-      else:
-        result = self.publish_link(
+
+    if (isinstance(class_attr, InstrumentedAttribute) and
+            isinstance(class_attr.property, RelationshipProperty)):
+      return self._compile_relationship_publisher(
+          attr_name, class_attr.property, inclusions, include)
+
+    if class_attr.__class__.__name__ == 'property':
+      if inclusions and not include:
+        return lambda obj, inclusion_filter: self.publish_link(
             obj, attr_name, inclusions, include, inclusion_filter)
-    else:
-      result = getattr(obj, attr_name)
+      id_attr = '{0}_id'.format(attr_name)
+      type_attr = '{0}_type'.format(attr_name)
 
-    return result
+      def publish_stub(obj, _):
+        if getattr(obj, id_attr):
+          return LazyStubRepresentation(getattr(obj, type_attr),
+                                        getattr(obj, id_attr))
+        return None
+      return publish_stub
 
-  def _publish_attrs_for(
-          self, obj, attrs, json_obj, inclusions=None, inclusion_filter=None,
-          attribute_whitelist=None):
-    """Publis attrs for obj."""
-    if inclusions is None:
-      inclusions = []
-    for attr in attrs:
+    return lambda obj, _: getattr(obj, attr_name)
+
+  def publish_attr(
+          self, obj, attr_name, inclusions, include, inclusion_filter):
+    """Publish obj attr."""
+    publisher = self._compile_attr_publisher(
+        obj.__class__, attr_name, inclusions, include)
+    return publisher(obj, inclusion_filter)
+
+  def _compile_publish_plan(self, cls, inclusions, attribute_whitelist):
+    """Build a list of (JSON key, publisher) pairs for instances of cls."""
+    plan = []
+    for attr in self._publish_attrs:
       if hasattr(attr, '__call__'):
         attr_name = attr.attr_name
       else:
         attr_name = attr
+      if attribute_whitelist and attr_name not in attribute_whitelist:
+        continue
       local_inclusion = ()
       for inclusion in inclusions:
         if inclusion[0] == attr_name:
           local_inclusion = inclusion
           break
-      if attribute_whitelist and attr_name not in attribute_whitelist:
-        continue
-      attr = self.publish_attr(
-          obj, attr_name, local_inclusion[1:], len(local_inclusion) > 0,
-          inclusion_filter)
+      publisher = self._compile_attr_publisher(
+          cls, attr_name, local_inclusion[1:], len(local_inclusion) > 0)
       if attr_name == "filtered_access_control_list":
         # Instead of using filtered_access_control_list name in the frontend
         # use access_control_list instead.
-        json_obj["access_control_list"] = attr
+        plan.append(("access_control_list", publisher))
       else:
-        json_obj[attr_name] = attr
+        plan.append((attr_name, publisher))
+    return plan
+
+  def _get_publish_plan(self, cls, extra_inclusions, attribute_whitelist):
+    """Get a compiled publish plan, building it on the first use.
+
+    Plans are cached per class, inclusions and attribute whitelist.
+    """
+    key = (cls, frozenset(extra_inclusions),
+           frozenset(attribute_whitelist or ()))
+    plan = self._publish_plans.get(key)
+    if plan is None:
+      inclusions = tuple((attr,) for attr in self._include_links)
+      inclusions = tuple(set(inclusions).union(set(extra_inclusions)))
+      plan = self._compile_publish_plan(cls, inclusions, attribute_whitelist)
+      self._publish_plans[key] = plan
+    return plan
 
   def publish_attrs(self, obj, json_obj, extra_inclusions, inclusion_filter,
                     attribute_whitelist):
@@ -736,11 +770,10 @@ class Builder(AttributeInfo):
       [('directives'),('cycles')]
       [('directives', ('audit_frequency','organization')),('cycles')]
     """
-    inclusions = tuple((attr,) for attr in self._include_links)
-    inclusions = tuple(set(inclusions).union(set(extra_inclusions)))
-    return self._publish_attrs_for(
-        obj, self._publish_attrs, json_obj, inclusions, inclusion_filter,
-        attribute_whitelist)
+    plan = self._get_publish_plan(obj.__class__, extra_inclusions,
+                                  attribute_whitelist)
+    for json_key, publisher in plan:
+      json_obj[json_key] = publisher(obj, inclusion_filter)
 
   @classmethod
   def do_update_attrs(cls, obj, json_obj, attrs):
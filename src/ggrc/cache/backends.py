@@ -0,0 +1,342 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Registry of cache clients used by MemCache and other memcache users.
+
+Every client implements the subset of the App Engine memcache.Client API
+used in GGRC, including its return value conventions, so that callers don't
+depend on where the data is stored. Available backends:
+
+  appengine - App Engine memcache service;
+  memcached - memcached servers listed in MEMCACHED_SERVERS, requires the
+              python-memcached package;
+  local - bounded in-process cache, suitable for single process deployments
+          and development.
+
+If CACHE_LOCAL_TIER_SIZE is positive, collection and permission entries are
+also kept in a bounded in-process tier in front of the configured backend for
+at most CACHE_LOCAL_TIER_TTL seconds.
+"""
+
+from __future__ import absolute_import
+
+import cPickle
+import threading
+
+import memcache
+
+from ggrc import settings
+from ggrc.utils import structures
+
+
+DELETE_NETWORK_FAILURE = 0
+DELETE_ITEM_MISSING = 1
+DELETE_SUCCESSFUL = 2
+
+# Keys of entries that are kept in the in-process tier. Status entries and
+# counters are always read from the shared backend.
+LOCAL_TIER_PREFIXES = ("collection:", "permissions:")
+
+_factories = {}
+_client = None
+_client_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+  """Register a function creating a cache client for a backend name."""
+  _factories[name] = factory
+
+
+def get_client():
+  """Get the process wide cache client for the configured backend."""
+  global _client  # pylint: disable=global-statement
+  with _client_lock:
+    if _client is None:
+      backend = settings.CACHE_BACKEND
+      if backend not in _factories:
+        raise ValueError("Unknown cache backend: {}".format(backend))
+      _client = _factories[backend]()
+      if settings.CACHE_LOCAL_TIER_SIZE > 0:
+        _client = TieredClient(
+            LocalClient(settings.CACHE_LOCAL_TIER_SIZE,
+                        settings.CACHE_LOCAL_TIER_TTL),
+            _client,
+        )
+    return _client
+
+
+def reset_client():
+  """Drop the current client, the next get_client call creates a new one."""
+  global _client  # pylint: disable=global-statement
+  with _client_lock:
+    _client = None
+
+
+class LocalClient(object):
+  """Memcache client API implemented on top of an in-process LRU cache.
+
+  Values are stored pickled, so callers can't change cached values through
+  returned objects, the same way as with a network cache. Compare and set
+  operations only require the entry to exist.
+  """
+  # pylint: disable=unused-argument
+
+  def __init__(self, max_size, ttl=None):
+    self.cache = structures.LRUCache(max_size, ttl=ttl)
+    self._lock = threading.RLock()
+
+  def _set(self, key, value, time):
+    self.cache.set(key, cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL),
+                   ttl=time or None)
+
+  def get(self, key, namespace=None, for_cas=False):
+    value = self.cache.get(key)
+    return None if value is None else cPickle.loads(value)
+
+  def gets(self, key, namespace=None):
+    return self.get(key, namespace=namespace)
+
+  def get_multi(self, keys, key_prefix='', namespace=None, for_cas=False):
+    result = {}
+    for key in keys:
+      value = self.get(key_prefix + key)
+      if value is not None:
+        result[key] = value
+    return result
+
+  def set(self, key, value, time=0, namespace=None):
+    self._set(key, value, time)
+    return True
+
+  def set_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    for key, value in mapping.iteritems():
+      self.set(key_prefix + key, value, time)
+    return []
+
+  def add(self, key, value, time=0, namespace=None):
+    with self._lock:
+      if key in self.cache:
+        return False
+      self._set(key, value, time)
+      return True
+
+  def add_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    return [key for key, value in mapping.iteritems()
+            if not self.add(key_prefix + key, value, time)]
+
+  def cas(self, key, value, time=0, namespace=None):
+    with self._lock:
+      if key not in self.cache:
+        return False
+      self._set(key, value, time)
+      return True
+
+  def cas_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    return [key for key, value in mapping.iteritems()
+            if not self.cas(key_prefix + key, value, time)]
+
+  def delete(self, key, seconds=0, namespace=None):
+    if self.cache.delete(key):
+      return DELETE_SUCCESSFUL
+    return DELETE_ITEM_MISSING
+
+  def delete_multi(self, keys, seconds=0, key_prefix='', namespace=None):
+    for key in keys:
+      self.delete(key_prefix + key)
+    return True
+
+  def offset_multi(self, mapping, key_prefix='', namespace=None,
+                   initial_value=None):
+    """Increment integer values, missing ones start from initial_value."""
+    result = {}
+    with self._lock:
+      for key, delta in mapping.iteritems():
+        value = self.get(key_prefix + key)
+        if value is None:
+          value = initial_value
+        if value is None:
+          result[key] = None
+          continue
+        result[key] = max(value + delta, 0)
+        self._set(key_prefix + key, result[key], 0)
+    return result
+
+  def flush_all(self):
+    self.cache.clear()
+    return True
+
+
+class MemcachedClient(object):
+  """Memcache client API on top of python-memcached.
+
+  Compare and set stores a value only if an entry exists already.
+  """
+  # pylint: disable=unused-argument
+
+  def __init__(self, servers):
+    self.client = memcache.Client(servers)
+
+  def get(self, key, namespace=None, for_cas=False):
+    return self.client.get(key)
+
+  def gets(self, key, namespace=None):
+    return self.get(key, namespace=namespace)
+
+  def get_multi(self, keys, key_prefix='', namespace=None, for_cas=False):
+    return self.client.get_multi(list(keys), key_prefix=key_prefix)
+
+  def set(self, key, value, time=0, namespace=None):
+    return bool(self.client.set(key, value, time))
+
+  def set_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    return self.client.set_multi(mapping, time, key_prefix=key_prefix)
+
+  def add(self, key, value, time=0, namespace=None):
+    return bool(self.client.add(key, value, time))
+
+  def add_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    return [key for key, value in mapping.iteritems()
+            if not self.add(key_prefix + key, value, time)]
+
+  def cas(self, key, value, time=0, namespace=None):
+    return bool(self.client.replace(key, value, time))
+
+  def cas_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    return [key for key, value in mapping.iteritems()
+            if not self.cas(key_prefix + key, value, time)]
+
+  def delete(self, key, seconds=0, namespace=None):
+    if self.client.delete(key, seconds):
+      return DELETE_SUCCESSFUL
+    return DELETE_NETWORK_FAILURE
+
+  def delete_multi(self, keys, seconds=0, key_prefix='', namespace=None):
+    return bool(self.client.delete_multi(list(keys), seconds,
+                                         key_prefix=key_prefix))
+
+  def offset_multi(self, mapping, key_prefix='', namespace=None,
+                   initial_value=None):
+    """Increment integer values, missing ones start from initial_value."""
+    result = {}
+    for key, delta in mapping.iteritems():
+      full_key = key_prefix + key
+      value = self.client.incr(full_key, delta)
+      if value is None and initial_value is not None:
+        if self.client.add(full_key, str(initial_value + delta)):
+          value = initial_value + delta
+        else:
+          # the entry was added concurrently
+          value = self.client.incr(full_key, delta)
+      result[key] = value
+    return result
+
+  def flush_all(self):
+    self.client.flush_all()
+    return True
+
+
+class TieredClient(object):
+  """Client keeping recently used entries in front of a shared backend.
+
+  Only entries with LOCAL_TIER_PREFIXES keys are kept in the local tier.
+  Writes go to the backend and drop local copies; entries changed by other
+  processes can be served from the local tier until they expire there.
+  """
+
+  def __init__(self, local, remote):
+    self.local = local
+    self.remote = remote
+
+  @staticmethod
+  def _is_local(key):
+    return key.startswith(LOCAL_TIER_PREFIXES)
+
+  def _forget(self, keys):
+    for key in keys:
+      if self._is_local(key):
+        self.local.delete(key)
+
+  def get(self, key, namespace=None, for_cas=False):
+    return self.get_multi([key], namespace=namespace, for_cas=for_cas).get(key)
+
+  def gets(self, key, namespace=None):
+    return self.get(key, namespace, for_cas=True)
+
+  def get_multi(self, keys, key_prefix='', namespace=None, for_cas=False):
+    """Get entries from the local tier, and the missing ones from backend."""
+    keys = list(keys)
+    result = {}
+    if not for_cas:
+      result = self.local.get_multi(
+          [key for key in keys if self._is_local(key_prefix + key)],
+          key_prefix=key_prefix)
+    missing = [key for key in keys if key not in result]
+    if missing:
+      fetched = self.remote.get_multi(missing, key_prefix=key_prefix,
+                                      namespace=namespace, for_cas=for_cas)
+      self.local.set_multi(
+          {key: value for key, value in fetched.iteritems()
+           if self._is_local(key_prefix + key)},
+          key_prefix=key_prefix)
+      result.update(fetched)
+    return result
+
+  def set(self, key, value, time=0, namespace=None):
+    self._forget([key])
+    return self.remote.set(key, value, time, namespace=namespace)
+
+  def set_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    self._forget(key_prefix + key for key in mapping)
+    return self.remote.set_multi(mapping, time, key_prefix=key_prefix,
+                                 namespace=namespace)
+
+  def add(self, key, value, time=0, namespace=None):
+    self._forget([key])
+    return self.remote.add(key, value, time, namespace=namespace)
+
+  def add_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    self._forget(key_prefix + key for key in mapping)
+    return self.remote.add_multi(mapping, time, key_prefix=key_prefix,
+                                 namespace=namespace)
+
+  def cas(self, key, value, time=0, namespace=None):
+    self._forget([key])
+    return self.remote.cas(key, value, time, namespace=namespace)
+
+  def cas_multi(self, mapping, time=0, key_prefix='', namespace=None):
+    self._forget(key_prefix + key for key in mapping)
+    return self.remote.cas_multi(mapping, time, key_prefix=key_prefix,
+                                 namespace=namespace)
+
+  def delete(self, key, seconds=0, namespace=None):
+    self._forget([key])
+    return self.remote.delete(key, seconds, namespace=namespace)
+
+  def delete_multi(self, keys, seconds=0, key_prefix='', namespace=None):
+    keys = list(keys)
+    self._forget(key_prefix + key for key in keys)
+    return self.remote.delete_multi(keys, seconds, key_prefix=key_prefix,
+                                    namespace=namespace)
+
+  def offset_multi(self, mapping, key_prefix='', namespace=None,
+                   initial_value=None):
+    self._forget(key_prefix + key for key in mapping)
+    return self.remote.offset_multi(mapping, key_prefix=key_prefix,
+                                    namespace=namespace,
+                                    initial_value=initial_value)
+
+  def flush_all(self):
+    self.local.flush_all()
+    return self.remote.flush_all()
+
+
+def _get_appengine_client():
+  from google.appengine.api import memcache as appengine_memcache
+  return appengine_memcache.Client()
+
+
+register_backend("appengine", _get_appengine_client)
+register_backend("memcached",
+                 lambda: MemcachedClient(settings.MEMCACHED_SERVERS))
+register_backend("local",
+                 lambda: LocalClient(settings.CACHE_LOCAL_SIZE))
@@ -2,14 +2,17 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
 
-from google.appengine.api import memcache
+from ggrc import settings
+from ggrc.cache import backends
+from ggrc.utils import list_chunks
 from cache import Cache
 from cache import all_cache_entries
 from collections import OrderedDict
 from copy import deepcopy
 
 """
-    Memcache implements the remote AppEngine Memcache mechanism
+    Memcache implements the remote Memcache mechanism on top of the client of
+    the configured cache backend, see ggrc.cache.backends
 
 """
 class MemCache(Cache):
@@ -20,7 +23,7 @@ class MemCache(Cache):
     for cache_entry in all_cache_entries():
       if cache_entry.cache_type is self.name:
         self.supported_resources[cache_entry.model_plural]=cache_entry.class_name
-        self.memcache_client = memcache.Client()
+        self.memcache_client = backends.get_client()
 
   def get_name(self):
     return self.name
@@ -41,8 +44,6 @@ class MemCache(Cache):
 
     if not self.is_caching_supported(category, resource):
       return None
-    # TODO(dan): use memcache.Client.get_multi() instead of gets()
-    #
     data = OrderedDict()
     cache_key = self.get_key(category, resource)
     if cache_key is None:
@@ -53,8 +54,10 @@ class MemCache(Cache):
     else:
       if ids is None:
         return None
-    for id in ids:
-      attrvalues= self.memcache_client.gets(cache_key + ":" + str(id))
+    keys = [cache_key + ":" + str(id) for id in ids]
+    cached = self.get_multi(keys)
+    for id, key in zip(ids, keys):
+      attrvalues = cached.get(key)
       if attrvalues is not None:
         if attrs is None:
           data[id] = attrvalues
@@ -84,31 +87,26 @@ class MemCache(Cache):
     """
     if not self.is_caching_supported(category, resource):
       return None
-    entries = {}
     cache_key = self.get_key(category, resource)
     if cache_key is None:
       return None
-    # TODO(dan): use memcache.Client.add_multi() instead of add()
-    for key in data.keys():
-      id = cache_key + ":" + str(key)
-      cache_data = self.memcache_client.gets(id)
-      if cache_data is None:
-        if self.memcache_client.add(id, data.get(key), expiration_time) is False:
-          # We stop processing any further
-          # TODO(ggrcdev): Should we throw exceptions and/or log critical events
-          return None
-        else:
-          entries[key] = data
-      else:
+    ids = {cache_key + ":" + str(key): key for key in data.keys()}
+    # Existing entries are fetched for compare and set
+    cached = self.get_multi(ids.keys())
+    new_entries = {}
+    existing_entries = {}
+    for id, key in ids.items():
+      if id in cached:
         # This could occur on import scenarios
-        #
-        if self.memcache_client.cas(id, data.get(key), expiration_time) is False:
-          # We stop processing any further
-          # TODO(ggrcdev): Should we throw exceptions and/or log critical events
-          return None
-        else:
-          entries[key] = data
-    return entries
+        existing_entries[id] = data.get(key)
+      else:
+        new_entries[id] = data.get(key)
+    if (self.add_multi(new_entries, expiration_time) or
+            self.update_multi(existing_entries, expiration_time)):
+      # Some entries were not stored
+      # TODO(ggrcdev): Should we throw exceptions and/or log critical events
+      return None
+    return {key: data for key in data.keys()}
 
   def update(self, category, resource, data, expiration_time):
     """ Update items from mem cache for specified data
@@ -193,7 +191,11 @@ class MemCache(Cache):
     """
     # TODO(dan): import scenarios, add will return non-empty list, we should invoke update_multi for those items
     #
-    return self.memcache_client.add_multi(data, expiration_time)
+    not_added = []
+    for keys in list_chunks(data.keys(), settings.MEMCACHE_BATCH_SIZE):
+      not_added.extend(self.memcache_client.add_multi(
+          {key: data[key] for key in keys}, expiration_time))
+    return not_added
 
   def get_multi(self, data):
     """ Get multiple entries from memcache
@@ -207,7 +209,10 @@ class MemCache(Cache):
     Returns:
       memcache client API get_multi
     """
-    return self.memcache_client.get_multi(data, '', None, True)
+    result = {}
+    for keys in list_chunks(list(data), settings.MEMCACHE_BATCH_SIZE):
+      result.update(self.memcache_client.get_multi(keys, '', None, True))
+    return result
 
   def update_multi(self, data, expiration_time=0):
     """ update multiple entries to memcache
@@ -221,7 +226,11 @@ class MemCache(Cache):
     Returns:
       memcache client API cas_multi (compare and set)
     """
-    return self.memcache_client.cas_multi(data, expiration_time)
+    not_updated = []
+    for keys in list_chunks(data.keys(), settings.MEMCACHE_BATCH_SIZE):
+      not_updated.extend(self.memcache_client.cas_multi(
+          {key: data[key] for key in keys}, expiration_time))
+    return not_updated
 
   def remove_multi(self, data, lockadd_seconds):
     """ delete multiple entries to memcache
@@ -234,7 +243,10 @@ class MemCache(Cache):
     Returns:
       memcache client API delete_multi
     """
-    return self.memcache_client.delete_multi(data, lockadd_seconds)
+    deleted = True
+    for keys in list_chunks(list(data), settings.MEMCACHE_BATCH_SIZE):
+      deleted &= self.memcache_client.delete_multi(keys, lockadd_seconds)
+    return deleted
 
   def clean(self):
     """ flush everything from memcache """
@@ -3,16 +3,21 @@
 
 """Base objects for csv file converters."""
 
+import itertools
 from collections import defaultdict
 
 from ggrc import settings
 from ggrc.utils import benchmark
 from ggrc.utils import structures
 from ggrc.cache.memcache import MemCache
+from ggrc.converters import dry_run
 from ggrc.converters import get_exportables
+from ggrc.converters import prefetch
 from ggrc.converters.base_block import BlockConverter
 from ggrc.converters.snapshot_block import SnapshotBlockConverter
 from ggrc.converters.import_helper import extract_relevant_data
+from ggrc.converters.import_helper import generate_csv_chunks
+from ggrc.converters.import_helper import get_object_column_definitions
 from ggrc.converters.import_helper import split_array
 from ggrc.fulltext import get_indexer
 
@@ -60,10 +65,16 @@ class Converter(object):
     self.ids_by_type = kwargs.get("ids_by_type", [])
     self.block_converters = []
     self.new_objects = defaultdict(structures.CaseInsensitiveDict)
-    self.shared_state = {}
+    self.shared_state = kwargs.get("shared_state", {})
+    self.prefetched_objects = {}
     self.response_data = []
     self.exportable = get_exportables()
     self.indexer = get_indexer()
+    self.progress_callback = kwargs.get("progress_callback")
+    # number of rows of a block committed together, 0 commits whole blocks
+    self.commit_size = kwargs.get("commit_size", 0)
+    # number of processes validating blocks of a dry run, see dry_run module
+    self.dry_run_workers = kwargs.get("dry_run_workers", 1)
 
   def to_array(self):
     with benchmark("Create block converters"):
@@ -76,18 +87,37 @@ class Converter(object):
 
     Generate 2d array where each cell represents a cell in a csv file
     """
-    csv_data = []
+    return list(self.generate_block_rows())
+
+  def generate_block_rows(self):
+    """Generate csv rows of all blocks separated by empty lines."""
     for block_converter in self.block_converters:
-      csv_header, csv_body = block_converter.row_data_to_array()
-      # multi block csv must have first column empty
       two_empty_lines = [[], []]
-      block_data = csv_header + csv_body + two_empty_lines
-      for line in block_data:
-        line.insert(0, "")
-      block_data[0][0] = "Object type"
-      block_data[1][0] = block_converter.name
-      csv_data.extend(block_data)
-    return csv_data
+      block_data = itertools.chain(block_converter.generate_csv_header(),
+                                   block_converter.generate_csv_body(),
+                                   two_empty_lines)
+      # multi block csv must have first column empty
+      first_column = [u"Object type", block_converter.name]
+      for index, line in enumerate(block_data):
+        yield [first_column[index] if index < 2 else u""] + line
+
+  def get_csv_width(self):
+    """Get the number of columns of the exported csv file."""
+    widths = [len(line) + 1
+              for block_converter in self.block_converters
+              for line in block_converter.generate_csv_header()]
+    return max([1] + widths)
+
+  def to_csv_chunks(self):
+    """Generate exported csv file in parts.
+
+    Objects are loaded and converted while the parts are consumed, so the
+    whole file is never held in memory.
+    """
+    with benchmark("Create block converters"):
+      self.block_converters_from_ids()
+    return generate_csv_chunks(self.generate_block_rows(),
+                               self.get_csv_width())
 
   def _start_compute_attributes_job(self):
     from ggrc import views
@@ -98,7 +128,18 @@ class Converter(object):
       views.start_compute_attributes(revision_ids)
 
   def import_csv(self):
+    """Import csv data or only validate it in dry run mode.
+
+    Objects referenced by cells of all blocks are prefetched, see
+    ggrc.converters.prefetch. Blocks of dry runs may be validated in parallel,
+    see ggrc.converters.dry_run.
+    """
     self.block_converters_from_csv()
+    prefetch.prefetch(self)
+    if dry_run.can_validate_in_parallel(self):
+      self.response_data = dry_run.validate_blocks(self)
+      self.drop_cache()
+      return
     self.row_converters_from_csv()
     self.handle_priority_columns()
     self.import_objects()
@@ -169,10 +210,27 @@ class Converter(object):
       converter.import_secondary_objects()
 
   def get_info(self):
-    for converter in self.block_converters:
-      self.response_data.append(converter.get_info())
+    if not self.response_data:
+      for converter in self.block_converters:
+        self.response_data.append(converter.get_info())
     return self.response_data
 
+  def get_column_definitions(self, object_class):
+    """Get column definitions of a class, shared by all blocks."""
+    key = ("column_definitions", object_class)
+    if key not in self.shared_state:
+      self.shared_state[key] = get_object_column_definitions(object_class)
+    return self.shared_state[key]
+
+  def report_progress(self):
+    """Pass info of all blocks to the progress callback, if it is set.
+
+    This is called only after the imported data is committed.
+    """
+    if self.progress_callback:
+      self.progress_callback([converter.get_info()
+                              for converter in self.block_converters])
+
   def get_object_names(self):
     return [c.name for c in self.block_converters]
 
@@ -20,15 +20,16 @@ from sqlalchemy.orm.exc import UnmappedInstanceError
 
 from ggrc import db
 from ggrc import models
+from ggrc import settings
 from ggrc.rbac import permissions
 from ggrc.utils import benchmark
+from ggrc.utils import list_chunks
 from ggrc.utils import structures
 from ggrc.converters import errors
 from ggrc.converters import get_shared_unique_rules
 from ggrc.converters import pre_commit_checks
 from ggrc.converters.base_row import RowConverter
 from ggrc.converters.import_helper import get_column_order
-from ggrc.converters.import_helper import get_object_column_definitions
 from ggrc.services.common import get_modified_objects
 from ggrc.services.common import update_snapshot_index
 from ggrc.services.common import update_memcache_after_commit
@@ -124,17 +125,19 @@ class BlockConverter(object):
     self.class_name = options.get("class_name", "")
     # TODO: remove 'if' statement. Init should initialize only.
     if self.object_class:
-      self.object_headers = get_object_column_definitions(self.object_class)
+      self.object_headers = converter.get_column_definitions(
+          self.object_class)
       all_header_names = [unicode(key)
                           for key in self.get_header_names().keys()]
-      raw_headers = options.get("raw_headers", all_header_names)
-      self.check_for_duplicate_columns(raw_headers)
-      self.headers = self.clean_headers(raw_headers)
+      self.raw_headers = options.get("raw_headers", all_header_names)
+      self.check_for_duplicate_columns(self.raw_headers)
+      self.headers = self.clean_headers(self.raw_headers)
       self.unique_counts = self.get_unique_counts_dict(self.object_class)
       self.table_singular = self.object_class._inflector.table_singular
       self.name = self.object_class._inflector.human_singular.title()
       self.organize_fields(options.get("fields", []))
     else:
+      self.raw_headers = options.get("raw_headers", [])
       self.name = ""
 
   def check_block_restrictions(self):
@@ -424,28 +427,36 @@ class BlockConverter(object):
       self.row_converters.append(row)
 
   def row_converters_from_ids(self):
-    """ Generate a row converter object for every csv row """
+    """ Generate a row converter object for every csv row
+
+    Objects are loaded in chunks of EXPORT_CHUNK_SIZE ids, so that only the
+    objects of a single chunk are kept in memory while rows are generated.
+    """
     if self.ignore or not self.object_ids:
       return
     self.row_converters = []
-    objects = self.object_class.eager_query().filter(
-        self.object_class.id.in_(self.object_ids))
-    for i, obj in enumerate(objects):
-      row = RowConverter(self, self.object_class, obj=obj,
-                         headers=self.headers, index=i)
-      yield row
+    index = 0
+    for ids in list_chunks(self.object_ids, settings.EXPORT_CHUNK_SIZE):
+      objects = self.object_class.eager_query().filter(
+          self.object_class.id.in_(ids))
+      for obj in objects:
+        row = RowConverter(self, self.object_class, obj=obj,
+                           headers=self.headers, index=index)
+        index += 1
+        yield row
+
+  def generate_csv_body(self):
+    """Generate csv rows of exported objects."""
+    for row_converter in self.row_converters_from_ids():
+      row_converter.handle_obj_row_data()
+      yield row_converter.to_array(self.fields)
 
   def row_data_to_array(self):
     """Get row data from all row converters while exporting.
     """
     if self.ignore:
       return
-    csv_body = []
-    csv_header = self.generate_csv_header()
-    for row_converter in self.row_converters_from_ids():
-      row_converter.handle_obj_row_data()
-      csv_body.append(row_converter.to_array(self.fields))
-    return csv_header, csv_body
+    return self.generate_csv_header(), list(self.generate_csv_body())
 
   def handle_row_data(self, field_list=None):
     """Handle row data for all row converters on import.
@@ -510,71 +521,171 @@ class BlockConverter(object):
     return info
 
   def import_secondary_objects(self):
-    """Import secondary objects procedure."""
-    for row_converter in self.row_converters:
-      row_converter.setup_secondary_objects()
+    """Import secondary objects procedure.
 
-    for row_converter in self.row_converters:
-      self._check_secondary_object(row_converter)
+    Secondary objects of a batch of rows are set up only right before the
+    batch is inserted, so that earlier commits don't include them.
+    """
+    if self.converter.dry_run:
+      self._secondary_objects_prepare(self.row_converters)
+      return
 
-    if not self.converter.dry_run:
-      for row_converter in self.row_converters:
-        try:
-          row_converter.insert_secondary_objects()
-        except exc.SQLAlchemyError as err:
-          db.session.rollback()
-          logger.exception("Import failed with: %s", err.message)
-          row_converter.add_error(errors.UNKNOWN_ERROR)
+    for row_converters in self._commit_chunks():
+      self._insert_in_batches(
+          row_converters,
+          self._secondary_objects_prepare,
+          lambda row_converter: row_converter.insert_secondary_objects())
       self.save_import()
+      self.converter.report_progress()
+      if self.ignore:
+        break
 
-  def _import_objects_prepare(self):
-    """Setup all objects and do pre-commit checks for them."""
-    for row_converter in self.row_converters:
+  def _secondary_objects_prepare(self, row_converters):
+    """Setup secondary objects of rows and do pre-commit checks for them."""
+    for row_converter in row_converters:
+      row_converter.setup_secondary_objects()
+
+    for row_converter in row_converters:
+      self._check_secondary_object(row_converter)
+
+  def _import_objects_prepare(self, row_converters):
+    """Setup objects of rows and do pre-commit checks for them."""
+    for row_converter in row_converters:
       row_converter.setup_object()
 
-    for row_converter in self.row_converters:
+    for row_converter in row_converters:
       self._check_object(row_converter)
 
-    self.clean_session_from_ignored_objs()
+    self.clean_session_from_ignored_objs(row_converters)
+
+  def _prepare_and_signal(self, row_converters):
+    """Setup objects of rows, check them and send pre-commit signals."""
+    self._import_objects_prepare(row_converters)
+    for row_converter in row_converters:
+      row_converter.send_pre_commit_signals()
 
   def import_objects(self):
     """Add all objects to the database.
 
     This function flushes all objects to the database if the dry_run flag is
-    not set and all signals for the imported objects get sent.
+    not set and all signals for the imported objects get sent. Rows are
+    committed in chunks of commit_size rows of the converter, and objects of
+    a batch are set up only right before the batch is inserted. Pre-commit
+    signals of every chunk thus see the changes made by the import.
     """
     if self.ignore:
       return
 
-    self._import_objects_prepare()
-
-    if not self.converter.dry_run:
-      new_objects = []
-      for row_converter in self.row_converters:
-        row_converter.send_pre_commit_signals()
-      for row_converter in self.row_converters:
-        try:
-          row_converter.insert_object()
-          db.session.flush()
-        except exc.SQLAlchemyError as err:
-          db.session.rollback()
-          logger.exception("Import failed with: %s", err.message)
-          row_converter.add_error(errors.UNKNOWN_ERROR)
+    if self.converter.dry_run:
+      self._import_objects_prepare(self.row_converters)
+      return
+
+    for row_converters in self._commit_chunks():
+      self._import_rows(row_converters)
+      if self.ignore:
+        break
+
+  def _commit_chunks(self):
+    """Split row converters into chunks that are committed together."""
+    chunk_size = self.converter.commit_size or len(self.row_converters)
+    return list_chunks(self.row_converters, max(chunk_size, 1))
+
+  def _import_rows(self, row_converters):
+    """Save objects of the rows, commit them and send all signals."""
+    new_objects = []
+    inserted = self._insert_in_batches(
+        row_converters,
+        self._prepare_and_signal,
+        lambda row_converter: row_converter.insert_object())
+    for row_converter in inserted:
+      if row_converter.is_new and not row_converter.ignore:
+        new_objects.append(row_converter.obj)
+    self.send_collection_post_signals(new_objects)
+    import_event = self.save_import()
+    for row_converter in row_converters:
+      row_converter.send_post_commit_signals(event=import_event)
+    self.converter.report_progress()
+
+  def _flush_rows(self, row_converters, prepare, insert):
+    """Set up and insert objects of rows and flush them in a savepoint.
+
+    If the savepoint is rolled back, messages and ignore flags the rows got
+    in it are dropped and the rows are reset, so they can be set up and
+    inserted again.
+
+    Returns:
+      True on success, False if the savepoint has been rolled back.
+    """
+    warnings_count = len(self.row_warnings)
+    errors_count = len(self.row_errors)
+    ignored = [row_converter.ignore for row_converter in row_converters]
+    savepoint = None
+    try:
+      savepoint = db.session.begin_nested()
+      prepare(row_converters)
+      for row_converter in row_converters:
+        insert(row_converter)
+      db.session.flush()
+    except exc.SQLAlchemyError as err:
+      if savepoint is None:
+        db.session.rollback()
+      else:
+        savepoint.rollback()
+      del self.row_warnings[warnings_count:]
+      del self.row_errors[errors_count:]
+      for row_converter, ignore in zip(row_converters, ignored):
+        row_converter.ignore = ignore
+        row_converter.reset_after_rollback()
+      if len(row_converters) > 1:
+        logger.info("Import of %s rows failed with: %s, retrying them one "
+                    "by one", len(row_converters), err.message)
+      else:
+        logger.exception("Import failed with: %s", err.message)
+      return False
+    savepoint.commit()
+    return True
+
+  def _insert_in_batches(self, row_converters, prepare, insert):
+    """Set up and insert objects of rows flushing them in batches.
+
+    Rows are set up and flushed together in batches of IMPORT_BATCH_SIZE
+    rows. If a batch fails, its rows are set up and flushed again one by one,
+    so that only the rows that can't be saved get the error. Pre-commit
+    signals of the retried rows are not sent again.
+
+    Args:
+      row_converters: list of row converters to insert;
+      prepare: function setting up and checking objects of a list of row
+               converters;
+      insert: function adding objects of a row converter to the session.
+
+    Returns:
+      list of row converters whose objects were flushed.
+    """
+    inserted = []
+    for batch in list_chunks(row_converters, settings.IMPORT_BATCH_SIZE):
+      if len(batch) > 1 and self._flush_rows(batch, prepare, insert):
+        inserted.extend(batch)
+        continue
+      for row_converter in batch:
+        if self._flush_rows([row_converter], prepare, insert):
+          inserted.append(row_converter)
         else:
-          if row_converter.is_new and not row_converter.ignore:
-            new_objects.append(row_converter.obj)
-      self.send_collection_post_signals(new_objects)
-      import_event = self.save_import()
-      for row_converter in self.row_converters:
-        row_converter.send_post_commit_signals(event=import_event)
-
-  def clean_session_from_ignored_objs(self):
+          row_converter.add_error(errors.UNKNOWN_ERROR)
+    return inserted
+
+  def clean_session_from_ignored_objs(self, row_converters=None):
     """Clean DB session from ignored objects.
 
     This function expunges objects from 'db.session' which are in rows that
     marked as 'ignored' before commit.
+
+    Args:
+      row_converters: rows to check, all rows of the block by default.
     """
-    for row_converter in self.row_converters:
+    if row_converters is None:
+      row_converters = self.row_converters
+    for row_converter in row_converters:
       obj = row_converter.obj
       try:
         if row_converter.do_not_expunge:
@@ -5,11 +5,15 @@
 """
 
 import collections
+import itertools
+
+from sqlalchemy import inspect
 
 import ggrc.services
 from ggrc import db
 from ggrc.converters import errors
 from ggrc.converters import get_importables
+from ggrc.converters import prefetch
 from ggrc.login import get_current_user_id
 from ggrc.models.reflection import AttributeInfo
 from ggrc.rbac import permissions
@@ -30,6 +34,7 @@ class RowConverter(object):
     self.is_deprecated = False
     self.do_not_expunge = False
     self.ignore = False
+    self.pre_commit_signals_sent = False
     self.index = options.get("index", -1)
     self.row = options.get("row", [])
     self.attrs = collections.OrderedDict()
@@ -118,7 +123,11 @@ class RowConverter(object):
                      column_names=", ".join(missing))
 
   def find_by_key(self, key, value):
-    return self.object_class.query.filter_by(**{key: value}).first()
+    obj = prefetch.get_object(self.block_converter.converter,
+                              self.object_class, key, value)
+    if obj is prefetch.NOT_PREFETCHED:
+      obj = self.object_class.query.filter_by(**{key: value}).first()
+    return obj
 
   def get_value(self, key):
     item = self.attrs.get(key) or self.objects.get(key)
@@ -229,9 +238,13 @@ class RowConverter(object):
     was created, updated or deleted.
     Note: signals are only sent for the row objects. Secondary objects such as
     Relationships do not get any signals triggered.
+
+    Signals are sent only once, rows retried after a failed batch don't send
+    them again.
     """
-    if self.ignore:
+    if self.ignore or self.pre_commit_signals_sent:
       return
+    self.pre_commit_signals_sent = True
     service_class = getattr(ggrc.services, self.object_class.__name__)
     service_class.model = self.object_class
     if self.is_delete:
@@ -244,6 +257,35 @@ class RowConverter(object):
       signals.Restful.model_put.send(
           self.object_class, obj=self.obj, src={}, service=service_class)
 
+  def reset_after_rollback(self):
+    """Prepare the row to be set up and inserted again after a rollback.
+
+    Handlers mark themselves as dry run once their objects are inserted, and
+    a new row object keeps references to objects discarded by the rollback,
+    which would be inserted again with it. Both are reset here.
+    """
+    dry_run = self.block_converter.converter.dry_run
+    for handler in itertools.chain(self.attrs.values(),
+                                   self.objects.values()):
+      handler.dry_run = dry_run
+    if self.obj is None:
+      return
+    state = inspect(self.obj)
+    if not state.transient:
+      return
+    for relationship in state.mapper.relationships:
+      value = state.dict.get(relationship.key)
+      if value is None:
+        continue
+      if not relationship.uselist:
+        if inspect(value).transient:
+          setattr(self.obj, relationship.key, None)
+        continue
+      collection = getattr(self.obj, relationship.key)
+      for item in list(value):
+        if inspect(item).transient:
+          collection.remove(item)
+
   def insert_object(self):
     """Add the row object to the current database session."""
     if self.ignore or self.is_delete:
@@ -0,0 +1,175 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Validation of dry run import blocks in parallel worker processes.
+
+Dry runs don't write anything, so blocks can be validated independently.
+Blocks are split and their priority columns are handled once by the
+requesting converter, the same way as in a sequential import. Every worker
+then gets only the cleaned rows and headers of its block, messages of the
+block found while cleaning them and keys of objects created by other blocks,
+so that references to them are resolved. Lookup caches
+stored in the shared state of the requesting converter (such as column
+definitions and ids of prefetched objects) are built once and inherited by
+the forked workers.
+
+Workers are forked only by imports running as background tasks, see the
+dry_run_workers argument of the converter, never by request handlers.
+
+Rows of a single block are always validated together, because uniqueness
+checks of a block need all of its rows.
+"""
+
+import copy
+import multiprocessing
+
+from ggrc import db
+from ggrc.rbac import permissions
+
+
+# State of the converter that requested the validation, inherited by workers
+_shared_state = None
+
+# Database connections and session inherited by a worker, they are kept
+# referenced, so they are never closed or reset by the worker
+_inherited = None
+
+
+def can_validate_in_parallel(converter):
+  """Check if blocks of a dry run converter should be validated in workers."""
+  return (converter.dry_run and
+          converter.dry_run_workers > 1 and
+          len(converter.block_converters) > 1)
+
+
+def _init_worker():
+  """Make a worker open its own database connections.
+
+  Connections inherited from the requesting process stay open and unused,
+  so that the requesting process can keep using them.
+  """
+  # pylint: disable=global-statement
+  global _inherited
+  session = db.session.registry() if db.session.registry.has() else None
+  _inherited = (db.engine.pool, session)
+  db.engine.pool = db.engine.pool.recreate()
+  db.session.registry.clear()
+
+
+def _get_new_object_keys(block_converter):
+  """Get (class, key column, value) of new objects created by a block."""
+  new_objects = block_converter.converter.new_objects
+  keys = set()
+  for row_converter in block_converter.row_converters:
+    value = row_converter.get_value(row_converter.id_key)
+    if (row_converter.is_new and value and
+            new_objects[row_converter.object_class].get(value) is
+            row_converter.obj):
+      keys.add((row_converter.object_class, row_converter.id_key, value))
+  return keys
+
+
+def _get_clean_headers(block_converter):
+  """Get display names of headers left in the block after cleaning."""
+  if not block_converter.object_class:
+    return block_converter.raw_headers
+  return [header["display_name"]
+          for header in block_converter.headers.values()]
+
+
+def _get_block_data(converter):
+  """Get data needed to validate every block of the converter in a worker.
+
+  Returns:
+    list of dicts with the arguments of every block converter and keys of
+    new objects created by other blocks.
+  """
+  new_object_keys = [_get_new_object_keys(block_converter)
+                     for block_converter in converter.block_converters]
+  blocks_data = []
+  for index, block_converter in enumerate(converter.block_converters):
+    other_keys = set()
+    for other_index, keys in enumerate(new_object_keys):
+      if other_index != index:
+        other_keys.update(keys)
+    # Rows of the block are already cleaned, so they are sent with the
+    # cleaned headers and not the raw ones from the csv file.
+    blocks_data.append({
+        "object_class": block_converter.object_class,
+        "class_name": block_converter.class_name,
+        "offset": block_converter.offset,
+        "headers": _get_clean_headers(block_converter),
+        "rows": block_converter.rows,
+        "block_errors": block_converter.block_errors,
+        "block_warnings": block_converter.block_warnings,
+        "ignore": block_converter.ignore,
+        "new_object_keys": other_keys,
+    })
+  return blocks_data
+
+
+def _validate_block(block_data):
+  """Validate a single block and get its info."""
+  from ggrc.converters import prefetch
+  from ggrc.converters.base import Converter
+  from ggrc.converters.base_block import BlockConverter
+  try:
+    converter = Converter(dry_run=True,
+                          shared_state=copy.deepcopy(_shared_state))
+    for object_class, key, value in block_data["new_object_keys"]:
+      obj = object_class()
+      setattr(obj, key, value)
+      converter.new_objects[object_class][value] = obj
+    block_converter = BlockConverter(
+        converter,
+        object_class=block_data["object_class"],
+        rows=block_data["rows"],
+        raw_headers=block_data["headers"],
+        offset=block_data["offset"],
+        class_name=block_data["class_name"],
+    )
+    # Block restrictions were checked by the requesting converter
+    block_converter.block_errors = block_data["block_errors"]
+    block_converter.block_warnings = block_data["block_warnings"]
+    block_converter.ignore = block_data["ignore"]
+    converter.block_converters = [block_converter]
+    prefetch.prefetch(converter)
+    converter.row_converters_from_csv()
+    converter.handle_priority_columns()
+    block_converter.handle_row_data()
+    block_converter.import_objects()
+    block_converter.import_secondary_objects()
+    return block_converter.get_info()
+  finally:
+    db.session.rollback()
+    db.session.remove()
+
+
+def validate_blocks(converter):
+  """Validate all blocks of a dry run converter in a pool of processes.
+
+  Returns:
+    list of block infos in the order of converter blocks.
+  """
+  # pylint: disable=global-statement
+  global _shared_state
+  converter.row_converters_from_csv()
+  converter.handle_priority_columns()
+  blocks_data = _get_block_data(converter)
+  _shared_state = converter.shared_state
+
+  # Load the permissions before workers are forked, so they get a copy.
+  permissions.permissions_for()
+
+  pool = multiprocessing.Pool(
+      min(converter.dry_run_workers, len(blocks_data)),
+      initializer=_init_worker,
+  )
+  try:
+    infos = pool.map(_validate_block, blocks_data)
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+    _shared_state = None
+  return infos
@@ -14,6 +14,7 @@ from sqlalchemy import or_
 from ggrc import db
 from ggrc.converters import errors
 from ggrc.converters import get_exportables
+from ggrc.converters import prefetch
 from ggrc.login import get_current_user
 from ggrc.models import Audit
 from ggrc.models import CategoryBase
@@ -241,17 +242,21 @@ class UserColumnHandler(ColumnHandler):
 
   def get_person(self, email):
     from ggrc.utils import user_generator
-    new_objects = self.row_converter.block_converter.converter.new_objects
+    converter = self.row_converter.block_converter.converter
+    new_objects = converter.new_objects
     if email not in new_objects[Person]:
-      try:
-        new_objects[Person][email] = user_generator.find_user(email)
-      except ValueError as ex:
-        self.add_error(
-            errors.VALIDATION_ERROR,
-            column_name=self.display_name,
-            message=ex.message
-        )
-        return None
+      person = prefetch.get_object(converter, Person, "email", email)
+      if person is prefetch.NOT_PREFETCHED:
+        try:
+          person = user_generator.find_user(email)
+        except ValueError as ex:
+          self.add_error(
+              errors.VALIDATION_ERROR,
+              column_name=self.display_name,
+              message=ex.message
+          )
+          return None
+      new_objects[Person][email] = person
     return new_objects[Person].get(email)
 
   def parse_item(self):
@@ -481,9 +486,12 @@ class MappingColumnHandler(ColumnHandler):
     class_ = self.mapping_object
     lines = set(self.raw_value.splitlines())
     slugs = set([slug.lower() for slug in lines if slug.strip()])
+    converter = self.row_converter.block_converter.converter
     objects = []
     for slug in slugs:
-      obj = class_.query.filter_by(slug=slug).first()
+      obj = prefetch.get_object(converter, class_, "slug", slug)
+      if obj is prefetch.NOT_PREFETCHED:
+        obj = class_.query.filter_by(slug=slug).first()
       if obj:
         if permissions.is_allowed_update_for(obj):
           objects.append(obj)
@@ -53,18 +53,31 @@ def get_column_order(columns):
 
 def generate_csv_string(csv_data):
   """ Turn 2d string array into a string representing a csv file """
-  output_buffer = StringIO()
-  writer = csv.writer(output_buffer)
+  width = max([len(row) for row in csv_data] or [0])
+  return "".join(generate_csv_chunks(csv_data, width))
 
-  csv_data = equalize_array(csv_data)
-  csv_data = utf_8_encode_array(csv_data)
 
-  for row in csv_data:
-    writer.writerow(row)
+def generate_csv_chunks(rows, width, chunk_size=64 * 1024):
+  """Generate a csv file in parts of about chunk_size bytes.
 
+  Args:
+    rows: iterable of lists of unicode values;
+    width: number of columns, shorter rows are padded with empty values;
+    chunk_size: minimal size of generated parts, except the last one.
+  """
+  output_buffer = StringIO()
+  writer = csv.writer(output_buffer)
+  for row in rows:
+    padding = [""] * (width - len(row))
+    writer.writerow([val.encode("utf-8") for val in row] + padding)
+    if output_buffer.tell() >= chunk_size:
+      yield output_buffer.getvalue()
+      output_buffer.seek(0)
+      output_buffer.truncate()
   body = output_buffer.getvalue()
   output_buffer.close()
-  return body
+  if body:
+    yield body
 
 
 def extract_relevant_data(csv_data):
@@ -0,0 +1,133 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Prefetching of objects referenced by cells of an imported csv file.
+
+Before rows are handled, cells of all blocks are scanned for emails of people,
+slugs and emails of imported objects and slugs of mapped objects. Values of
+every (model, key column) pair are resolved with IN queries and ids of found
+objects are stored in the shared state of the converter, so that dry run
+workers don't have to scan and resolve the values again.
+
+Column handlers get referenced objects with dictionary lookups and fall back
+to database queries only for values that were not prefetched.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import inspect
+from sqlalchemy import orm
+
+from ggrc import settings
+from ggrc.converters import get_exportables
+from ggrc.models import all_models
+from ggrc.utils import benchmark
+from ggrc.utils import list_chunks
+
+
+# Returned by get_object for values that have to be looked up in the database
+NOT_PREFETCHED = object()
+
+SHARED_STATE_KEY = "prefetched"
+
+
+def _can_prefetch_people():
+  """People are prefetched only if find_user looks them up in the database."""
+  return (not settings.INTEGRATION_SERVICE_URL or
+          settings.INTEGRATION_SERVICE_URL == "mock")
+
+
+def _get_lookup(block_converter, attr_name, header):
+  """Get (model, key) of objects referenced by values of a column, if any."""
+  from ggrc.converters.handlers import handlers
+  handler = header["handler"]
+  if attr_name in ("slug", "email"):
+    return block_converter.object_class, attr_name
+  if issubclass(handler, handlers.UserColumnHandler):
+    if _can_prefetch_people():
+      return all_models.Person, "email"
+    return None
+  if issubclass(handler, handlers.MappingColumnHandler):
+    mapping_object = get_exportables().get(header.get("attr_name", ""))
+    if mapping_object is not None and hasattr(mapping_object, "slug"):
+      return mapping_object, "slug"
+  return None
+
+
+def _split_values(raw_value):
+  """Get normalized values of a new line separated cell."""
+  return {line.strip().lower() for line in raw_value.splitlines()
+          if line.strip()}
+
+
+def _scan_values(converter):
+  """Get sets of referenced values of all blocks by (model, key)."""
+  values = defaultdict(set)
+  for block_converter in converter.block_converters:
+    if block_converter.ignore or not block_converter.object_class:
+      continue
+    for index, (attr_name, header) in enumerate(
+        block_converter.headers.items()):
+      lookup = _get_lookup(block_converter, attr_name, header)
+      if lookup is None:
+        continue
+      for row in block_converter.rows:
+        if index < len(row):
+          values[lookup].update(_split_values(row[index]))
+  return values
+
+
+def _load_objects(model, key, column, values):
+  """Load objects with column values in values by normalized key values."""
+  query = model.query
+  if model is all_models.Person:
+    query = query.options(orm.undefer_group("Person_complete"))
+  objects = {}
+  for chunk in list_chunks(sorted(values)):
+    for obj in query.filter(column.in_(chunk)):
+      objects[getattr(obj, key).lower()] = obj
+  return objects
+
+
+def prefetch(converter):
+  """Load objects referenced by cells of all blocks of the converter.
+
+  Values are scanned and resolved only once, converters that get the shared
+  state with resolved values load the objects by their ids.
+  """
+  with benchmark("Prefetch referenced objects"):
+    lookups = converter.shared_state.get(SHARED_STATE_KEY)
+    if lookups is None:
+      lookups = {}
+      for (model, key), values in _scan_values(converter).iteritems():
+        objects = _load_objects(model, key, getattr(model, key), values)
+        converter.prefetched_objects[(model, key)] = objects
+        lookups[(model, key)] = {
+            "values": values,
+            "ids": {value: obj.id for value, obj in objects.iteritems()},
+        }
+      converter.shared_state[SHARED_STATE_KEY] = lookups
+      return
+    for (model, key), lookup in lookups.iteritems():
+      converter.prefetched_objects[(model, key)] = _load_objects(
+          model, key, model.id, lookup["ids"].values())
+
+
+def get_object(converter, model, key, value):
+  """Get a prefetched object by the value of its key column.
+
+  Returns:
+    the object, None if no object has the value or NOT_PREFETCHED if the
+    value was not prefetched and has to be looked up in the database.
+  """
+  lookup = converter.shared_state.get(SHARED_STATE_KEY, {}).get((model, key))
+  if lookup is None or not value or value != value.strip():
+    return NOT_PREFETCHED
+  value = value.lower()
+  if value not in lookup["values"]:
+    return NOT_PREFETCHED
+  obj = converter.prefetched_objects.get((model, key), {}).get(value)
+  if obj is not None and not inspect(obj).persistent:
+    # the object was removed from the session during the import
+    return NOT_PREFETCHED
+  return obj
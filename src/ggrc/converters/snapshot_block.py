@@ -127,6 +127,8 @@ class SnapshotBlockConverter(object):
       snapshots = models.Snapshot.eager_query().filter(
           models.Snapshot.id.in_(self.ids)
       ).all()
+      models.Revision.populate_contents(
+          [snapshot.revision for snapshot in snapshots])
 
       for snapshot in snapshots:  # add special snapshot attribute
         snapshot.content = self._extend_revision_content(snapshot)
@@ -333,11 +335,19 @@ class SnapshotBlockConverter(object):
   @property
   def _body_list(self):
     """Get 2D representation of CSV content."""
-    return [
-        self._content_line_list(snapshot)
-        for snapshot in self.snapshots
-    ] or [[]]
+    return list(self.generate_csv_body())
+
+  def generate_csv_header(self):
+    """Get 2D list representing the CSV header."""
+    return self._header_list
+
+  def generate_csv_body(self):
+    """Generate CSV content lines, an empty line if there are no snapshots."""
+    if not self.snapshots:
+      yield []
+    for snapshot in self.snapshots:
+      yield self._content_line_list(snapshot)
 
   def row_data_to_array(self):
     """Get 2D list representing the CSV file."""
-    return self._header_list, self._body_list
+    return self.generate_csv_header(), self._body_list
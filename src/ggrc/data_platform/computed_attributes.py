@@ -23,9 +23,9 @@ import sqlalchemy as sa
 
 from ggrc import db
 from ggrc import login
-from ggrc.utils import revisions as revision_utils
 from ggrc.utils import benchmark
 from ggrc.models import all_models as models
+from ggrc.models import latest_revision
 
 # Statement for inserting attribute values without explicit call of delete.
 ATTRIBUTE_REPLACE_STATEMENT = """
@@ -587,7 +587,7 @@ def get_all_latest_revisions_ids():
     revision_ids = []
     for attribute in attributes:
       aggregate_type = get_aggregate_type(attribute)
-      revisions = revision_utils._get_revisions_by_type(aggregate_type)
+      revisions = latest_revision.get_ids_by_type(aggregate_type)
       revision_ids.extend(revisions.values())
     return revision_ids
 
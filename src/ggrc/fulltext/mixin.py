@@ -2,12 +2,9 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
 """Module contains Indexed mixin class"""
-import itertools
 from collections import namedtuple
 
-from sqlalchemy import inspect, orm
-
-from ggrc import db
+from sqlalchemy import orm
 
 from ggrc import fulltext
 
@@ -39,15 +36,19 @@ class Indexed(object):
     """Return insert class record query. It will return None, if it's empty."""
     if not ids:
       return
-    instances = cls.indexed_query().filter(cls.id.in_(ids))
     indexer = fulltext.get_indexer()
-    keys = inspect(indexer.record_type).c
-    records = (indexer.fts_record_for(i) for i in instances)
-    rows = itertools.chain(*[indexer.records_generator(i) for i in records])
-    values = [{c.name: getattr(r, a) for a, c in keys.items()} for r in rows]
+    values = cls.get_index_rows_for(ids)
     if values:
       return indexer.record_type.__table__.insert().values(values)
 
+  @classmethod
+  def get_index_rows_for(cls, ids):
+    """Get column values of index rows for class instances with ids."""
+    instances = cls.indexed_query().filter(cls.id.in_(ids))
+    indexer = fulltext.get_indexer()
+    return indexer.get_record_rows(
+        indexer.fts_record_for(i) for i in instances)
+
   @classmethod
   def get_delete_query_for(cls, ids):
     """Return delete class record query. If ids are empty, will return None."""
@@ -62,12 +63,15 @@ class Indexed(object):
 
   @classmethod
   def bulk_record_update_for(cls, ids):
-    """Bulky update index records for current class"""
-    delete_query = cls.get_delete_query_for(ids)
-    insert_query = cls.get_insert_query_for(ids)
-    for query in [delete_query, insert_query]:
-      if query is not None:
-        db.session.execute(query)
+    """Bulky update index records for current class.
+
+    New index rows are compared with the stored ones and only the changed
+    rows are inserted, updated or deleted.
+    """
+    if not ids:
+      return
+    fulltext.get_indexer().sync_record_rows(
+        cls.__name__, list(ids), cls.get_index_rows_for(ids))
 
   @classmethod
   def indexed_query(cls):
@@ -1,6 +1,7 @@
 # Copyright (C) 2018 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 """Full text index engine for Mysql DB backend"""
+import re
 from collections import defaultdict
 
 from sqlalchemy import and_
@@ -9,9 +10,12 @@ from sqlalchemy import distinct
 from sqlalchemy import func
 from sqlalchemy import literal
 from sqlalchemy import or_
+from sqlalchemy import types
 from sqlalchemy import union
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import ColumnElement
 from sqlalchemy.sql.expression import select
 from sqlalchemy import event
 
@@ -21,6 +25,7 @@ from ggrc.models import all_models
 from ggrc.models.inflector import get_model
 from ggrc.query import my_objects
 from ggrc.rbac import context_query_filter
+from ggrc.rbac import resource_query_filter
 from ggrc.rbac import permissions
 from ggrc.fulltext.sql import SqlIndexer
 
@@ -40,6 +45,8 @@ class MysqlRecordProperty(db.Model):
 
   @declared_attr
   def __table_args__(cls):  # pylint: disable=no-self-argument
+    # The FULLTEXT index on content used by MysqlFulltextIndexer is created
+    # by a migration, Index can't define it in this SQLAlchemy version.
     return (
         db.Index('ix_{}_tags'.format(cls.__tablename__), 'tags'),
         db.Index('ix_{}_key'.format(cls.__tablename__), 'key'),
@@ -48,11 +55,47 @@ class MysqlRecordProperty(db.Model):
     )
 
 
+class BooleanMatch(ColumnElement):
+  """MySQL MATCH ... AGAINST ... IN BOOLEAN MODE expression.
+
+  The value of the expression is the relevance of the row, which is positive
+  for matching rows.
+  """
+  # pylint: disable=abstract-method
+  type = types.Float()
+
+  def __init__(self, column, query):
+    super(BooleanMatch, self).__init__()
+    self.column = column
+    self.query = literal(query)
+
+  @property
+  def _from_objects(self):
+    return self.column._from_objects  # pylint: disable=protected-access
+
+
+@compiles(BooleanMatch)
+def _compile_boolean_match(element, compiler, **kwargs):
+  return "MATCH ({}) AGAINST ({} IN BOOLEAN MODE)".format(
+      compiler.process(element.column, **kwargs),
+      compiler.process(element.query, **kwargs),
+  )
+
+
 class MysqlIndexer(SqlIndexer):
+  """Indexer searching for terms as substrings of indexed content."""
   record_type = MysqlRecordProperty
 
-  @staticmethod
-  def _get_filter_query(terms):
+  def get_content_filter(self, terms):
+    """Get a filter of records with content matching the search terms."""
+    return self.record_type.content.contains(terms)
+
+  def get_relevance(self, terms):
+    """Get an expression used to order records matching the search terms."""
+    # pylint: disable=unused-argument,no-self-use
+    return literal(0)
+
+  def _get_filter_query(self, terms):
     """Get the whitelist of fields to filter in full text table."""
     whitelist = MysqlRecordProperty.property.in_(
         ['title', 'name', 'email', 'notes', 'description', 'slug'])
@@ -60,7 +103,7 @@ class MysqlIndexer(SqlIndexer):
     if not terms:
       return whitelist
     elif terms:
-      return and_(whitelist, MysqlRecordProperty.content.contains(terms))
+      return and_(whitelist, self.get_content_filter(terms))
 
   @staticmethod
   def get_permissions_query(model_names, permission_type='read',
@@ -81,7 +124,12 @@ class MysqlIndexer(SqlIndexer):
       )
       if resources:
         statement = or_(and_(MysqlRecordProperty.type == model_name,
-                             MysqlRecordProperty.key.in_(resources)),
+                             resource_query_filter(
+                                 MysqlRecordProperty.key,
+                                 resources,
+                                 permission_model or model_name,
+                                 permission_type,
+                             )),
                         statement)
       type_queries.append(statement)
 
@@ -156,7 +204,8 @@ class MysqlIndexer(SqlIndexer):
         self.record_type.content.label('content'),
         case(
             [(self.record_type.property == 'title', literal(0))],
-            else_=literal(1)).label('sort_key'))
+            else_=literal(1)).label('sort_key'),
+        self.get_relevance(terms).label('relevance'))
 
     query = db.session.query(*columns)
     query = query.filter(self.get_permissions_query(
@@ -180,7 +229,10 @@ class MysqlIndexer(SqlIndexer):
       unions.append(extra_q)
     all_queries = union(*unions)
     all_queries = aliased(all_queries.order_by(
-        all_queries.c.sort_key, all_queries.c.content))
+        all_queries.c.sort_key,
+        all_queries.c.relevance.desc(),
+        all_queries.c.content,
+    ))
     return db.session.execute(
         select([all_queries.c.key, all_queries.c.type]).distinct())
 
@@ -220,6 +272,61 @@ class MysqlIndexer(SqlIndexer):
     return query.all()
 
 
+class MysqlFulltextIndexer(MysqlIndexer):
+  """Indexer using the FULLTEXT index of fulltext_record_properties.
+
+  Every word of the search terms has to be a prefix of a word of the indexed
+  content and results are ordered by relevance, so searching doesn't need to
+  scan the whole table. Words shorter than FULLTEXT_MIN_TOKEN_SIZE (which
+  must match innodb_ft_min_token_size of the server) are not indexed and are
+  searched as substrings of the matching records.
+
+  Enabled with FULLTEXT_INDEXER = "ggrc.fulltext.mysql.MysqlFulltextIndexer".
+  """
+
+  WORD = re.compile(r"\w+", re.UNICODE)
+
+  def __init__(self, settings):
+    super(MysqlFulltextIndexer, self).__init__(settings)
+    self.min_token_size = getattr(settings, "FULLTEXT_MIN_TOKEN_SIZE", 3)
+
+  def _split_words(self, terms):
+    """Split words of terms into indexed words and shorter words."""
+    indexed, short = [], []
+    for word in self.WORD.findall(terms or u""):
+      words = indexed if len(word) >= self.min_token_size else short
+      if word not in words:
+        words.append(word)
+    return indexed, short
+
+  def get_boolean_query(self, terms):
+    """Get a boolean mode query requiring prefixes of all indexed words.
+
+    Returns:
+      query string or an empty string if terms have no indexed words.
+    """
+    indexed, _ = self._split_words(terms)
+    return u" ".join(u"+{}*".format(word) for word in indexed)
+
+  def get_content_filter(self, terms):
+    """Match indexed words with the index and require short words as
+    substrings."""
+    query = self.get_boolean_query(terms)
+    if not query:
+      return super(MysqlFulltextIndexer, self).get_content_filter(terms)
+    _, short = self._split_words(terms)
+    return and_(
+        BooleanMatch(self.record_type.content, query) > 0,
+        *[self.record_type.content.contains(word) for word in short]
+    )
+
+  def get_relevance(self, terms):
+    query = self.get_boolean_query(terms)
+    if not query:
+      return super(MysqlFulltextIndexer, self).get_relevance(terms)
+    return BooleanMatch(self.record_type.content, query)
+
+
 Indexer = MysqlIndexer
 
 
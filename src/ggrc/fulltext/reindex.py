@@ -0,0 +1,196 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Resumable full text reindex of all indexed models.
+
+Ids of every model are split into shards of at most REINDEX_SHARD_SIZE ids
+using keyset paging, the last shard of a model is open ended so that objects
+created during the reindex are indexed as well. Shards are reindexed by a
+pool of REINDEX_WORKERS processes (in the current process if it is less than
+2) and every completed shard is saved in the progress of the background task.
+A task that is run again with the saved progress skips completed shards.
+"""
+
+import logging
+import multiprocessing
+
+from ggrc import db
+from ggrc import settings
+from ggrc.fulltext import get_indexer
+from ggrc.fulltext import mixin
+from ggrc.models import all_models
+from ggrc.utils import benchmark
+
+
+logger = logging.getLogger(__name__)
+
+# Number of ids that are reindexed and committed together within a shard
+CHUNK_SIZE = 1000
+
+
+def get_indexed_models():
+  """Get a dict of models that are reindexed by name."""
+  return {
+      m.__name__: m for m in all_models.all_models
+      if issubclass(m, mixin.Indexed) and m.REQUIRED_GLOBAL_REINDEX
+  }
+
+
+def get_shards(model, shard_size):
+  """Split ids of the model into ranges of at most shard_size ids.
+
+  Returns:
+    list of [model_name, low, high] lists, low is exclusive and high is
+    inclusive, None means the range is not limited from that side.
+  """
+  shards = []
+  low = None
+  while True:
+    query = db.session.query(model.id).order_by(model.id)
+    if low is not None:
+      query = query.filter(model.id > low)
+    high = query.offset(shard_size - 1).limit(1).scalar()
+    if high is None:
+      shards.append([model.__name__, low, None])
+      return shards
+    shards.append([model.__name__, low, high])
+    low = high
+
+
+def plan_shards(shard_size):
+  """Get shards of all indexed models in the order of model names."""
+  indexed_models = get_indexed_models()
+  shards = []
+  for model_name in sorted(indexed_models):
+    shards.extend(get_shards(indexed_models[model_name], shard_size))
+  return shards
+
+
+def load_index_cache():
+  """Load people and role names used by record builders of all objects."""
+  indexer = get_indexer()
+  people_query = db.session.query(all_models.Person.id,
+                                  all_models.Person.name,
+                                  all_models.Person.email)
+  indexer.cache["people_map"] = {p.id: (p.name, p.email) for p in people_query}
+  indexer.cache["ac_role_map"] = dict(db.session.query(
+      all_models.AccessControlRole.id,
+      all_models.AccessControlRole.name,
+  ))
+
+
+def reindex_shard(shard):
+  """Reindex all objects of a shard committing every CHUNK_SIZE objects.
+
+  Returns:
+    the reindexed shard.
+  """
+  model_name, low, high = shard
+  model = get_indexed_models()[model_name]
+  with benchmark("Create records for %s (%s, %s]" % (model_name, low, high)):
+    while True:
+      query = db.session.query(model.id).order_by(model.id)
+      if low is not None:
+        query = query.filter(model.id > low)
+      if high is not None:
+        query = query.filter(model.id <= high)
+      ids = [row.id for row in query.limit(CHUNK_SIZE)]
+      if not ids:
+        return shard
+      model.bulk_record_update_for(ids)
+      db.session.commit()
+      low = ids[-1]
+
+
+def _init_worker():
+  """Prepare a forked pool process for work with the database."""
+  from ggrc.app import app
+  app.app_context().push()
+
+
+def _reindex_shard_in_worker(shard):
+  """Reindex a shard in a pool process and release its session."""
+  try:
+    return reindex_shard(shard)
+  finally:
+    db.session.remove()
+
+
+def _reindex_shards(shards, workers):
+  """Reindex shards and yield them in the order of completion."""
+  if workers < 2 or len(shards) < 2:
+    for shard in shards:
+      yield reindex_shard(shard)
+    return
+
+  # Forked processes must not share connections of the parent process.
+  db.session.remove()
+  db.engine.dispose()
+  pool = multiprocessing.Pool(min(workers, len(shards)), _init_worker)
+  try:
+    for shard in pool.imap_unordered(_reindex_shard_in_worker, shards):
+      yield shard
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
+
+
+def get_progress(task):
+  """Get reindex progress saved in the task result, if any."""
+  if not task or not task.result:
+    return None
+  return task.result.get("progress")
+
+
+def save_progress(task, progress):
+  """Save reindex progress in the task result."""
+  if not task:
+    return
+  task.result = {
+      "content": "Reindexed {} of {} shards".format(
+          len(progress["done"]), len(progress["shards"])),
+      "status_code": 200,
+      "headers": [("Content-Type", "text/html")],
+      # a copy, so that the change of progress is detected on flush
+      "progress": dict(progress, done=list(progress["done"])),
+  }
+  db.session.add(task)
+  db.session.commit()
+
+
+def reindex_models(task=None, progress=None):
+  """Reindex all indexed models saving the progress in the task.
+
+  Args:
+    task: BackgroundTask for progress reporting;
+    progress: progress of a previous run of the reindex to continue, defaults
+              to the progress saved in the task.
+
+  Returns:
+    progress with all shards completed.
+  """
+  progress = progress or get_progress(task)
+  if progress is None:
+    progress = {
+        "shards": plan_shards(settings.REINDEX_SHARD_SIZE),
+        "done": [],
+    }
+    save_progress(task, progress)
+  else:
+    # don't change the loaded value of the task result in place
+    progress = dict(progress, done=list(progress["done"]))
+  done = set(progress["done"])
+  pending = [shard for index, shard in enumerate(progress["shards"])
+             if index not in done]
+  if done:
+    logger.info("Resuming reindex, %s of %s shards are already done",
+                len(done), len(progress["shards"]))
+
+  load_index_cache()
+  shard_indexes = {tuple(shard): index
+                   for index, shard in enumerate(progress["shards"])}
+  for shard in _reindex_shards(pending, settings.REINDEX_WORKERS):
+    progress["done"].append(shard_indexes[tuple(shard)])
+    save_progress(task, progress)
+  return progress
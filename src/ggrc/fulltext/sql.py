@@ -5,6 +5,8 @@
 
 from collections import defaultdict
 
+import sqlalchemy as sa
+
 from ggrc import db
 
 
@@ -54,6 +56,86 @@ class SqlIndexer(object):
               content=unicode(content),
           )
 
+  def get_record_rows(self, records):
+    """Get column values of index rows for records as dicts."""
+    columns = sa.inspect(self.record_type).c
+    return [{column.name: getattr(row, attr)
+             for attr, column in columns.items()}
+            for record in records
+            for row in self.records_generator(record)]
+
+  def _get_stored_rows(self, type_name, keys, properties=None):
+    """Get stored index rows of objects by their primary key values."""
+    query = db.session.query(
+        self.record_type.key,
+        self.record_type.property,
+        self.record_type.subproperty,
+        self.record_type.context_id,
+        self.record_type.tags,
+        self.record_type.content,
+    ).filter(
+        self.record_type.type == type_name,
+        self.record_type.key.in_(keys),
+    )
+    if properties is not None:
+      query = query.filter(self.record_type.property.in_(properties))
+    return {(row.key, row.property, row.subproperty): row for row in query}
+
+  def sync_record_rows(self, type_name, keys, rows, properties=None):
+    """Make stored index rows equal to rows, writing only the differences.
+
+    Args:
+      type_name: type of indexed objects;
+      keys: ids of the objects, their rows missing in `rows` are deleted;
+      rows: list of dicts with column values of new index rows;
+      properties: if set, only rows of these properties are compared.
+    """
+    if not keys:
+      return
+    table = self.record_type.__table__
+    stored = self._get_stored_rows(type_name, keys, properties)
+    to_insert = []
+    to_update = []
+    for row in rows:
+      old_row = stored.pop(
+          (row["key"], row["property"], row["subproperty"]), None)
+      if old_row is None:
+        to_insert.append(row)
+      elif (old_row.context_id != row["context_id"] or
+            (old_row.tags or u"") != (row["tags"] or u"") or
+            old_row.content != row["content"]):
+        to_update.append({
+            "_key": row["key"],
+            "_property": row["property"],
+            "_subproperty": row["subproperty"],
+            "context_id": row["context_id"],
+            "tags": row["tags"],
+            "content": row["content"],
+        })
+
+    if stored:
+      db.session.execute(table.delete().where(
+          self.record_type.type == type_name
+      ).where(sa.or_(*[
+          sa.and_(self.record_type.key == key,
+                  self.record_type.property == prop,
+                  self.record_type.subproperty == subproperty)
+          for key, prop, subproperty in stored
+      ])))
+    if to_update:
+      db.session.execute(table.update().where(sa.and_(
+          self.record_type.type == type_name,
+          self.record_type.key == sa.bindparam("_key"),
+          self.record_type.property == sa.bindparam("_property"),
+          self.record_type.subproperty == sa.bindparam("_subproperty"),
+      )).values(
+          context_id=sa.bindparam("context_id"),
+          tags=sa.bindparam("tags"),
+          content=sa.bindparam("content"),
+      ), to_update)
+    if to_insert:
+      db.session.execute(table.insert().values(to_insert))
+
   def create_record(self, record, commit=True):
     """Create records in db."""
     for db_record in self.records_generator(record):
@@ -62,16 +144,20 @@ class SqlIndexer(object):
       db.session.commit()
 
   def update_record(self, record, commit=True):
-    """Update records values in db."""
-    # remove the obsolete index entries
+    """Update records values in db.
+
+    Only index entries of the record properties that have changed are
+    written.
+    """
     if record.properties:
-      db.session.query(self.record_type).filter(
-          self.record_type.key == record.key,
-          self.record_type.type == record.type,
-          self.record_type.property.in_(list(record.properties.keys())),
-      ).delete(synchronize_session="fetch")
-    # add new index entries
-    self.create_record(record, commit=commit)
+      self.sync_record_rows(
+          record.type,
+          [record.key],
+          self.get_record_rows([record]),
+          properties=list(record.properties.keys()),
+      )
+    if commit:
+      db.session.commit()
 
   def delete_record(self, key, type, commit=True):
     """Delete records values in db for specific types."""
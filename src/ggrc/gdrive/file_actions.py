@@ -17,8 +17,59 @@ from ggrc.converters.import_helper import read_csv_file
 from ggrc.gdrive import get_http_auth
 
 
-def create_gdrive_file(csv_string, filename):
-  """Post text/csv data to a gdrive file"""
+class IterableUpload(http.MediaUpload):
+  """Resumable upload of data generated in parts by an iterable.
+
+  Only the data of the chunk that is being uploaded is held in memory. The
+  total size is unknown until the iterable is exhausted.
+  """
+
+  def __init__(self, parts, mimetype, chunksize=http.DEFAULT_CHUNK_SIZE):
+    # pylint: disable=super-init-not-called
+    self._parts = iter(parts)
+    self._mimetype = mimetype
+    self._chunksize = chunksize
+    self._buffer = ""
+    self._buffer_start = 0
+
+  def chunksize(self):
+    return self._chunksize
+
+  def mimetype(self):
+    return self._mimetype
+
+  def size(self):
+    return None
+
+  def resumable(self):
+    return True
+
+  def getbytes(self, begin, length):
+    """Get data starting at begin, data before begin is not needed anymore.
+
+    Less than length bytes are returned only at the end of the data.
+    """
+    parts = [self._buffer[begin - self._buffer_start:]]
+    size = len(parts[0])
+    while size < length:
+      part = next(self._parts, None)
+      if part is None:
+        break
+      parts.append(part)
+      size += len(part)
+    self._buffer = "".join(parts)
+    self._buffer_start = begin
+    return self._buffer[:length]
+
+
+def create_gdrive_file(csv_parts, filename):
+  """Post text/csv data to a gdrive file
+
+  Args:
+    csv_parts: iterable of strings that form the csv file, they are uploaded
+               while being generated;
+    filename: name of the created file.
+  """
   http_auth = get_http_auth()
   drive_service = discovery.build('drive', 'v3', http=http_auth)
   # make export to sheets
@@ -26,9 +77,7 @@ def create_gdrive_file(csv_string, filename):
       'name': filename,
       'mimeType': 'application/vnd.google-apps.spreadsheet'
   }
-  media = http.MediaInMemoryUpload(csv_string,
-                                   mimetype='text/csv',
-                                   resumable=True)
+  media = IterableUpload(csv_parts, mimetype='text/csv')
   return drive_service.files().create(body=file_metadata,
                                       media_body=media,
                                       fields='id, name, parents').execute()
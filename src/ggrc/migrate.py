@@ -12,11 +12,11 @@ from alembic.config import Config, CommandLine
 from alembic.environment import EnvironmentContext
 from alembic.script import ScriptDirectory
 from ggrc import settings
+from ggrc.cache import backends
 import ggrc.app  # noqa: Used to initialize default url handler
 from ggrc.extensions import get_extension_module, get_extension_modules
 from ggrc.models.maintenance import Maintenance
 from ggrc.models.maintenance import MigrationLog
-from google.appengine.api import memcache
 
 # pylint: disable=invalid-name
 logger = getLogger(__name__)
@@ -158,7 +158,7 @@ def migrate(row_id=None):
   '''Upgrade all modules and clear entire memcache.'''
   upgradeall(row_id=row_id)
   # flushes out memcache entirely
-  memcache.flush_all()
+  backends.get_client().flush_all()
 
 
 def downgradeall(config=None, drop_versions_table=False):
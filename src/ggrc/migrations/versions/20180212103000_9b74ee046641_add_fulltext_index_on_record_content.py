@@ -0,0 +1,47 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add FULLTEXT index on fulltext_record_properties content
+
+Create Date: 2018-02-12 10:30:00.000000
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9b74ee046641'
+down_revision = '19a260ec358e'
+
+
+INDEX = "ft_fulltext_record_properties_content"
+
+TABLE = "fulltext_record_properties"
+
+
+def has_index():
+  """Check if the FULLTEXT index exists."""
+  return bool(op.get_bind().execute("""
+      SELECT 1 FROM information_schema.statistics
+      WHERE table_schema = DATABASE() AND table_name = '{}'
+        AND index_name = '{}'
+      LIMIT 1
+  """.format(TABLE, INDEX)).scalar())
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  # The index is used by MysqlFulltextIndexer. It's created regardless of the
+  # settings, so that the indexer can be enabled at any time.
+  if not has_index():
+    op.execute("ALTER TABLE {} ADD FULLTEXT INDEX {} (content)".format(
+        TABLE, INDEX))
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  if has_index():
+    op.drop_index(INDEX, TABLE)
@@ -0,0 +1,40 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Create latest_revisions table
+
+Create Date: 2018-02-15 12:00:00.000000
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3bc271b50f5'
+down_revision = '9b74ee046641'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'latest_revisions',
+      sa.Column('resource_type', sa.String(length=250), nullable=False),
+      sa.Column('resource_id', sa.Integer(), nullable=False),
+      sa.Column('revision_id', sa.Integer(), nullable=False),
+      sa.PrimaryKeyConstraint('resource_type', 'resource_id'),
+  )
+  op.execute("""
+      INSERT INTO latest_revisions (resource_type, resource_id, revision_id)
+      SELECT resource_type, resource_id, MAX(id)
+      FROM revisions
+      GROUP BY resource_type, resource_id
+  """)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('latest_revisions')
@@ -0,0 +1,60 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Create user_object_index table
+
+Create Date: 2018-02-20 12:00:00.000000
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4c5b1f0d2e8a'
+down_revision = 'b3bc271b50f5'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'user_object_index',
+      sa.Column('person_id', sa.Integer(), nullable=False),
+      sa.Column('object_type', sa.String(length=250), nullable=False),
+      sa.Column('object_id', sa.Integer(), nullable=False),
+      sa.Column('source', sa.String(length=50), nullable=False),
+      sa.PrimaryKeyConstraint('person_id', 'object_type', 'object_id',
+                              'source'),
+  )
+  op.execute("""
+      INSERT INTO user_object_index
+          (person_id, object_type, object_id, source)
+      SELECT acl.person_id, acl.object_type, acl.object_id, 'acl'
+      FROM access_control_list AS acl
+      JOIN access_control_roles AS acr ON acr.id = acl.ac_role_id
+      WHERE acr.my_work = 1 AND acr.read = 1
+      UNION
+      SELECT person_id, personable_type, personable_id, 'object_person'
+      FROM object_people
+      UNION
+      SELECT attribute_object_id, attributable_type, attributable_id,
+             'custom_attribute'
+      FROM custom_attribute_values
+      WHERE attribute_value = 'Person' AND attribute_object_id IS NOT NULL
+      UNION
+      SELECT source_id, destination_type, destination_id, 'relationship'
+      FROM relationships
+      WHERE source_type = 'Person'
+      UNION
+      SELECT destination_id, source_type, source_id, 'relationship'
+      FROM relationships
+      WHERE destination_type = 'Person'
+  """)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('user_object_index')
@@ -60,6 +60,7 @@ class BackgroundTask(Base, Stateful, db.Model):
     # Ensure to not commit any not-yet-committed changes
     db.session.rollback()
 
+    progress = (self.result or {}).get("progress")
     if isinstance(result, Response):
       self.result = {'content': result.response[0],
                      'status_code': result.status_code,
@@ -68,6 +69,9 @@ class BackgroundTask(Base, Stateful, db.Model):
       self.result = {'content': result,
                      'status_code': 200,
                      'headers': [('Content-Type', 'text/html')]}
+    if status == "Failure" and progress is not None:
+      # keep the progress saved by the task, so that it can be continued
+      self.result["progress"] = progress
     self.status = status
     db.session.add(self)
     db.session.commit()
@@ -125,9 +129,14 @@ def create_task(name, url, queued_callback=None, parameters=None, method=None):
 
 
 def make_task_response(id_):
-  """Make a response for a task with the given id."""
+  """Make a response for a task with the given id.
+
+  Tasks without a result respond with their status.
+  """
+  from ggrc.app import app
   task = BackgroundTask.query.get(id_)
-  return task.make_response()
+  return task.make_response(app.make_response((
+      task.status, 200, [('Content-Type', 'text/html')])))
 
 
 def queued_task(func):
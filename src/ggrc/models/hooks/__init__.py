@@ -11,6 +11,8 @@ from ggrc.models.hooks import custom_attribute_definition
 from ggrc.models.hooks import issue
 from ggrc.models.hooks import issue_tracker
 from ggrc.models.hooks import relationship
+from ggrc.models.hooks import revision
+from ggrc.models.hooks import user_object_index
 from ggrc.models.hooks.acl import audit_roles
 from ggrc.models.hooks.acl import program_roles
 from ggrc.models.hooks.acl import relationship_deletion
@@ -23,6 +25,8 @@ ALL_HOOKS = [
     comment,
     issue,
     relationship,
+    revision,
+    user_object_index,
     access_control_list,
     custom_attribute_definition,
     audit_roles,
@@ -0,0 +1,27 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Hooks maintaining the index of latest revisions."""
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from ggrc.models import latest_revision
+from ggrc.models.revision import Revision
+
+
+def index_new_revisions(session, _):
+  """Store flushed revisions in the latest revisions index."""
+  revision_ids = {}
+  for obj in session.new:
+    if not isinstance(obj, Revision):
+      continue
+    key = (obj.resource_type, obj.resource_id)
+    if obj.id > revision_ids.get(key, 0):
+      revision_ids[key] = obj.id
+  latest_revision.update(session, revision_ids)
+
+
+def init_hook():
+  """Initialize Revision-related hooks."""
+  sa.event.listen(Session, "after_flush", index_new_revisions)
@@ -0,0 +1,79 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Hooks maintaining the index of objects related to people."""
+
+import itertools
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from ggrc.models import all_models
+from ggrc.models import user_object_index
+
+
+def _get_keys(obj, person_attr, type_attr, id_attr):
+  """Get current and previous (person_id, type, id) keys of an object."""
+  state = sa.inspect(obj)
+  attrs = (person_attr, type_attr, id_attr)
+  current = tuple(getattr(obj, attr) for attr in attrs)
+  previous = tuple(
+      (state.attrs[attr].history.deleted or [value])[0]
+      for attr, value in zip(attrs, current)
+  )
+  return {current, previous}
+
+
+def _get_object_keys(obj):
+  """Get keys of index rows that may change with the object."""
+  if isinstance(obj, all_models.AccessControlList):
+    return _get_keys(obj, "person_id", "object_type", "object_id")
+  if isinstance(obj, all_models.ObjectPerson):
+    return _get_keys(obj, "person_id", "personable_type", "personable_id")
+  if isinstance(obj, all_models.CustomAttributeValue):
+    history = sa.inspect(obj).attrs.attribute_value.history
+    if "Person" not in [obj.attribute_value] + list(history.deleted):
+      return set()
+    return _get_keys(obj, "attribute_object_id", "attributable_type",
+                     "attributable_id")
+  if isinstance(obj, all_models.Relationship):
+    keys = set()
+    if obj.source_type == "Person":
+      keys.update(_get_keys(obj, "source_id", "destination_type",
+                            "destination_id"))
+    if obj.destination_type == "Person":
+      keys.update(_get_keys(obj, "destination_id", "source_type",
+                            "source_id"))
+    return keys
+  return set()
+
+
+def _get_role_keys(session, role_ids):
+  """Get keys of access control list entries of roles."""
+  if not role_ids:
+    return set()
+  acl = all_models.AccessControlList
+  return set(session.query(
+      acl.person_id, acl.object_type, acl.object_id,
+  ).filter(acl.ac_role_id.in_(role_ids)))
+
+
+def refresh_flushed_sources(session, _):
+  """Refresh index rows related to flushed sources of the index."""
+  keys = set()
+  role_ids = set()
+  for obj in itertools.chain(session.new, session.dirty, session.deleted):
+    if isinstance(obj, all_models.AccessControlRole):
+      state = sa.inspect(obj)
+      if obj in session.dirty and (state.attrs.my_work.history.deleted or
+                                   state.attrs.read.history.deleted):
+        role_ids.add(obj.id)
+      continue
+    keys.update(_get_object_keys(obj))
+  keys.update(_get_role_keys(session, role_ids))
+  user_object_index.refresh(session, keys)
+
+
+def init_hook():
+  """Initialize hooks maintaining the user object index."""
+  sa.event.listen(Session, "after_flush", refresh_flushed_sources)
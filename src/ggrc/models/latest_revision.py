@@ -0,0 +1,144 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Index of the latest revision of every object.
+
+The latest_revisions table holds the id of the newest revision for every
+(resource_type, resource_id) pair, so that latest revisions are found with
+primary key lookups instead of scans of object histories. Revisions created
+through the session are indexed on flush (see ggrc.models.hooks.revision),
+code inserting revisions with bulk statements has to call refresh.
+"""
+
+import collections
+
+import sqlalchemy as sa
+from sqlalchemy.sql.expression import tuple_
+
+from ggrc import db
+from ggrc.models.revision import Revision
+from ggrc.utils import list_chunks
+
+
+UPSERT_SQL = sa.text("""
+    INSERT INTO latest_revisions (resource_type, resource_id, revision_id)
+    VALUES (:resource_type, :resource_id, :revision_id)
+    ON DUPLICATE KEY UPDATE
+        revision_id = GREATEST(revision_id, VALUES(revision_id))
+""")
+
+
+class LatestRevision(db.Model):
+  """Id of the latest revision of an object."""
+
+  __tablename__ = "latest_revisions"
+
+  resource_type = db.Column(db.String(250), primary_key=True)
+  resource_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  revision_id = db.Column(db.Integer, nullable=False)
+
+
+def update(session, revision_ids):
+  """Store ids of new revisions in the index, if they are the latest ones.
+
+  Args:
+    session: session or connection used to write the index;
+    revision_ids: dict of revision ids by (resource_type, resource_id).
+  """
+  if not revision_ids:
+    return
+  session.execute(UPSERT_SQL, [
+      {"resource_type": type_, "resource_id": id_, "revision_id": rev_id}
+      for (type_, id_), rev_id in revision_ids.iteritems()
+  ])
+
+
+def refresh(session, resources):
+  """Index latest revisions of resources from their revision histories.
+
+  Args:
+    session: session or connection used to write the index;
+    resources: iterable of (resource_type, resource_id) tuples.
+  """
+  for chunk in list_chunks(sorted(set(resources))):
+    query = db.session.query(
+        Revision.resource_type,
+        Revision.resource_id,
+        sa.func.max(Revision.id),
+    ).filter(
+        tuple_(Revision.resource_type, Revision.resource_id).in_(chunk),
+    ).group_by(Revision.resource_type, Revision.resource_id)
+    update(session, {(type_, id_): rev_id for type_, id_, rev_id in query})
+
+
+def get_ids(resources, filters=None):
+  """Get ids of latest revisions of resources.
+
+  Args:
+    resources: iterable of (resource_type, resource_id) tuples;
+    filters: predicates on Revision columns, the latest revision that matches
+             all filters is returned for resources whose latest revision
+             doesn't match them.
+
+  Returns:
+    dict of revision ids by (resource_type, resource_id) tuples.
+  """
+  resources = set(resources)
+  if not resources:
+    return {}
+  keys = tuple_(LatestRevision.resource_type, LatestRevision.resource_id)
+  query = db.session.query(
+      LatestRevision.resource_type,
+      LatestRevision.resource_id,
+      LatestRevision.revision_id,
+  ).filter(keys.in_(resources))
+  if filters:
+    query = query.join(
+        Revision, Revision.id == LatestRevision.revision_id,
+    ).filter(*filters)
+  revision_ids = {(type_, id_): rev_id for type_, id_, rev_id in query}
+
+  if filters and len(revision_ids) < len(resources):
+    # Latest revisions of the rest don't match filters or are not indexed.
+    query = db.session.query(
+        Revision.resource_type,
+        Revision.resource_id,
+        sa.func.max(Revision.id),
+    ).filter(
+        tuple_(Revision.resource_type, Revision.resource_id).in_(
+            resources - set(revision_ids)),
+        *filters
+    ).group_by(Revision.resource_type, Revision.resource_id)
+    revision_ids.update(((type_, id_), rev_id)
+                        for type_, id_, rev_id in query)
+  return revision_ids
+
+
+def get_ids_by_type(resource_type):
+  """Get ids of latest revisions of all objects of a type.
+
+  Returns:
+    dict of revision ids by resource ids.
+  """
+  return dict(db.session.query(
+      LatestRevision.resource_id,
+      LatestRevision.revision_id,
+  ).filter(LatestRevision.resource_type == resource_type))
+
+
+def query_for(resources):
+  """Get query of latest revisions of resources.
+
+  Args:
+    resources: iterable of (resource_type, resource_id) tuples.
+  """
+  resources_by_type = collections.defaultdict(set)
+  for type_, id_ in resources:
+    resources_by_type[type_].add(id_)
+  return Revision.query.join(
+      LatestRevision, LatestRevision.revision_id == Revision.id,
+  ).filter(sa.or_(*[
+      sa.and_(LatestRevision.resource_type == type_,
+              LatestRevision.resource_id.in_(ids))
+      for type_, ids in resources_by_type.iteritems()
+  ]))
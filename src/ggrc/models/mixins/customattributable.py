@@ -253,17 +253,27 @@ class CustomAttributable(object):
     Args:
       definitions: Ordered list of (dict) custom attribute definitions
     """
+    from ggrc.models import user_object_index
     from ggrc.models.custom_attribute_definition \
         import CustomAttributeDefinition as CADef
+    from ggrc.models.custom_attribute_value import CustomAttributeValue
 
     if not hasattr(self, "PER_OBJECT_CUSTOM_ATTRIBUTABLE"):
       return
 
     if self.id is not None:
-      db.session.query(CADef).filter(
+      definitions = db.session.query(CADef).filter(
           CADef.definition_id == self.id,
           CADef.definition_type == self._inflector.table_singular
-      ).delete()
+      )
+      # values of deleted definitions are deleted by the database cascade
+      index_keys = user_object_index.get_person_value_keys(
+          db.session,
+          CustomAttributeValue.custom_attribute_id.in_(
+              definitions.with_entities(CADef.id).subquery()),
+      )
+      definitions.delete()
+      user_object_index.refresh(db.session, index_keys)
       db.session.flush()
       db.session.expire_all()
 
@@ -277,6 +287,7 @@ class CustomAttributable(object):
   def _remove_existing_items(self, attr_values):
     """Remove existing CAV and corresponding full text records."""
     from ggrc.fulltext.mysql import MysqlRecordProperty
+    from ggrc.models import user_object_index
     from ggrc.models.custom_attribute_value import CustomAttributeValue
     if not attr_values:
       return
@@ -297,9 +308,12 @@ class CustomAttributable(object):
 
     # 3) Delete the list of custom attribute values
     attr_value_ids = [value.id for value in attr_values]
+    index_keys = user_object_index.get_person_value_keys(
+        db.session, CustomAttributeValue.id.in_(attr_value_ids))
     db.session.query(CustomAttributeValue)\
         .filter(CustomAttributeValue.id.in_(attr_value_ids))\
         .delete(synchronize_session='fetch')
+    user_object_index.refresh(db.session, index_keys)
     db.session.commit()
 
   def custom_attributes(self, src):
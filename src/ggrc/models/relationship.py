@@ -4,7 +4,6 @@
 """Module for Relationship model and related classes."""
 
 import collections
-import sqlalchemy as sa
 from sqlalchemy import or_, and_
 from sqlalchemy.ext.declarative import declared_attr
 
@@ -219,36 +218,6 @@ class RelationshipsCache(object):
 
   def populate_cache(self, stubs):
     """Fetch all mappings for objects in stubs, cache them in self.cache."""
-    # Union is here to convince mysql to use two separate indices and
-    # merge te results. Just using `or` results in a full-table scan
-    # Manual column list avoids loading the full object which would also try to
-    # load related objects
-    cols = db.session.query(
-        Relationship.source_type, Relationship.source_id,
-        Relationship.destination_type, Relationship.destination_id)
-    relationships = cols.filter(
-        sa.tuple_(
-            Relationship.source_type,
-            Relationship.source_id
-        ).in_(
-            [(s.type, s.id) for s in stubs]
-        )
-    ).union_all(
-        cols.filter(
-            sa.tuple_(
-                Relationship.destination_type,
-                Relationship.destination_id
-            ).in_(
-                [(s.type, s.id) for s in stubs]
-            )
-        )
-    ).all()
-    for (src_type, src_id, dst_type, dst_id) in relationships:
-      src = Stub(src_type, src_id)
-      dst = Stub(dst_type, dst_id)
-      # only store a neighbor if we queried for it since this way we know
-      # we'll be storing complete neighborhood by the end of the loop
-      if src in stubs:
-        self.cache[src].add(dst)
-      if dst in stubs:
-        self.cache[dst].add(src)
+    from ggrc.models import relationship_cache
+    for stub, related in relationship_cache.get_related(stubs).iteritems():
+      self.cache[stub].update(related)
@@ -0,0 +1,271 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Cache of neighbourhoods of objects in the relationships graph.
+
+Neighbour stubs of objects are kept in a per-process LRU cache keyed by the
+object stub. Every entry remembers change stamps of its object and of the
+whole graph, and is used only while both stamps are current.
+
+Writes to the relationships table are detected at the SQL statement level.
+Writes made through Relationship objects and bulk statements wrapped in
+`declare_writes` bump stamps of their endpoints only, any other write bumps
+the stamp of the whole graph. Stamps are bumped right before and right after
+the commit of the transaction, while objects written by an uncommitted
+transaction are always read from the database in that transaction. Stamps
+are kept in memcache when MEMCACHE_MECHANISM is enabled and in process memory
+otherwise; RELATIONSHIP_CACHE_TTL limits staleness in the latter case for
+changes made by other processes.
+"""
+
+import collections
+import contextlib
+import threading
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm.session import Session
+
+from ggrc import db
+from ggrc import settings
+from ggrc.models.relationship import Relationship, Stub
+from ggrc.query import result_cache
+from ggrc.utils import structures
+
+
+# Stamp bumped by writes to the relationships table with unknown endpoints.
+# Names of stamps differ from table names used by result_cache, since both
+# caches can store their stamps in memcache.
+GRAPH_STAMP = "relationship_cache:graph"
+
+STUB_STAMP = "relationship_cache:{}:{}"
+
+
+_neighbours = None
+_neighbours_lock = threading.Lock()
+_local_stamps = None
+_stats = collections.Counter()
+# Number of running writes of the current thread with known endpoints
+_declared = threading.local()
+
+
+def is_enabled():
+  return settings.RELATIONSHIP_CACHE_SIZE > 0
+
+
+def _get_neighbours():
+  """Get the process level LRU cache of neighbourhoods."""
+  global _neighbours, _local_stamps  # pylint: disable=global-statement
+  with _neighbours_lock:
+    if _neighbours is None:
+      _neighbours = structures.LRUCache(
+          settings.RELATIONSHIP_CACHE_SIZE,
+          ttl=settings.RELATIONSHIP_CACHE_TTL or None,
+      )
+      _local_stamps = result_cache.LocalStamps(
+          settings.RELATIONSHIP_CACHE_SIZE)
+    return _neighbours
+
+
+def _get_stamps_store():
+  """Get storage of change stamps for the current settings."""
+  _get_neighbours()
+  return result_cache.get_stamps_store(_local_stamps)
+
+
+_pending = result_cache.PendingStamps(_get_stamps_store)
+
+
+def _get_stamps(stubs):
+  """Get dict with (graph stamp, object stamp) tuples of stubs."""
+  stubs = list(stubs)
+  values = _get_stamps_store().get(
+      [GRAPH_STAMP] + [STUB_STAMP.format(*stub) for stub in stubs])
+  return {stub: (values[0], value) for stub, value in zip(stubs, values[1:])}
+
+
+def _get_declared():
+  return getattr(_declared, "count", 0)
+
+
+def _set_declared(count):
+  _declared.count = max(count, 0)
+
+
+def _add_pending(stubs):
+  """Remember stubs written by the current thread until commit."""
+  _pending.get().update(STUB_STAMP.format(*stub) for stub in stubs)
+
+
+def _clear_pending():
+  _pending.clear()
+  _set_declared(0)
+
+
+@contextlib.contextmanager
+def declare_writes(stubs):
+  """Mark relationships written by statements of the block.
+
+  Args:
+    stubs: endpoints of all relationships inserted or deleted in the block.
+  """
+  _add_pending(stubs)
+  _set_declared(_get_declared() + 1)
+  try:
+    yield
+  finally:
+    # a rollback in the block has already reset the counter
+    _set_declared(_get_declared() - 1)
+
+
+def _get_endpoints(relationship):
+  """Get current and previous endpoint stubs of a relationship."""
+  state = sa.inspect(relationship)
+  stubs = set()
+  for prefix in ("source", "destination"):
+    attrs = (prefix + "_type", prefix + "_id")
+    current = tuple(getattr(relationship, attr) for attr in attrs)
+    previous = tuple(
+        (state.attrs[attr].history.deleted or [value])[0]
+        for attr, value in zip(attrs, current)
+    )
+    stubs.update(Stub(*key) for key in (current, previous) if None not in key)
+  return stubs
+
+
+def _query_related(stubs):
+  """Query neighbourhoods of stubs."""
+  related = {stub: set() for stub in stubs}
+  if not stubs:
+    return related
+  keys = [(stub.type, stub.id) for stub in stubs]
+  # Union is here to convince mysql to use two separate indices and
+  # merge te results. Just using `or` results in a full-table scan
+  # Manual column list avoids loading the full object which would also try to
+  # load related objects
+  cols = db.session.query(
+      Relationship.source_type, Relationship.source_id,
+      Relationship.destination_type, Relationship.destination_id)
+  relationships = cols.filter(
+      sa.tuple_(Relationship.source_type, Relationship.source_id).in_(keys)
+  ).union_all(
+      cols.filter(
+          sa.tuple_(Relationship.destination_type,
+                    Relationship.destination_id).in_(keys)
+      )
+  ).all()
+  for (src_type, src_id, dst_type, dst_id) in relationships:
+    src = Stub(src_type, src_id)
+    dst = Stub(dst_type, dst_id)
+    if src in related:
+      related[src].add(dst)
+    if dst in related:
+      related[dst].add(src)
+  return related
+
+
+def get_related(stubs):
+  """Get neighbourhoods of objects in the relationships graph.
+
+  Args:
+    stubs: iterable of Stub objects.
+
+  Returns:
+    dict with a set of neighbour stubs for every given stub.
+  """
+  stubs = set(stubs)
+  pending = _pending.get()
+  if not is_enabled() or GRAPH_STAMP in pending:
+    return _query_related(stubs)
+
+  neighbours = _get_neighbours()
+  cacheable = {stub for stub in stubs
+               if STUB_STAMP.format(*stub) not in pending}
+  stamps = _get_stamps(cacheable)
+  related = {}
+  for stub in cacheable:
+    entry = neighbours.get(stub)
+    if entry is None:
+      continue
+    if entry[0] == stamps[stub]:
+      related[stub] = set(entry[1])
+    else:
+      _stats["stale"] += 1
+
+  queried = _query_related(stubs - set(related))
+  for stub, related_stubs in queried.iteritems():
+    if stub in cacheable:
+      neighbours.set(stub, (stamps[stub], frozenset(related_stubs)))
+  related.update(queried)
+  return related
+
+
+def register_relationship_cache_listeners():
+  """Track writes to the relationships table to keep stamps current."""
+  # pylint: disable=unused-argument,unused-variable
+
+  @event.listens_for(Relationship, "before_insert")
+  @event.listens_for(Relationship, "before_update")
+  @event.listens_for(Relationship, "before_delete")
+  def collect_written_stubs(mapper, connection, target):
+    """Remember endpoints of a flushed relationship until commit."""
+    if is_enabled():
+      _add_pending(_get_endpoints(target))
+    _set_declared(_get_declared() + 1)
+
+  @event.listens_for(Relationship, "after_insert")
+  @event.listens_for(Relationship, "after_update")
+  @event.listens_for(Relationship, "after_delete")
+  def finish_written_stubs(mapper, connection, target):
+    _set_declared(_get_declared() - 1)
+
+  @event.listens_for(Engine, "before_cursor_execute")
+  def collect_unknown_writes(conn, cursor, statement, parameters, context,
+                             executemany):
+    """Remember writes to the relationships table with unknown endpoints."""
+    if not is_enabled() or _get_declared() > 0:
+      return
+    tables = result_cache.get_written_tables(statement)
+    if Relationship.__tablename__ in tables or (
+            result_cache.UNKNOWN_TABLE in tables and
+            Relationship.__tablename__ in statement):
+      _pending.get().add(GRAPH_STAMP)
+
+  @event.listens_for(Engine, "commit")
+  def bump_before_commit(conn):
+    if is_enabled():
+      _pending.bump(clear=False)
+
+  @event.listens_for(Session, "after_commit")
+  def bump_after_commit(session):
+    if is_enabled():
+      _pending.bump(clear=True)
+    else:
+      _clear_pending()
+
+  @event.listens_for(Session, "after_rollback")
+  def forget_rolled_back(session):
+    _clear_pending()
+
+
+def get_stats():
+  """Get hit and miss counters of the relationship cache.
+
+  Returns:
+    dict with "hits", "misses" and "stale" lookup counters and "size" and
+    "evictions" of the LRU cache.
+  """
+  lru_stats = _get_neighbours().stats()
+  return {
+      "hits": lru_stats["hits"] - _stats["stale"],
+      "misses": lru_stats["misses"],
+      "stale": _stats["stale"],
+      "size": lru_stats["size"],
+      "evictions": lru_stats["evictions"],
+  }
+
+
+def clear():
+  """Drop all cached neighbourhoods."""
+  _get_neighbours().clear()
@@ -3,13 +3,16 @@
 
 """Defines a Revision model for storing snapshots."""
 
+import sqlalchemy as sa
+
 from ggrc import builder
 from ggrc import db
 from ggrc.models.mixins import Base
 from ggrc.models import reflection
 from ggrc.access_control import role
-from ggrc.models.types import LongJsonType
+from ggrc.models.types import CompressedJsonType
 from ggrc.utils.revisions_diff import builder as revisions_diff
+from ggrc.utils import list_chunks
 from ggrc.utils import referenced_objects
 
 
@@ -23,7 +26,20 @@ class Revision(Base, db.Model):
   event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
   action = db.Column(db.Enum(u'created', u'modified', u'deleted'),
                      nullable=False)
-  _content = db.Column('content', LongJsonType, nullable=False)
+  _content = db.Column('content',
+                       CompressedJsonType("REVISION_CONTENT_COMPRESSION"),
+                       nullable=False)
+  # (saved content, populated content) tuple memoized by content property
+  _populated_content = None
+
+  # Keys of saved content read by populate methods
+  POPULATE_KEYS = frozenset([
+      "access_control_list", "principal_assessor", "secondary_assessor",
+      "contact", "secondary_contact", "owners", "url", "reference_url",
+      "created_at", "updated_at", "folder", "folders", "label", "status",
+      "document_evidence", "categories", "assertions", "custom_attributes",
+      "custom_attribute_values",
+  ])
 
   resource_slug = db.Column(db.String, nullable=True)
   source_type = db.Column(db.String, nullable=True)
@@ -146,13 +162,14 @@ class Revision(Base, db.Model):
       result += ", via bulk action"
     return result
 
-  def populate_reference_url(self):
+  def populate_reference_url(self, content=None):
     """Add reference_url info for older revisions."""
-    if 'url' not in self._content:
+    content = self._content if content is None else content
+    if 'url' not in content:
       return {}
     reference_url_list = []
     for key in ('url', 'reference_url'):
-      link = self._content[key]
+      link = content[key]
       # link might exist, but can be an empty string - we treat those values
       # as non-existing (empty) reference URLs
       if not link:
@@ -160,9 +177,9 @@ class Revision(Base, db.Model):
 
       # if creation/modification date is not available, we estimate it by
       # using the corresponding information from the Revision itself
-      created_at = (self._content.get("created_at") or
+      created_at = (content.get("created_at") or
                     self.created_at.isoformat())
-      updated_at = (self._content.get("updated_at") or
+      updated_at = (content.get("updated_at") or
                     self.updated_at.isoformat())
 
       reference_url_list.append({
@@ -176,11 +193,25 @@ class Revision(Base, db.Model):
       })
     return {'reference_url': reference_url_list}
 
-  def populate_acl(self):
-    """Add access_control_list info for older revisions."""
-    roles_dict = role.get_custom_roles_for(self.resource_type)
-    reverted_roles_dict = {n: i for i, n in roles_dict.iteritems()}
-    access_control_list = self._content.get("access_control_list") or []
+  @staticmethod
+  def _get_roles_dicts(resource_type):
+    """Get role names by ids and role ids by names for a resource type."""
+    roles_dict = role.get_custom_roles_for(resource_type)
+    return roles_dict, {n: i for i, n in roles_dict.iteritems()}
+
+  def populate_acl(self, roles_dicts=None, content=None):
+    """Add access_control_list info for older revisions.
+
+    Args:
+      roles_dicts: result of _get_roles_dicts for the resource type of the
+                   revision, resolved if it's not given;
+      content: saved content to populate, the content of the revision by
+               default.
+    """
+    content = self._content if content is None else content
+    roles_dict, reverted_roles_dict = (
+        roles_dicts or self._get_roles_dicts(self.resource_type))
+    access_control_list = content.get("access_control_list") or []
     map_field_to_role = {
         "principal_assessor": reverted_roles_dict.get("Principal Assignees"),
         "secondary_assessor": reverted_roles_dict.get("Secondary Assignees"),
@@ -190,11 +221,11 @@ class Revision(Base, db.Model):
     }
     exists_roles = {i["ac_role_id"] for i in access_control_list}
     for field, role_id in map_field_to_role.items():
-      if field not in self._content:
+      if field not in content:
         continue
       if role_id in exists_roles or role_id is None:
         continue
-      field_content = self._content.get(field) or {}
+      field_content = content.get(field) or {}
       if not field_content:
         continue
       if not isinstance(field_content, list):
@@ -225,23 +256,26 @@ class Revision(Base, db.Model):
         acl["person"] = {"id": acl.get("person_id"), "type": "Person"}
     return {"access_control_list": access_control_list}
 
-  def populate_folder(self):
+  def populate_folder(self, content=None):
     """Add folder info for older revisions."""
-    if "folder" in self._content:
+    content = self._content if content is None else content
+    if "folder" in content:
       return {}
-    folders = self._content.get("folders") or [{"id": ""}]
+    folders = content.get("folders") or [{"id": ""}]
     return {"folder": folders[0]["id"]}
 
-  def populate_labels(self):
+  def populate_labels(self, content=None):
     """Add labels info for older revisions."""
-    if "label" not in self._content:
+    content = self._content if content is None else content
+    if "label" not in content:
       return {}
-    label = self._content["label"]
+    label = content["label"]
     return {"labels": [{"id": None,
                         "name": label}]} if label else {"labels": []}
 
-  def populate_status(self):
+  def populate_status(self, content=None):
     """Update status for older revisions or add it if status does not exist."""
+    content = self._content if content is None else content
     pop_models = {
         # ggrc
         "AccessGroup",
@@ -276,10 +310,10 @@ class Revision(Base, db.Model):
         "Ineffective": "Active",
         "Launched": "Active",
     }
-    return {"status": statuses_mapping.get(self._content.get("status"),
+    return {"status": statuses_mapping.get(content.get("status"),
                                            "Draft")}
 
-  def _document_evidence_hack(self):
+  def _document_evidence_hack(self, content=None):
     """Update display_name on evideces
 
     Evidences have display names from links and titles, and until now they used
@@ -295,9 +329,10 @@ class Revision(Base, db.Model):
       dict with updated display name for each of the evidence entries if there
       are any.
     """
-    if "document_evidence" not in self._content:
+    content = self._content if content is None else content
+    if "document_evidence" not in content:
       return {}
-    document_evidence = self._content.get("document_evidence")
+    document_evidence = content.get("document_evidence")
     for evidence in document_evidence:
       evidence[u"display_name"] = u"{link} {title}".format(
           link=evidence.get("link"),
@@ -305,14 +340,15 @@ class Revision(Base, db.Model):
       ).strip()
     return {u"document_evidence": document_evidence}
 
-  def populate_categoies(self, key_name):
+  def populate_categoies(self, key_name, content=None):
     """Fix revision logger.
 
     On controls in category field was loged categorization instances."""
+    content = self._content if content is None else content
     if self.resource_type != "Control":
       return {}
     result = []
-    for categorization in self._content.get(key_name) or []:
+    for categorization in content.get(key_name) or []:
       if "category_id" in categorization:
         result.append({
             "id": categorization["category_id"],
@@ -324,33 +360,111 @@ class Revision(Base, db.Model):
         result.append(categorization)
     return {key_name: result}
 
-  def populate_cavs(self):
+  def populate_cavs(self, content=None):
     """Populate custom_attribute_values based on custom_attributes."""
-    if "custom_attributes" not in self._content:
+    content = self._content if content is None else content
+    if "custom_attributes" not in content:
       return {}
-    if "custom_attribute_values" in self._content:
+    if "custom_attribute_values" in content:
       return {}
-    return {"custom_attribute_values": self._content["custom_attributes"]}
+    return {"custom_attribute_values": content["custom_attributes"]}
+
+  def _get_memoized_content(self, roles_dicts=None):
+    """Get populated content, computing it if the saved content changed."""
+    memo = self._populated_content
+    if memo is None or memo[0] is not self._content:
+      memo = self._populated_content = (
+          self._content, self._populate_content(roles_dicts))
+    return memo[1]
+
+  def _populate_content(self, roles_dicts=None, content=None):
+    """Get the saved content dict updated by required values."""
+    content = self._content if content is None else content
+    populated_content = content.copy()
+    populated_content.update(self.populate_acl(roles_dicts, content))
+    populated_content.update(self.populate_reference_url(content))
+    populated_content.update(self.populate_folder(content))
+    populated_content.update(self.populate_labels(content))
+    populated_content.update(self.populate_status(content))
+    populated_content.update(self._document_evidence_hack(content))
+    populated_content.update(self.populate_categoies("categories", content))
+    populated_content.update(self.populate_categoies("assertions", content))
+    populated_content.update(self.populate_cavs(content))
+    return populated_content
 
   @builder.simple_property
   def content(self):
     """Property. Contains the revision content dict.
 
-    Updated by required values, generated from saved content dict."""
-    # pylint: disable=too-many-locals
-    populated_content = self._content.copy()
-    populated_content.update(self.populate_acl())
-    populated_content.update(self.populate_reference_url())
-    populated_content.update(self.populate_folder())
-    populated_content.update(self.populate_labels())
-    populated_content.update(self.populate_status())
-    populated_content.update(self._document_evidence_hack())
-    populated_content.update(self.populate_categoies("categories"))
-    populated_content.update(self.populate_categoies("assertions"))
-    populated_content.update(self.populate_cavs())
-    return populated_content
+    Updated by required values, generated from saved content dict. The
+    result is computed once for every value of the saved content."""
+    return self._get_memoized_content()
 
   @content.setter
   def content(self, value):
     """ Setter for content property."""
     self._content = value
+
+  @classmethod
+  def populate_contents(cls, revisions):
+    """Compute contents of revisions, resolving roles once per type.
+
+    Args:
+      revisions: list of revisions whose content is going to be read.
+    """
+    roles_dicts = {}
+    for revision in revisions:
+      resource_type = revision.resource_type
+      if resource_type not in roles_dicts:
+        roles_dicts[resource_type] = cls._get_roles_dicts(resource_type)
+      # pylint: disable=protected-access
+      revision._get_memoized_content(roles_dicts[resource_type])
+
+  @classmethod
+  def get_projected_contents(cls, revisions, keys):
+    """Get contents of revisions decoding only the required keys.
+
+    Saved contents that are not loaded are read without loading them into
+    the revisions, and only the given keys and keys read by populate methods
+    are decoded.
+
+    Args:
+      revisions: list of revisions, loaded without _content column;
+      keys: keys of contents that are going to be read.
+
+    Returns:
+      dict of populated contents by revision ids.
+    """
+    keys = cls.POPULATE_KEYS.union(keys)
+    not_loaded_ids = [revision.id for revision in revisions
+                      if "_content" not in sa.inspect(revision).dict]
+    saved_contents = {}
+    raw_content = sa.type_coerce(cls._content, sa.Text)
+    for ids in list_chunks(not_loaded_ids):
+      query = db.session.query(cls.id, raw_content).filter(cls.id.in_(ids))
+      saved_contents.update((id_, CompressedJsonType.loads(value, keys))
+                            for id_, value in query)
+
+    roles_dicts = {}
+    contents = {}
+    for revision in revisions:
+      resource_type = revision.resource_type
+      if resource_type not in roles_dicts:
+        roles_dicts[resource_type] = cls._get_roles_dicts(resource_type)
+      # pylint: disable=protected-access
+      if revision.id in saved_contents:
+        contents[revision.id] = revision._populate_content(
+            roles_dicts[resource_type], saved_contents[revision.id])
+      else:
+        contents[revision.id] = revision._get_memoized_content(
+            roles_dicts[resource_type])
+    return contents
+
+
+def _clear_populated_content(target, value, oldvalue, initiator):
+  """Drop memoized content of a revision when its saved content is set."""
+  # pylint: disable=unused-argument
+  target._populated_content = None  # pylint: disable=protected-access
+
+
+sa.event.listen(Revision._content, "set", _clear_populated_content)
@@ -286,24 +286,34 @@ def _insert_program_relationships(relationship_stubs):
   # and we can safely ignore it.
   inserter = relationship.Relationship.__table__.insert().prefix_with(
       "IGNORE")
-  db.session.execute(
-      inserter.values([
-          {
-              "id": None,
-              "modified_by_id": current_user_id,
-              "created_at": now,
-              "updated_at": now,
-              "source_type": relationship_stub.source_type,
-              "source_id": relationship_stub.source_id,
-              "destination_type": relationship_stub.destination_type,
-              "destination_id": relationship_stub.destination_id,
-              "context_id": None,
-              "status": None,
-              "parent_id": None
-          }
-          for relationship_stub in relationship_stubs
-      ])
-  )
+  from ggrc.models import relationship_cache
+  written = {
+      stub
+      for relationship_stub in relationship_stubs
+      for stub in (relationship.Stub(relationship_stub.source_type,
+                                     relationship_stub.source_id),
+                   relationship.Stub(relationship_stub.destination_type,
+                                     relationship_stub.destination_id))
+  }
+  with relationship_cache.declare_writes(written):
+    db.session.execute(
+        inserter.values([
+            {
+                "id": None,
+                "modified_by_id": current_user_id,
+                "created_at": now,
+                "updated_at": now,
+                "source_type": relationship_stub.source_type,
+                "source_id": relationship_stub.source_id,
+                "destination_type": relationship_stub.destination_type,
+                "destination_id": relationship_stub.destination_id,
+                "context_id": None,
+                "status": None,
+                "parent_id": None
+            }
+            for relationship_stub in relationship_stubs
+        ])
+    )
 
 
 def _set_latest_revisions(objects):
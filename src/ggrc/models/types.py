@@ -6,9 +6,13 @@
 Add Json and Compressed type declaration for use in ORM models.
 """
 
+import base64
 import json
 import pickle
+import zlib
+
 import sqlalchemy.types as types
+from ggrc import settings
 from ggrc import utils
 from ggrc.models import exceptions
 
@@ -39,6 +43,65 @@ class LongJsonType(types.TypeDecorator):
     return value
 
 
+class CompressedJsonType(LongJsonType):
+  # pylint: disable=W0223
+  """Custom Long Json data type with optional compression.
+
+  Dicts are stored as plain Json text, or, if the setting named by
+  compression_setting is "zlib", as COMPRESSED_TAG followed by base64 encoded
+  zlib compressed Json. The compressed Json maps keys of the dict to Json
+  encoded values, so that selected keys are decoded without parsing values of
+  the other keys. Values in both formats are read.
+  """
+  COMPRESSED_TAG = "zjson:"
+
+  def __init__(self, compression_setting, *args, **kwargs):
+    super(CompressedJsonType, self).__init__(*args, **kwargs)
+    self.compression_setting = compression_setting
+
+  @classmethod
+  def loads(cls, value, keys=None):
+    """Decode a stored value.
+
+    Args:
+      value: stored text in any of the supported formats;
+      keys: if given, only these keys of the stored dict are decoded and
+            returned, missing keys are skipped.
+    """
+    if value is None:
+      return None
+    if not value.startswith(cls.COMPRESSED_TAG):
+      value = json.loads(value)
+      if keys is not None:
+        value = {key: value[key] for key in keys if key in value}
+      return value
+    encoded = json.loads(zlib.decompress(
+        base64.b64decode(value[len(cls.COMPRESSED_TAG):])))
+    if keys is not None:
+      encoded = {key: encoded[key] for key in keys if key in encoded}
+    return {key: json.loads(val) for key, val in encoded.iteritems()}
+
+  @classmethod
+  def dumps(cls, value, compression=None):
+    """Encode a value in the format selected by compression."""
+    if compression != "zlib" or not isinstance(value, dict):
+      return utils.as_json(value)
+    encoded = utils.as_json({key: utils.as_json(val)
+                             for key, val in value.iteritems()})
+    return cls.COMPRESSED_TAG + base64.b64encode(zlib.compress(encoded))
+
+  def process_result_value(self, value, dialect):
+    return self.loads(value)
+
+  def process_bind_param(self, value, dialect):
+    if value is None or isinstance(value, basestring):
+      return value
+    value = self.dumps(value, getattr(settings, self.compression_setting))
+    if len(value.encode('utf-8')) > self.MAX_TEXT_LENGTH:
+      raise exceptions.ValidationError("Log record content too long")
+    return value
+
+
 class JsonType(types.TypeDecorator):
   # pylint: disable=W0223
   """ Custom Json data type
@@ -0,0 +1,173 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Index of objects related to people for My Work and dashboard queries.
+
+The user_object_index table holds a row for every (person, object) pair and
+every source that relates the person to the object: access control list
+entries with My Work roles, mappings through object_people, Map:Person custom
+attribute values and relationships with the person. Rows are refreshed on
+flush (see ggrc.models.hooks.user_object_index), code changing the sources
+with bulk statements has to call refresh, and rebuild recreates the whole
+index.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.sql.expression import tuple_
+
+from ggrc import db
+from ggrc.models import all_models
+from ggrc.utils import list_chunks
+
+
+# Sources of index rows
+ACL_SOURCE = "acl"
+OBJECT_PERSON_SOURCE = "object_person"
+CUSTOM_ATTRIBUTE_SOURCE = "custom_attribute"
+RELATIONSHIP_SOURCE = "relationship"
+
+
+class UserObjectIndex(db.Model):
+  """Object related to a person through the given source."""
+
+  __tablename__ = "user_object_index"
+
+  person_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  object_type = db.Column(db.String(250), primary_key=True)
+  object_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  source = db.Column(db.String(50), primary_key=True)
+
+
+def _source_selects(keys=None):
+  """Get selects of (person_id, object_type, object_id, source) rows.
+
+  Args:
+    keys: if given, only rows of these (person_id, object_type, object_id)
+          tuples are selected.
+  """
+  acl = all_models.AccessControlList.__table__
+  acr = all_models.AccessControlRole.__table__
+  object_people = all_models.ObjectPerson.__table__
+  cavs = all_models.CustomAttributeValue.__table__
+  relationships = all_models.Relationship.__table__
+
+  def select(columns, source, from_obj, *conditions):
+    """Select rows of a source with the key columns."""
+    if keys is not None:
+      conditions += (tuple_(*columns).in_(keys),)
+    query = sa.select(columns + [sa.literal(source)]).select_from(from_obj)
+    if conditions:
+      query = query.where(sa.and_(*conditions))
+    return query
+
+  return [
+      select([acl.c.person_id, acl.c.object_type, acl.c.object_id],
+             ACL_SOURCE,
+             acl.join(acr, acr.c.id == acl.c.ac_role_id),
+             acr.c.my_work == sa.true(),
+             acr.c.read == sa.true()),
+      select([object_people.c.person_id,
+              object_people.c.personable_type,
+              object_people.c.personable_id],
+             OBJECT_PERSON_SOURCE,
+             object_people),
+      select([cavs.c.attribute_object_id,
+              cavs.c.attributable_type,
+              cavs.c.attributable_id],
+             CUSTOM_ATTRIBUTE_SOURCE,
+             cavs,
+             cavs.c.attribute_value == "Person",
+             cavs.c.attribute_object_id.isnot(None)),
+      select([relationships.c.source_id,
+              relationships.c.destination_type,
+              relationships.c.destination_id],
+             RELATIONSHIP_SOURCE,
+             relationships,
+             relationships.c.source_type == "Person"),
+      select([relationships.c.destination_id,
+              relationships.c.source_type,
+              relationships.c.source_id],
+             RELATIONSHIP_SOURCE,
+             relationships,
+             relationships.c.destination_type == "Person"),
+  ]
+
+
+def _insert_from(selects):
+  """Get statement inserting index rows selected by selects."""
+  table = UserObjectIndex.__table__
+  return table.insert().from_select(
+      ["person_id", "object_type", "object_id", "source"],
+      sa.union(*selects),
+  )
+
+
+def refresh(session, keys):
+  """Recompute index rows of (person, object) pairs from their sources.
+
+  Args:
+    session: session or connection used to write the index;
+    keys: iterable of (person_id, object_type, object_id) tuples.
+  """
+  table = UserObjectIndex.__table__
+  keys = {key for key in keys if None not in key}
+  for chunk in list_chunks(sorted(keys)):
+    session.execute(table.delete().where(
+        tuple_(table.c.person_id, table.c.object_type,
+               table.c.object_id).in_(chunk)
+    ))
+    session.execute(_insert_from(_source_selects(chunk)))
+
+
+def get_person_value_keys(session, *conditions):
+  """Get keys of index rows of Map:Person values matching conditions.
+
+  Code deleting custom attribute values with bulk statements uses these keys
+  to refresh the index after the delete.
+  """
+  cavs = all_models.CustomAttributeValue
+  return set(session.query(
+      cavs.attribute_object_id, cavs.attributable_type, cavs.attributable_id,
+  ).filter(
+      cavs.attribute_value == "Person",
+      cavs.attribute_object_id.isnot(None),
+      *conditions
+  ))
+
+
+def get_acl_keys(session, *conditions):
+  """Get keys of index rows of access control list entries.
+
+  Code deleting access control list entries with bulk statements uses these
+  keys to refresh the index after the delete.
+  """
+  acl = all_models.AccessControlList
+  return set(session.query(
+      acl.person_id, acl.object_type, acl.object_id,
+  ).filter(*conditions))
+
+
+def rebuild():
+  """Recreate the whole index from its sources."""
+  db.session.execute(UserObjectIndex.__table__.delete())
+  db.session.execute(_insert_from(_source_selects()))
+  db.session.commit()
+
+
+def get_objects_query(contact_id, model_names, is_creator=False):
+  """Get query of (id, type, context_id) of objects related to a person.
+
+  Mappings through object_people are skipped for Creators, since being
+  mapped doesn't give them permissions to view the objects.
+  """
+  query = db.session.query(
+      UserObjectIndex.object_id.label("id"),
+      UserObjectIndex.object_type.label("type"),
+      sa.literal(None).label("context_id"),
+  ).filter(
+      UserObjectIndex.person_id == contact_id,
+      UserObjectIndex.object_type.in_(model_names),
+  )
+  if is_creator:
+    query = query.filter(UserObjectIndex.source != OBJECT_PERSON_SOURCE)
+  return query
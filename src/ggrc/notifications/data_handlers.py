@@ -22,6 +22,7 @@ from ggrc import db
 from ggrc import models
 from ggrc import notifications
 from ggrc import utils
+from ggrc.models import latest_revision
 from ggrc.models.comment import Commentable
 from ggrc.utils import DATE_FORMAT_US
 from ggrc.models.reflection import AttributeInfo
@@ -95,10 +96,7 @@ def _get_updated_roles(new_list, old_list, roles):
 
 def _get_revisions(obj, created_at):
   """Get current revision and revision before notification is created"""
-  new_rev = db.session.query(models.Revision) \
-      .filter_by(resource_id=obj.id, resource_type=obj.type) \
-      .order_by(models.Revision.id.desc()) \
-      .first()
+  new_rev = latest_revision.query_for([(obj.type, obj.id)]).first()
   old_rev = db.session.query(models.Revision) \
       .filter_by(resource_id=obj.id, resource_type=obj.type) \
       .filter(sa.and_(models.Revision.created_at < created_at,
@@ -16,9 +16,11 @@ from ggrc import db
 from ggrc import models
 from ggrc.models import inflector
 from ggrc.rbac import context_query_filter
+from ggrc.rbac import resource_query_filter
 from ggrc.utils import benchmark
 from ggrc.rbac import permissions
 from ggrc.query import custom_operators
+from ggrc.query import executor
 from ggrc.query import pagination
 from ggrc.query.exceptions import BadQueryException
 
@@ -44,6 +46,10 @@ class QueryHelper(object):
         }
       ]
       limit: [from, to] - limit the result list to a slice result[from, to]
+      cursor: optional; enables keyset pagination, null for the first page or
+              "next_cursor" value of the previous page; only the page size
+              of limit is used in this mode
+      total_mode: optional; "exact" or "cached", see pagination.apply_cursor
       filters: {
         relevant_filters:
           these filters will return all ids of the "search class name" object
@@ -73,6 +79,7 @@ class QueryHelper(object):
       object_name: search class name,
       (all other object query fields)
       ids: [ list of filtered objects ids ]
+      next_cursor: token for the next page (present if cursor was requested)
     }
   ]
 
@@ -90,6 +97,15 @@ class QueryHelper(object):
         object_query.get("filters", {}).get("expression"), ""
     )
 
+  def _get_target_class(self, object_query):
+    """Return the snapshotted model for Snapshots or the queried model."""
+    object_class = inflector.get_model(object_query["object_name"])
+    expression = object_query.get("filters", {}).get("expression")
+    if object_query["object_name"] == "Snapshot" and expression:
+      child_type = self._get_snapshot_child_type(object_query)
+      return getattr(models.all_models, child_type, object_class)
+    return object_class
+
   def _find_child_type(self, expr, child_type):
     """Search for child_type recursively down the query expression."""
     if child_type:
@@ -204,9 +220,11 @@ class QueryHelper(object):
     Returns:
       list of dicts: same query as the input with all ids that match the filter
     """
-    for object_query in self.query:
-      ids = self._get_ids(object_query)
-      object_query["ids"] = ids
+    def set_ids(object_query):
+      """Store ids matching the object query in it."""
+      object_query["ids"] = self._get_ids(object_query)
+
+    executor.execute(self.query, set_ids)
     return self.query
 
   @staticmethod
@@ -227,7 +245,8 @@ class QueryHelper(object):
     )
     if contexts is not None:
       return sa.or_(context_query_filter(model.context_id, contexts),
-                    model.id.in_(resources) if resources else sa.sql.false())
+                    resource_query_filter(model.id, resources,
+                                          model.__name__, permission_type))
     return sa.sql.true()
 
   def _get_objects(self, object_query):
@@ -261,11 +280,7 @@ class QueryHelper(object):
       return set()
     object_class = inflector.get_model(object_name)
     query = db.session.query(object_class.id)
-
-    tgt_class = object_class
-    if object_name == "Snapshot":
-      child_type = self._get_snapshot_child_type(object_query)
-      tgt_class = getattr(models.all_models, child_type, object_class)
+    tgt_class = self._get_target_class(object_query)
 
     requested_permissions = object_query.get("permissions", "read")
     with benchmark("Get permissions: _get_ids > _get_type_query"):
@@ -281,6 +296,17 @@ class QueryHelper(object):
       )
       if filter_expression is not None:
         query = query.filter(filter_expression)
+    if "cursor" in object_query:
+      with benchmark("Apply cursor: _get_ids > apply_cursor"):
+        ids, total, next_cursor = pagination.apply_cursor(
+            object_class,
+            query,
+            object_query,
+            tgt_class,
+        )
+      object_query["total"] = total
+      object_query["next_cursor"] = next_cursor
+      return ids
     if object_query.get("order_by"):
       with benchmark("Sorting: _get_ids > order_by"):
         query = pagination.apply_order_by(
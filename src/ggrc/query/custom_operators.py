@@ -14,6 +14,7 @@ from sqlalchemy.orm import load_only
 from ggrc import db
 from ggrc import models
 from ggrc.access_control.list import AccessControlList
+from ggrc.fulltext import get_indexer
 from ggrc.fulltext.mysql import MysqlRecordProperty as Record
 from ggrc.login import is_creator
 from ggrc.models import inflector
@@ -199,12 +200,14 @@ def text_search(exp, object_class, target_class, query):
 
   Returns:
     sqlalchemy.sql.elements.BinaryExpression if an object of `object_class`
-    has an indexed property that contains `text`.
+    has an indexed property that matches `text` according to the fulltext
+    indexer: contains it for MysqlIndexer or has all its words as prefixes
+    for MysqlFulltextIndexer.
   """
   return object_class.id.in_(
       db.session.query(Record.key).filter(
           Record.type == object_class.__name__,
-          Record.content.ilike(u"%{}%".format(exp['text'])),
+          get_indexer().get_content_filter(exp['text']),
       ),
   )
 
@@ -4,6 +4,9 @@
 """This module contains special query helper class for query API."""
 
 from ggrc.builder import json
+from ggrc.query import executor
+from ggrc.query import projection
+from ggrc.query import result_cache
 from ggrc.query.builder import QueryHelper
 from ggrc.models import inflector
 from ggrc.utils import benchmark
@@ -32,6 +35,10 @@ class DefaultHandler(QueryHelper):
       ids: [ ids of filtered objects ] (present if type is "ids")
       count: the number of objects filtered, after "limit" is applied
       total: the number of objects filtered, before "limit" is applied
+
+  "values" of queries with "fields" that are all plain columns or links to
+  related objects are built from selected columns only, see
+  ggrc.query.projection.
   """
 
   def get_results(self):
@@ -39,38 +46,67 @@ class DefaultHandler(QueryHelper):
 
     Updates self.query items with their results. The type of results required
     is read from "type" parameter of every object_query in self.query.
+    Independent object queries may be evaluated concurrently, see
+    ggrc.query.executor. Results of "ids" and "count" queries may come from
+    ggrc.query.result_cache.
 
     Returns:
       list of dicts: same query as the input with requested results that match
                      the filter.
     """
-    for object_query in self.query:
-      query_type = object_query.get("type", "values")
-      if query_type not in {"values", "ids", "count"}:
-        raise NotImplementedError("Only 'values', 'ids' and 'count' queries "
-                                  "are supported now")
-      model = inflector.get_model(object_query["object_name"])
-      if query_type == "values":
-        with benchmark("Get result set: get_results > _get_objects"):
-          objects = self._get_objects(object_query)
-        object_query["count"] = len(objects)
-        with benchmark("get_results > _get_last_modified"):
-          object_query["last_modified"] = self._get_last_modified(model,
-                                                                  objects)
-        with benchmark("serialization: get_results > _transform_to_json"):
-          object_query["values"] = self._transform_to_json(
-              objects,
-              object_query.get("fields"),
-          )
-      else:
-        with benchmark("Get result set: get_results -> _get_ids"):
-          ids = self._get_ids(object_query)
-        object_query["count"] = len(ids)
-        object_query["last_modified"] = None  # synonymous to now()
-        if query_type == "ids":
-          object_query["ids"] = ids
+    executor.execute(self.query, self._get_block_results)
     return self.query
 
+  def _get_block_results(self, object_query):
+    """Filter the objects of a single object query and get their info."""
+    query_type = object_query.get("type", "values")
+    if query_type not in {"values", "ids", "count"}:
+      raise NotImplementedError("Only 'values', 'ids' and 'count' queries "
+                                "are supported now")
+    model = inflector.get_model(object_query["object_name"])
+    if query_type == "values":
+      fields = object_query.get("fields")
+      values_plan = projection.get_plan(model, fields) if fields else None
+      if values_plan is not None:
+        self._get_projected_values(object_query, values_plan)
+        return
+      with benchmark("Get result set: get_results > _get_objects"):
+        objects = self._get_objects(object_query)
+      object_query["count"] = len(objects)
+      with benchmark("get_results > _get_last_modified"):
+        object_query["last_modified"] = self._get_last_modified(model,
+                                                                objects)
+      with benchmark("serialization: get_results > _transform_to_json"):
+        object_query["values"] = self._transform_to_json(
+            objects,
+            object_query.get("fields"),
+        )
+    else:
+      with benchmark("Get result set: get_results -> _get_ids"):
+        result_cache.evaluate(
+            object_query,
+            self._get_target_class(object_query),
+            self._get_ids_results,
+        )
+
+  def _get_projected_values(self, object_query, values_plan):
+    """Get "values" results selecting only columns of requested fields."""
+    with benchmark("Get result set: get_results > _get_ids"):
+      ids = self._get_ids(object_query)
+    with benchmark("projection: get_results > get_values"):
+      values, last_modified = projection.get_values(values_plan, ids)
+    object_query["count"] = len(values)
+    object_query["last_modified"] = last_modified
+    object_query["values"] = values
+
+  def _get_ids_results(self, object_query):
+    """Get results of an "ids" or "count" object query."""
+    ids = self._get_ids(object_query)
+    object_query["count"] = len(ids)
+    object_query["last_modified"] = None  # synonymous to now()
+    if object_query.get("type") == "ids":
+      object_query["ids"] = ids
+
   @staticmethod
   def _transform_to_json(objects, fields=None):
     """Make a JSON representation of objects from the list."""
@@ -0,0 +1,184 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Dependency aware executor for object blocks of /query API requests.
+
+Object blocks can reference results of previous blocks only through the
+"relevant" operator with "__previous__" object name. Blocks that don't
+depend on each other are evaluated concurrently, each in its own thread with
+its own request context, flask.g and database session (and so its own pooled
+connection).
+"""
+
+import copy
+import sys
+import threading
+import Queue
+
+import flask
+
+from ggrc import db
+from ggrc import settings
+from ggrc.rbac import permissions
+
+
+def _get_references(expression):
+  """Get indexes of blocks referenced by "__previous__" in expression."""
+  if not isinstance(expression, dict):
+    return set()
+  references = set()
+  if (expression.get("op", {}).get("name") == "relevant" and
+          expression.get("object_name") == "__previous__"):
+    references.update(expression.get("ids", [])[:1])
+  references.update(_get_references(expression.get("left")))
+  references.update(_get_references(expression.get("right")))
+  return references
+
+
+def get_dependencies(object_query):
+  """Get indexes of blocks that must be evaluated before object_query."""
+  expression = object_query.get("filters", {}).get("expression")
+  return _get_references(expression)
+
+
+def get_waves(query):
+  """Split query blocks into groups that can be evaluated concurrently.
+
+  Every group contains only blocks that depend on blocks of preceding
+  groups. If some block references itself, a following block or a block that
+  doesn't exist, every block gets its own group to keep the exact sequential
+  semantics of the original query.
+
+  Args:
+    query: list of object queries.
+
+  Returns:
+    list of lists of block indexes.
+  """
+  levels = []
+  for index, object_query in enumerate(query):
+    dependencies = get_dependencies(object_query)
+    if any(not isinstance(dep, int) or not 0 <= dep < index
+           for dep in dependencies):
+      return [[index] for index in range(len(query))]
+    levels.append(max([levels[dep] + 1 for dep in dependencies] or [0]))
+
+  waves = [[] for _ in range(max(levels or [-1]) + 1)]
+  for index, level in enumerate(levels):
+    waves[level].append(index)
+  return waves
+
+
+# Attributes of flask.g copied into the g of every worker. Other per-request
+# caches stored in g are built by every worker in its own g.
+_G_ATTRS = ("_request_permissions", "user_timezone_offset")
+
+
+def _merge_user(user):
+  """Get the user object in the session of the current thread."""
+  if isinstance(user, db.Model):
+    return db.session.merge(user, load=False)
+  return user
+
+
+def _in_request_context(func):
+  """Wrap func to run in a copy of the current request context in a thread.
+
+  Every worker gets its own request and app context and so its own flask.g,
+  which gets a copy of the attributes listed in _G_ATTRS, such as the loaded
+  permissions. The current user is merged into the separate session the
+  worker gets from db.session.
+  """
+  # pylint: disable=protected-access
+  request_ctx = flask._request_ctx_stack.top
+  app_ctx = flask._app_ctx_stack.top
+  g_values = {}
+  if app_ctx is not None:
+    g_values = copy.deepcopy({name: getattr(app_ctx.g, name)
+                              for name in _G_ATTRS
+                              if hasattr(app_ctx.g, name)})
+  g_user = getattr(app_ctx.g, "user", None) if app_ctx is not None else None
+  user = getattr(request_ctx, "user", None)
+
+  def wrapper(*args, **kwargs):
+    """Run func in new contexts and release the session afterwards."""
+    if request_ctx is not None:
+      ctx = request_ctx.copy()
+    elif app_ctx is not None:
+      ctx = app_ctx.app.app_context()
+    else:
+      return func(*args, **kwargs)
+    with ctx:
+      try:
+        for name, value in copy.deepcopy(g_values).iteritems():
+          setattr(flask.g, name, value)
+        if g_user is not None:
+          flask.g.user = _merge_user(g_user)
+        if user is not None:
+          flask._request_ctx_stack.top.user = _merge_user(user)
+        return func(*args, **kwargs)
+      finally:
+        db.session.remove()
+  return wrapper
+
+
+def _run_concurrently(blocks, run_block, max_workers):
+  """Run run_block for all blocks with at most max_workers threads."""
+  tasks = Queue.Queue()
+  for block in blocks:
+    tasks.put(block)
+  errors = []
+
+  @_in_request_context
+  def worker():
+    """Evaluate blocks until the task queue is empty."""
+    while not errors:
+      try:
+        block = tasks.get_nowait()
+      except Queue.Empty:
+        return
+      try:
+        run_block(block)
+      except Exception:  # pylint: disable=broad-except
+        errors.append(sys.exc_info())
+
+  threads = [threading.Thread(target=worker)
+             for _ in range(min(max_workers, len(blocks)))]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  if errors:
+    exc_type, exc_value, exc_trace = errors[0]
+    raise exc_type, exc_value, exc_trace
+
+
+def execute(query, run_block, max_workers=None):
+  """Evaluate all object blocks of a query.
+
+  Args:
+    query: list of object queries;
+    run_block: callable that evaluates a single object query and stores its
+               results in it;
+    max_workers: maximum number of concurrently evaluated blocks, defaults to
+                 QUERY_API_MAX_WORKERS setting; blocks are evaluated one by
+                 one in the calling thread if it is less than 2.
+  """
+  if max_workers is None:
+    max_workers = settings.QUERY_API_MAX_WORKERS
+  if max_workers < 2 or len(query) < 2:
+    for object_query in query:
+      run_block(object_query)
+    return
+
+  # Load the user and permissions into the request context before any worker
+  # starts, so that the workers don't race to do it.
+  permissions.has_system_wide_read()
+  permissions.permissions_for()
+
+  for wave in get_waves(query):
+    blocks = [query[index] for index in wave]
+    if len(blocks) == 1:
+      run_block(blocks[0])
+    else:
+      _run_concurrently(blocks, run_block, max_workers)
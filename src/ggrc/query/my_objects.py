@@ -10,9 +10,7 @@ from sqlalchemy import union
 from sqlalchemy import alias
 from ggrc import db
 from ggrc.models import all_models
-from ggrc.models.object_person import ObjectPerson
-from ggrc.models.relationship import Relationship
-from ggrc.models.custom_attribute_value import CustomAttributeValue
+from ggrc.models import user_object_index
 from ggrc_basic_permissions import backlog_workflows
 from ggrc_basic_permissions.models import UserRole
 from ggrc_workflows.models import Cycle
@@ -35,64 +33,6 @@ def _get_people():
   return all_people
 
 
-def _get_object_people(contact_id, model_names):
-  """Objects to which the user is 'mapped'."""
-  object_people_query = db.session.query(
-      ObjectPerson.personable_id.label('id'),
-      ObjectPerson.personable_type.label('type'),
-      literal(None).label('context_id')
-  ).filter(
-      and_(
-          ObjectPerson.person_id == contact_id,
-          ObjectPerson.personable_type.in_(model_names)
-      )
-  )
-  return object_people_query
-
-
-def _get_object_mapped_ca(contact_id, model_names):
-  """Objects to which the user is mapped via a custom attribute."""
-  ca_mapped_objects_query = db.session.query(
-      CustomAttributeValue.attributable_id.label('id'),
-      CustomAttributeValue.attributable_type.label('type'),
-      literal(None).label('context_id')
-  ).filter(
-      and_(
-          CustomAttributeValue.attribute_value == "Person",
-          CustomAttributeValue.attribute_object_id == contact_id,
-          CustomAttributeValue.attributable_type.in_(model_names)
-      )
-  )
-  return ca_mapped_objects_query
-
-
-def _get_objects_user_assigned(contact_id, model_names):
-  """Objects for which the user is assigned."""
-  dst_assignee_query = db.session.query(
-      Relationship.destination_id.label('id'),
-      Relationship.destination_type.label('type'),
-      literal(None).label('context_id'),
-  ).filter(
-      and_(
-          Relationship.source_type == "Person",
-          Relationship.source_id == contact_id,
-          Relationship.destination_type.in_(model_names)
-      ),
-  )
-  src_assignee_query = db.session.query(
-      Relationship.source_id.label('id'),
-      Relationship.source_type.label('type'),
-      literal(None).label('context_id'),
-  ).filter(
-      and_(
-          Relationship.destination_type == "Person",
-          Relationship.destination_id == contact_id,
-          Relationship.source_type.in_(model_names)
-      ),
-  )
-  return dst_assignee_query.union(src_assignee_query)
-
-
 def _get_results_by_context(contact_id, model):
   """Objects based on the context of the current model.
 
@@ -112,27 +52,6 @@ def _get_results_by_context(contact_id, model):
   return context_query
 
 
-def _get_custom_roles(contact_id, model_names):
-  """Objects for which the user is an 'owner'."""
-  custom_roles_query = db.session.query(
-      all_models.AccessControlList.object_id.label('id'),
-      all_models.AccessControlList.object_type.label('type'),
-      literal(None).label('context_id')
-  ).join(
-      all_models.AccessControlRole,
-      all_models.AccessControlList.ac_role_id ==
-      all_models.AccessControlRole.id
-  ).filter(
-      and_(
-          all_models.AccessControlList.person_id == contact_id,
-          all_models.AccessControlList.object_type.in_(model_names),
-          all_models.AccessControlRole.my_work == true(),
-          all_models.AccessControlRole.read == true()
-      )
-  )
-  return custom_roles_query
-
-
 def get_myobjects_query(types=None, contact_id=None, is_creator=False):  # noqa
   """Filters by "myview" for a given person.
 
@@ -208,16 +127,10 @@ def get_myobjects_query(types=None, contact_id=None, is_creator=False):  # noqa
       model_type_query = _get_tasks_in_cycle(model)
     return model_type_query
 
-  # Note: We don't return mapped objects for the Creator because being mapped
-  # does not give the Creator necessary permissions to view the object.
-  if not is_creator:
-    type_union_queries.append(_get_object_people(contact_id, model_names))
-
-  type_union_queries.extend((
-      _get_object_mapped_ca(contact_id, model_names),
-      _get_objects_user_assigned(contact_id, model_names),
-      _get_custom_roles(contact_id, model_names),
-  ))
+  # Objects related through people mappings, custom attributes, assignments
+  # and custom roles are read from the maintained user_object_index.
+  type_union_queries.append(user_object_index.get_objects_query(
+      contact_id, model_names, is_creator))
 
   for model in type_models:
     query = _get_model_specific_query(model)
@@ -3,6 +3,10 @@
 
 """Pagination helpers module for query generation."""
 
+import base64
+import datetime
+import json
+
 import sqlalchemy as sa
 
 from ggrc import models
@@ -51,18 +55,18 @@ def apply_limit(query, limit):
   return limit_query, total
 
 
-def _joins_and_order(counter, clause, model, tgt_class):
-  """Get join operations and ordering field from item of order_by list.
+def _joins_and_column(counter, clause, model, tgt_class):
+  """Get join operations and ordering column from item of order_by list.
 
   Args:
     clause: {"name": the name of model's field,
               "desc": reverse sort on this field if True}
 
   Returns:
-    ([joins], order) - a tuple of joins required for this ordering to work
-                        and ordering clause itself; join is None if no join
-                        required or [(aliased entity, relationship field)]
-                        if joins required.
+    ([joins], column) - a tuple of joins required for this ordering to work
+                         and the column to order by; join is None if no join
+                         required or [(aliased entity, relationship field)]
+                         if joins required.
   """
 
   def by_fulltext():
@@ -106,9 +110,14 @@ def _joins_and_order(counter, clause, model, tgt_class):
     # Snapshot or non object attributes are treated as custom attributes
     joins, order = by_fulltext()
 
+  return joins, order
+
+
+def _joins_and_order(counter, clause, model, tgt_class):
+  """Get join operations and ordering clause from item of order_by list."""
+  joins, order = _joins_and_column(counter, clause, model, tgt_class)
   if clause.get("desc", False):
     order = order.desc()
-
   return joins, order
 
 
@@ -146,3 +155,191 @@ def apply_order_by(model, query, order_by, tgt_class):
     query = query.outerjoin(*join_list)
 
   return query.order_by(*orders)
+
+
+CURSOR_TOTAL_MODES = ("exact", "cached")
+
+_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+_DATE_FORMAT = "%Y-%m-%d"
+
+
+def _encode_cursor_value(value):
+  """Make a JSON serializable representation of an ordering value."""
+  if isinstance(value, datetime.datetime):
+    return {"datetime": value.strftime(_DATETIME_FORMAT)}
+  if isinstance(value, datetime.date):
+    return {"date": value.strftime(_DATE_FORMAT)}
+  return value
+
+
+def _decode_cursor_value(value):
+  """Restore an ordering value encoded with _encode_cursor_value."""
+  if isinstance(value, dict):
+    if "datetime" in value:
+      return datetime.datetime.strptime(value["datetime"], _DATETIME_FORMAT)
+    if "date" in value:
+      return datetime.datetime.strptime(value["date"], _DATE_FORMAT).date()
+    raise ValueError("Unknown cursor value")
+  return value
+
+
+def _order_signature(order_by):
+  """Get a hashable description of ordering that a cursor is valid for."""
+  return [[clause["name"].lower(), bool(clause.get("desc", False))]
+          for clause in order_by]
+
+
+def encode_cursor(order_by, values, total=None):
+  """Build an opaque continuation token.
+
+  Args:
+    order_by: order_by list of the object query the token is issued for;
+    values: values of the ordering columns and the id of the last row on the
+            page;
+    total: total count of objects to be reused for the following pages.
+
+  Returns:
+    url-safe string that can be passed as "cursor" to get the next page.
+  """
+  payload = {
+      "order": _order_signature(order_by),
+      "values": [_encode_cursor_value(value) for value in values],
+      "total": total,
+  }
+  return base64.urlsafe_b64encode(json.dumps(payload))
+
+
+def decode_cursor(order_by, cursor):
+  """Get the last row values and cached total from a continuation token.
+
+  Args:
+    order_by: order_by list of the current object query;
+    cursor: token returned by encode_cursor.
+
+  Returns:
+    (values, total) - ordering values of the last returned row and the total
+                      count stored in the token (or None).
+  """
+  try:
+    payload = json.loads(base64.urlsafe_b64decode(str(cursor)))
+    values = [_decode_cursor_value(value) for value in payload["values"]]
+    token_order = payload["order"]
+    total = payload.get("total")
+  except (TypeError, ValueError, KeyError):
+    raise BadQueryException("Invalid cursor.")
+  if (token_order != _order_signature(order_by) or
+          len(values) != len(order_by) + 1):
+    raise BadQueryException("Cursor does not match the requested ordering.")
+  return values, total
+
+
+def _after_value(column, desc, value):
+  """Get condition for column values placed after value in sort order.
+
+  MySQL puts NULLs first in ascending order and last in descending order.
+  """
+  if value is None:
+    return sa.sql.false() if desc else column.isnot(None)
+  if desc:
+    return sa.or_(column < value, column.is_(None))
+  return column > value
+
+
+def _equal_value(column, value):
+  """Get condition for column values equal to value."""
+  if value is None:
+    return column.is_(None)
+  return column == value
+
+
+def seek_predicate(columns, values):
+  """Get filter for rows strictly following the given row in sort order.
+
+  Args:
+    columns: list of (column, desc) pairs the query is ordered by, the last
+             one must be unique for the model (usually id);
+    values: list of the column values of the last seen row.
+
+  Returns:
+    sqlalchemy clause equal to lexicographic "(columns) > (values)" that takes
+    per-column sort direction into account.
+  """
+  clauses = []
+  equal_prefix = []
+  for (column, desc), value in zip(columns, values):
+    clauses.append(sa.and_(*(equal_prefix +
+                             [_after_value(column, desc, value)])))
+    equal_prefix.append(_equal_value(column, value))
+  return sa.or_(*clauses)
+
+
+def apply_cursor(model, query, object_query, tgt_class):
+  """Get a page of ids using keyset (seek) pagination.
+
+  Unlike apply_limit this does not use OFFSET, so fetching deep pages costs
+  the same as fetching the first one. The query is always ordered by id as
+  the last ordering column to make the order total.
+
+  Args:
+    model: the model instances of which are requested in query;
+    query: filter query;
+    object_query: object query block with the following keys:
+        "cursor": token from a previous page or None for the first page;
+        "limit": [from, to] - only the page size (to - from) is used;
+        "order_by": optional ordering as in apply_order_by;
+        "total_mode": "exact" (default) recounts matching objects on every
+                      page, "cached" counts them only for the first page and
+                      carries the result in the token;
+    tgt_class: the snapshotted model if `model` is Snapshot else `model`.
+
+  Returns:
+    (ids, total, next_cursor) - page of ids, total count of matched objects
+                                and the token for the next page or None if
+                                this is the last page.
+  """
+  order_by = object_query.get("order_by") or []
+  limit = object_query.get("limit")
+  if not limit:
+    raise BadQueryException("Limit is required for cursor pagination.")
+  page_size, _ = _get_limit(limit)
+  total_mode = object_query.get("total_mode", "exact")
+  if total_mode not in CURSOR_TOTAL_MODES:
+    raise BadQueryException(u"Invalid total_mode: {}".format(total_mode))
+
+  values, total = None, None
+  if object_query.get("cursor"):
+    values, total = decode_cursor(order_by, object_query["cursor"])
+
+  if total is None or total_mode == "exact":
+    with benchmark("Apply cursor: apply_cursor > query_count"):
+      total = query.count()
+
+  columns = []
+  for counter, clause in enumerate(order_by):
+    joins, column = _joins_and_column(counter, clause, model, tgt_class)
+    if joins is not None:
+      query = query.outerjoin(*joins)
+    columns.append((column, clause.get("desc", False)))
+  columns.append((model.id, False))
+
+  query = query.add_columns(*[column for column, _ in columns[:-1]])
+  if values is not None:
+    query = query.filter(seek_predicate(columns, values))
+  query = query.order_by(*[column.desc() if desc else column
+                           for column, desc in columns])
+
+  with benchmark("Apply cursor: apply_cursor > query_page"):
+    # one extra row tells whether there is a next page
+    rows = query.limit(page_size + 1).all()
+
+  next_cursor = None
+  if len(rows) > page_size:
+    rows = rows[:page_size]
+    last_row = rows[-1]
+    last_values = list(last_row[1:]) + [last_row[0]]
+    next_cursor = encode_cursor(
+        order_by,
+        last_values,
+        total if total_mode == "cached" else None,
+    )
+  return [row[0] for row in rows], total, next_cursor
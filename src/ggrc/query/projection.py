@@ -0,0 +1,178 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Projection planner for "values" queries with an explicit list of fields.
+
+When every requested field is published as a plain column value or as a
+simple stub of a related object, the values can be built directly from the
+selected columns without loading full model objects and publishing all of
+their attributes. The result is equal to publishing the objects with
+ggrc.builder.json and picking the requested fields from it.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm.properties import ColumnProperty
+from sqlalchemy.orm.properties import RelationshipProperty
+
+from ggrc import db
+from ggrc.builder import json
+from ggrc.utils import url_for
+from ggrc.utils import view_url_for
+
+
+_plans = {}
+
+
+class ValuesPlan(object):
+  """Columns to select and per-field getters building values from rows."""
+  # pylint: disable=too-few-public-methods
+
+  def __init__(self, model):
+    self.model = model
+    self.columns = [model.id]
+    self.getters = []
+    self.last_modified_index = None
+    if hasattr(model, "updated_at"):
+      self.last_modified_index = self.add_column(model.updated_at)
+
+  def add_column(self, column):
+    """Add column to the selected ones and return its index in a row."""
+    self.columns.append(column)
+    return len(self.columns) - 1
+
+
+def _has_custom_publish(model, attr_name):
+  """Check if the attribute is published by a custom function."""
+  if attr_name in getattr(model, "_custom_publish", {}):
+    return True
+  return any(attr_name in getattr(base, "_custom_publish", {})
+             for base in model.__bases__)
+
+
+def _get_model_column(model, columns):
+  """Get the only column of a property if it is stored in model tables."""
+  if len(columns) != 1 or not isinstance(columns[0], sa.Column):
+    return None
+  if columns[0].table not in model.__mapper__.tables:
+    return None
+  return columns[0]
+
+
+def _column_getter(index):
+  return lambda row: row[index]
+
+
+def _stub_getter(target_type, index):
+  """Get a getter of a stub that is rendered by publish_representation."""
+  def getter(row):
+    if row[index] is None:
+      return None
+    return json.LazyStubRepresentation(target_type, row[index])
+  return getter
+
+
+def _add_attr(plan, builder, attr_name):
+  """Add getter for a published attribute to the plan.
+
+  Returns:
+    False if the attribute can't be built from model columns.
+  """
+  # pylint: disable=protected-access
+  model = plan.model
+  if _has_custom_publish(model, attr_name):
+    return False
+  class_attr = getattr(model, attr_name, None)
+  if not isinstance(class_attr, InstrumentedAttribute):
+    return False
+  prop = class_attr.property
+
+  if isinstance(prop, ColumnProperty):
+    column = _get_model_column(model, prop.columns)
+    if column is None:
+      return False
+    plan.getters.append((attr_name, _column_getter(plan.add_column(column))))
+    return True
+
+  if isinstance(prop, RelationshipProperty):
+    included = attr_name in builder._include_links
+    if (prop.uselist or included or
+            prop.mapper.class_.__mapper__.polymorphic_on is not None):
+      return False
+    column = _get_model_column(model, list(prop.local_columns))
+    if column is None:
+      return False
+    plan.getters.append((attr_name, _stub_getter(
+        prop.mapper.class_.__name__, plan.add_column(column))))
+    return True
+
+  return False
+
+
+def _build_plan(model, fields):
+  """Build a values plan or return None if some field needs publishing."""
+  # pylint: disable=protected-access
+  if model.__mapper__.polymorphic_on is not None:
+    return None
+  builder = json.get_json_builder(model)
+  published = {
+      "access_control_list" if attr == "filtered_access_control_list"
+      else attr
+      for attr in builder._publish_attrs
+  }
+  model_name = model.__name__
+  plan = ValuesPlan(model)
+  for field in fields:
+    if field == "type" and "type" in published:
+      plan.getters.append((field, lambda row: model_name))
+    elif field == "selfLink":
+      plan.getters.append(
+          (field, lambda row: url_for(model_name, id=row[0]) or None))
+    elif field == "viewLink":
+      plan.getters.append(
+          (field, lambda row: view_url_for(model_name, id=row[0]) or None))
+    elif field not in published:
+      plan.getters.append((field, lambda row: None))
+    elif field == "access_control_list" or not _add_attr(plan, builder,
+                                                         field):
+      return None
+  return plan
+
+
+def get_plan(model, fields):
+  """Get a cached values plan for the model and requested fields.
+
+  Returns:
+    ValuesPlan or None if any of the fields requires full publishing.
+  """
+  key = (model, tuple(fields))
+  if key not in _plans:
+    _plans[key] = _build_plan(model, fields)
+  return _plans[key]
+
+
+def get_values(plan, ids):
+  """Get JSON values for objects with given ids using a values plan.
+
+  Args:
+    plan: ValuesPlan for the requested model and fields;
+    ids: ordered list of object ids.
+
+  Returns:
+    (values, last_modified) - list of dicts with requested fields in the
+                              order of ids and the latest updated_at value.
+  """
+  if not ids:
+    return [], None
+  rows = db.session.query(*plan.columns).filter(plan.model.id.in_(ids))
+  rows_by_id = {row[0]: row for row in rows}
+  ordered_rows = [rows_by_id[id_] for id_ in ids if id_ in rows_by_id]
+
+  values = [{field: getter(row) for field, getter in plan.getters}
+            for row in ordered_rows]
+  values = json.publish_representation(values)
+
+  last_modified = None
+  if plan.last_modified_index is not None and ordered_rows:
+    last_modified = max(row[plan.last_modified_index] for row in ordered_rows)
+  return values, last_modified
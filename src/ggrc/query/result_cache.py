@@ -0,0 +1,412 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Cache for results of "count" and "ids" object blocks of /query API.
+
+Results are kept in a per-process LRU cache, keyed by the normalized object
+query and a fingerprint of the permissions of the current user, so users with
+equal permissions share entries.
+
+Every cache entry remembers change stamps of the tables the block depends on.
+A stamp of a table is bumped when a transaction that wrote to the table is
+committed, so entries computed before the commit don't match current stamps
+anymore. Writes are detected at the SQL statement level, which covers ORM
+flushes as well as bulk statements executed directly. Stamps are kept in
+memcache when MEMCACHE_MECHANISM is enabled and in process memory otherwise;
+the entry TTL limits staleness in the latter case for changes made by other
+processes.
+"""
+
+import collections
+import copy
+import hashlib
+import json
+import random
+import re
+import threading
+
+import flask
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm.session import Session
+
+from ggrc import login
+from ggrc import settings
+from ggrc.models import inflector
+from ggrc.query import custom_operators
+from ggrc.query import executor
+from ggrc.rbac import permissions
+from ggrc.rbac import SystemWideRoles
+from ggrc.utils import structures
+
+
+CACHED_QUERY_TYPES = {"count", "ids"}
+
+RESULT_FIELDS = ("ids", "count", "total", "next_cursor", "last_modified")
+
+# Stamp bumped by every committed write. Blocks that can depend on arbitrary
+# tables depend on this stamp.
+ANY_TABLE = "*"
+
+# Stamp bumped by committed writes whose target table is not known. Every
+# block depends on this stamp.
+UNKNOWN_TABLE = "?"
+
+FULLTEXT_TABLE = "fulltext_record_properties"
+
+STAMP_KEY_PREFIX = "query_cache:stamp:"
+
+# Operators that only read the model table and the fulltext index.
+_FIELD_OPERATORS = {
+    "AND", "OR", "IN", "=", "!=", "~", "!~", "<", ">", "<=", ">=", "is",
+    "text_search",
+}
+
+_WRITE_STATEMENT = re.compile(
+    r"^\s*(?P<verb>INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE|"
+    r"DELETE\s+FROM)\s+`?(?P<table>\w+)`?",
+    re.IGNORECASE,
+)
+_READ_STATEMENT = re.compile(
+    r"^\s*(?:SELECT|SHOW|DESCRIBE|EXPLAIN|SET|SAVEPOINT|RELEASE|ROLLBACK|"
+    r"COMMIT|BEGIN)\b",
+    re.IGNORECASE,
+)
+# UPDATE and DELETE statements that can write to several tables.
+_MULTI_TABLE_WRITE = re.compile(r"^\s*,|\bJOIN\b|\bUSING\b",
+                                re.IGNORECASE)
+
+
+_results = None
+_results_lock = threading.Lock()
+_stats = collections.Counter()
+
+
+def is_enabled():
+  return settings.QUERY_RESULT_CACHE_TTL > 0
+
+
+def _get_results():
+  """Get the process level LRU cache for query results."""
+  global _results  # pylint: disable=global-statement
+  with _results_lock:
+    if _results is None:
+      _results = structures.LRUCache(settings.QUERY_RESULT_CACHE_SIZE,
+                                     ttl=settings.QUERY_RESULT_CACHE_TTL)
+    return _results
+
+
+class LocalStamps(object):
+  """Change stamps stored in process memory.
+
+  With max_size, only stamps of max_size most recently bumped names are
+  kept. Stamps of forgotten names are replaced by the highest forgotten
+  stamp, so a stamp of a name never returns to a value some entry could
+  have been stored with.
+  """
+
+  def __init__(self, max_size=None):
+    self.max_size = max_size
+    self._stamps = collections.OrderedDict()
+    self._floor = 0
+    self._counter = 0
+    self._lock = threading.Lock()
+
+  def get(self, names):
+    with self._lock:
+      return tuple(self._stamps.get(name, self._floor) for name in names)
+
+  def bump(self, names):
+    with self._lock:
+      for name in names:
+        self._counter += 1
+        self._stamps.pop(name, None)
+        self._stamps[name] = self._counter
+      while self.max_size and len(self._stamps) > self.max_size:
+        _, stamp = self._stamps.popitem(last=False)
+        self._floor = max(self._floor, stamp)
+
+
+def _new_stamp():
+  """Get a random initial value of a stamp stored in memcache.
+
+  Entries can be stored with stamps that get evicted from memcache later, so
+  missing stamps never start from a fixed value.
+  """
+  return random.getrandbits(62)
+
+
+class MemcacheStamps(object):
+  """Change stamps shared between processes through memcache."""
+
+  def __init__(self, client):
+    self.client = client
+
+  def get(self, names):
+    names = list(names)
+    values = self.client.get_multi(names, key_prefix=STAMP_KEY_PREFIX) or {}
+    missing = [name for name in names if name not in values]
+    initial = None
+    if missing:
+      initial = _new_stamp()
+      self.client.add_multi({name: initial for name in missing},
+                            key_prefix=STAMP_KEY_PREFIX)
+      values.update(self.client.get_multi(
+          missing, key_prefix=STAMP_KEY_PREFIX) or {})
+    # A stamp that can't be stored doesn't match any later stamp
+    return tuple(values.get(name, initial) for name in names)
+
+  def bump(self, names):
+    self.client.offset_multi({name: 1 for name in names},
+                             key_prefix=STAMP_KEY_PREFIX,
+                             initial_value=_new_stamp())
+
+
+_local_stamps = LocalStamps()
+
+
+def get_stamps_store(local_stamps=None):
+  """Get storage of change stamps for the current settings.
+
+  Args:
+    local_stamps: LocalStamps used when memcache is disabled, stamps of
+                  tables are used by default.
+  """
+  if getattr(settings, "MEMCACHE_MECHANISM", False):
+    from ggrc.services.common import _get_cache_manager
+    return MemcacheStamps(_get_cache_manager().cache_object.memcache_client)
+  if local_stamps is None:
+    return _local_stamps
+  return local_stamps
+
+
+def get_written_tables(statement):
+  """Get names of tables written by an SQL statement.
+
+  Args:
+    statement: SQL statement string.
+
+  Returns:
+    set of table names, empty set for statements that don't write and
+    {UNKNOWN_TABLE} if written tables could not be determined.
+  """
+  match = _WRITE_STATEMENT.match(statement)
+  if match:
+    verb = match.group("verb").upper()
+    if (verb.startswith(("UPDATE", "DELETE")) and
+            _MULTI_TABLE_WRITE.search(statement[match.end():])):
+      return {UNKNOWN_TABLE}
+    return {match.group("table").lower()}
+  if _READ_STATEMENT.match(statement):
+    return set()
+  return {UNKNOWN_TABLE}
+
+
+class PendingStamps(object):
+  """Names of stamps written in every thread since its last commit."""
+
+  def __init__(self, get_store):
+    self._get_store = get_store
+    self._local = threading.local()
+
+  def get(self):
+    """Get the set of pending stamp names of the current thread."""
+    if not hasattr(self._local, "names"):
+      self._local.names = set()
+    return self._local.names
+
+  def bump(self, clear):
+    """Bump pending stamps of the current thread."""
+    names = self.get()
+    if names:
+      self._get_store().bump(names)
+      if clear:
+        names.clear()
+
+  def clear(self):
+    self.get().clear()
+
+
+_pending = PendingStamps(get_stamps_store)
+
+
+def register_result_cache_listeners():
+  """Track writes to keep table change stamps current.
+
+  Stamps are bumped both right before and right after a commit. A block that
+  is evaluated during the commit captures the stamps before it runs its
+  queries, so its result gets stale as soon as the second bump happens.
+  """
+  # pylint: disable=unused-argument,unused-variable
+
+  @event.listens_for(Engine, "before_cursor_execute")
+  def collect_written_tables(conn, cursor, statement, parameters, context,
+                             executemany):
+    """Remember tables written by the statement until commit."""
+    if is_enabled():
+      tables = get_written_tables(statement)
+      if tables:
+        _pending.get().update(tables | {ANY_TABLE})
+
+  @event.listens_for(Engine, "commit")
+  def bump_before_commit(conn):
+    if is_enabled():
+      _pending.bump(clear=False)
+
+  @event.listens_for(Session, "after_commit")
+  def bump_after_commit(session):
+    if is_enabled():
+      _pending.bump(clear=True)
+
+  @event.listens_for(Session, "after_rollback")
+  def forget_rolled_back(session):
+    _pending.clear()
+
+
+def _filters_fields_only(expression, tgt_class):
+  """Check if expression filters only by model columns or indexed fields."""
+  if not expression:
+    return True
+  if not isinstance(expression, dict):
+    return False
+  name = expression.get("op", {}).get("name")
+  if name not in _FIELD_OPERATORS:
+    return False
+  if name in ("AND", "OR"):
+    return (_filters_fields_only(expression.get("left"), tgt_class) and
+            _filters_fields_only(expression.get("right"), tgt_class))
+  left = expression.get("left")
+  if isinstance(left, basestring):
+    key = left.lower()
+    _, filter_by = tgt_class.attributes_map().get(key, (key, None))
+    if callable(filter_by):
+      return False
+  return True
+
+
+def _orders_by_fields_only(model, order_by):
+  """Check if ordering doesn't join related models."""
+  for clause in order_by or []:
+    key = clause.get("name", "").lower()
+    if key not in custom_operators.GETATTR_WHITELIST:
+      continue
+    attr = getattr(model, key.encode("utf-8"), None)
+    if isinstance(getattr(attr, "property", None),
+                  sa.orm.properties.RelationshipProperty):
+      return False
+  return True
+
+
+def get_dependencies(object_query, tgt_class):
+  """Get names of stamps the results of an object query depend on.
+
+  Args:
+    object_query: object query block;
+    tgt_class: the snapshotted model for Snapshot queries, the queried model
+               otherwise.
+
+  Returns:
+    tuple of stamp names or None if results of the block can't be cached.
+  """
+  if object_query.get("type", "values") not in CACHED_QUERY_TYPES:
+    return None
+  if executor.get_dependencies(object_query):
+    # results depend on results of other blocks
+    return None
+  model = inflector.get_model(object_query["object_name"])
+  if model is None:
+    return None
+  expression = object_query.get("filters", {}).get("expression")
+  if (_filters_fields_only(expression, tgt_class) and
+          _orders_by_fields_only(model, object_query.get("order_by"))):
+    tables = {model.__table__.name, FULLTEXT_TABLE}
+  else:
+    tables = {ANY_TABLE}
+  return tuple(sorted(tables | {UNKNOWN_TABLE}))
+
+
+def _get_permissions_fingerprint():
+  """Get a digest of everything that affects permission filters.
+
+  The digest is computed once per request.
+  """
+  fingerprint = getattr(flask.g, "_query_cache_fingerprint", None)
+  if fingerprint is None:
+    user = login.get_current_user()
+    role = getattr(user, "system_wide_role", SystemWideRoles.NO_ACCESS)
+    # pylint: disable=protected-access
+    user_permissions = permissions.permissions_for()._permissions()
+    fingerprint = hashlib.md5(json.dumps(
+        [role, user_permissions],
+        sort_keys=True,
+        default=lambda value: sorted(value) if isinstance(value, set)
+        else unicode(value),
+    )).hexdigest()
+    flask.g._query_cache_fingerprint = fingerprint
+  return fingerprint
+
+
+def get_key(object_query):
+  """Get a cache key for an object query and the current user."""
+  normalized = json.dumps(
+      {key: value for key, value in object_query.iteritems()
+       if key not in RESULT_FIELDS},
+      sort_keys=True,
+      default=unicode,
+  )
+  return "query:{}:{}".format(_get_permissions_fingerprint(),
+                              hashlib.md5(normalized).hexdigest())
+
+
+def evaluate(object_query, tgt_class, run_block):
+  """Evaluate an object block, reusing cached results when possible.
+
+  Args:
+    object_query: object query block;
+    tgt_class: the snapshotted model for Snapshot queries, the queried model
+               otherwise;
+    run_block: callable that evaluates the block and stores results in it.
+  """
+  dependencies = get_dependencies(object_query, tgt_class)
+  if not is_enabled() or dependencies is None:
+    run_block(object_query)
+    return
+
+  key = get_key(object_query)
+  stamps = get_stamps_store().get(dependencies)
+  results = _get_results()
+  entry = results.get(key)
+  if entry is not None and entry[0] == stamps:
+    _stats["hits"] += 1
+    object_query.update(copy.deepcopy(entry[1]))
+    return
+
+  _stats["misses" if entry is None else "stale"] += 1
+  run_block(object_query)
+  results.set(key, (stamps, {
+      field: copy.deepcopy(object_query[field])
+      for field in RESULT_FIELDS if field in object_query
+  }))
+
+
+def get_stats():
+  """Get hit and miss counters of the result cache.
+
+  Returns:
+    dict with "hits", "misses" and "stale" lookup counters and "size" and
+    "evictions" of the LRU cache.
+  """
+  lru_stats = _get_results().stats()
+  return {
+      "hits": _stats["hits"],
+      "misses": _stats["misses"],
+      "stale": _stats["stale"],
+      "size": lru_stats["size"],
+      "evictions": lru_stats["evictions"],
+  }
+
+
+def clear():
+  """Drop all cached results."""
+  _get_results().clear()
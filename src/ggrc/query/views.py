@@ -14,6 +14,8 @@ from werkzeug.exceptions import BadRequest
 from ggrc.query.exceptions import BadQueryException
 from ggrc.query.default_handler import DefaultHandler
 from ggrc.query.assessment_related_objects import AssessmentRelatedObjects
+from ggrc.query import result_cache
+from ggrc.login import admin_required
 from ggrc.login import login_required
 from ggrc.models.inflector import get_model
 from ggrc.services.common import etag
@@ -97,7 +99,8 @@ def get_objects_by_query():
                         if result["last_modified"]]
   last_modified = max(last_modified_list) if last_modified_list else None
   collections = []
-  collection_fields = ["ids", "values", "count", "total", "object_name"]
+  collection_fields = ["ids", "values", "count", "total", "object_name",
+                       "next_cursor"]
 
   for result in results:
     model = get_model(result["object_name"])
@@ -124,3 +127,10 @@ def init_query_views(app):
       return get_objects_by_query()
     except (NotImplementedError, BadQueryException) as exc:
       raise BadRequest(exc.message)
+
+  @app.route('/query/cache_stats', methods=['GET'])
+  @login_required
+  @admin_required
+  def query_cache_stats():
+    """Hit and miss counters of the query result cache."""
+    return json_success_response(result_cache.get_stats())
@@ -4,6 +4,10 @@
 """Basic permissions module."""
 
 from sqlalchemy import or_
+from sqlalchemy import true
+from sqlalchemy.sql import false
+
+from ggrc import settings
 
 
 class SystemWideRoles(object):
@@ -64,3 +68,49 @@ def context_query_filter(context_column, contexts):
       # No valid contexts
       return False
     return filter_expr
+
+
+def resource_query_filter(id_column, resources, model_name,
+                          permission_type='read'):
+  """Get a filter of objects with ids in resources.
+
+  Resources are objects for which the user has access control list entries.
+  Lists of up to PERMISSION_RESOURCES_INLINE_LIMIT ids are inlined in the
+  statement, longer lists are replaced by a subquery of the access control
+  list entries of the user, so that statements don't grow with the number of
+  entries.
+
+  Args:
+    id_column: column holding ids of filtered objects;
+    resources: ids returned by <permission_type>_resources_for(model_name);
+    model_name: name of the model the resources are resolved for;
+    permission_type: 'read', 'update' or 'delete'.
+  """
+  if not resources:
+    return false()
+  if len(resources) <= settings.PERMISSION_RESOURCES_INLINE_LIMIT:
+    return id_column.in_(resources)
+
+  from ggrc import db
+  from ggrc.models import all_models
+  from ggrc.rbac import permissions
+  from ggrc.rbac import permissions_provider
+  acl = all_models.AccessControlList
+  acr = all_models.AccessControlRole
+  allowed = {
+      'read': acr.read,
+      'update': acr.update,
+      'delete': acr.delete,
+  }.get(permission_type)
+  if allowed is None:
+    return id_column.in_(resources)
+  resource_types = permissions_provider.get_contributing_resource_types(
+      model_name)
+  acl_ids = db.session.query(acl.object_id).join(
+      acr, acr.id == acl.ac_role_id,
+  ).filter(
+      acl.person_id == permissions.get_user().id,
+      acl.object_type.in_(resource_types),
+      allowed == true(),
+  )
+  return id_column.in_(acl_ids.subquery())
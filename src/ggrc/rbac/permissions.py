@@ -89,6 +89,14 @@ def is_allowed_update(resource_type, resource_id, context_id):
       resource_type, resource_id, context_id)
 
 
+def filter_allowed_update(resource_type, resource_ids, context_id):
+  """Ids of resources of the specified type the user is allowed to update in
+  the context.
+  """
+  return permissions_for(get_user()).filter_allowed_update(
+      resource_type, resource_ids, context_id)
+
+
 def is_allowed_update_for(instance):
   """Whether or not the user is allowed to update this particular resource
   instance.
@@ -198,6 +198,64 @@ _CONDITIONS_MAP = {
 }
 
 
+PermissionIndexEntry = namedtuple(
+    'PermissionIndexEntry',
+    'contexts resources conditions'
+)
+
+_EMPTY_INDEX_ENTRY = PermissionIndexEntry(frozenset(), frozenset(), {})
+
+
+def _build_index(permissions):
+  """Build the index of a permissions dict.
+
+  Returns:
+    dict of PermissionIndexEntry tuples by (action, resource_type), with
+    frozensets of context ids and resource ids, and tuples of (condition
+    function, terms) by context ids.
+  """
+  index = {}
+  for action, resource_permissions in permissions.iteritems():
+    if not isinstance(resource_permissions, dict):
+      continue
+    for resource_type, permission in resource_permissions.iteritems():
+      if not permission:
+        continue
+      conditions = {
+          context_id: tuple(
+              (_CONDITIONS_MAP[str(condition['condition'])],
+               condition.get('terms') or {})
+              for condition in context_conditions
+          )
+          for context_id, context_conditions
+          in permission.get('conditions', {}).iteritems()
+      }
+      index[(action, resource_type)] = PermissionIndexEntry(
+          frozenset(permission.get('contexts', ())),
+          frozenset(permission.get('resources', ())),
+          conditions,
+      )
+  return index
+
+
+class CompiledPermissions(dict):
+  """Permissions dict with a precompiled index for permission checks.
+
+  The dict keeps the structure returned by load_permissions_for, which is
+  shared with clients as JSON, and must not be changed after compilation.
+  The index is built once and pickled together with the dict into the
+  permissions cache, so that permission checks are set lookups.
+  """
+
+  def __init__(self, permissions):
+    super(CompiledPermissions, self).__init__(permissions)
+    self.index = _build_index(permissions)
+
+
+# (permissions, index) of the last plain permissions dict that was checked
+_last_index = (None, {})
+
+
 class DefaultUserPermissions(UserPermissions):
   # super user, context_id 0 indicates all contexts
   ADMIN_PERMISSION = Permission(
@@ -215,104 +273,84 @@ class DefaultUserPermissions(UserPermissions):
         None,
         context_id)
 
-  def _permission_match(self, permission, permissions):
+  def _permission_match(self, permission, index):
     """Check if the user has the given permission"""
-
-    if None in \
-        permissions\
-            .get(permission.action, {})\
-            .get(permission.resource_type, {})\
-            .get('contexts', []):
+    entry = index.get((permission.action, permission.resource_type),
+                      _EMPTY_INDEX_ENTRY)
+    if None in entry.contexts:
       return True
-    return \
-        permission.resource_id in permissions\
-        .get(permission.action, {})\
-        .get(permission.resource_type, {})\
-        .get('resources', [])\
-        or permission.context_id in \
-        permissions\
-        .get(permission.action, {})\
-        .get(permission.resource_type, {})\
-        .get('contexts', [])\
-        or permission.context_id in \
-        permissions\
-        .get(permission.action, {})\
-        .get(self.ADMIN_PERMISSION.resource_type, {})\
-        .get('contexts', [])
+    admin_entry = index.get(
+        (permission.action, self.ADMIN_PERMISSION.resource_type),
+        _EMPTY_INDEX_ENTRY)
+    return (permission.resource_id in entry.resources or
+            permission.context_id in entry.contexts or
+            permission.context_id in admin_entry.contexts)
 
   @staticmethod
   def _permissions():
     """Returns request permission from the global scope"""
     return getattr(g, '_request_permissions', {})
 
-  def _is_allowed(self, permission):
+  def _permission_index(self):
+    """Get the index of permissions, compiling plain dicts only once."""
+    # pylint: disable=global-statement
+    global _last_index
     permissions = self._permissions()
+    if isinstance(permissions, CompiledPermissions):
+      return permissions.index
+    if _last_index[0] is not permissions:
+      _last_index = (permissions, _build_index(permissions or {}))
+    return _last_index[1]
+
+  def _is_allowed(self, permission):
+    index = self._permission_index()
     if permission.resource_type != '/admin' \
        and permission.context_id \
        and self._is_allowed(permission._replace(context_id=None)):
       return True
-    if self._permission_match(permission, permissions):
+    if self._permission_match(permission, index):
       return True
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
+    if self._permission_match(self.ADMIN_PERMISSION, index):
       return True
     return self._permission_match(
         self._admin_permission_for_context(permission.context_id),
-        permissions)
+        index)
 
   @staticmethod
   def _check_conditions(instance, action, conditions):
-    """Check if any condition is valid for the instance."""
-    for condition in conditions:
-      func = _CONDITIONS_MAP[str(condition['condition'])]
-      terms = condition.setdefault('terms', {})
+    """Check if any compiled condition is valid for the instance."""
+    for func, terms in conditions:
       if func(instance, _current_action=action, **terms):
         return True
     return False
 
   def _is_allowed_for(self, instance, action):
-    permissions = self._permissions()
+    index = self._permission_index()
     # Check for admin permission
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
-      conditions = permissions[self.ADMIN_PERMISSION.action]\
-          .get(self.ADMIN_PERMISSION.resource_type)\
-          .get("conditions", {})\
-          .get(None, [])
+    if self._permission_match(self.ADMIN_PERMISSION, index):
+      conditions = index.get(
+          (self.ADMIN_PERMISSION.action, self.ADMIN_PERMISSION.resource_type),
+          _EMPTY_INDEX_ENTRY,
+      ).conditions.get(None, ())
       if not conditions:
         return True
       return self._check_conditions(instance, action, conditions)
-    if (not permissions.get(action) or
-       not permissions[action].get(instance._inflector.model_singular)):
+    entry = index.get((action, instance._inflector.model_singular))
+    if entry is None:
       return False
-    resources = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('resources', [])
-    contexts = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('contexts', [])
     # We can't use instance.context_id, because it requires the
     # object <-> context mapping to be created,
     # which isn't the case when creating objects
     context_id = None
     if hasattr(instance, 'context') and hasattr(instance.context, 'id'):
       context_id = instance.context.id
-    if instance.id in resources:
+    if instance.id in entry.resources:
       return True
-    no_context_conditions = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('conditions', {})\
-        .setdefault(None, [])
-
-    context_conditions = self._permissions()\
-        .setdefault(action, {})\
-        .setdefault(instance._inflector.model_singular, {})\
-        .setdefault('conditions', {})\
-        .setdefault(context_id, [])
-    conditions = no_context_conditions + context_conditions
+    conditions = (entry.conditions.get(None, ()) +
+                  entry.conditions.get(context_id, ()))
     # Check any conditions applied per resource
-    if (None in contexts or context_id in contexts) and not conditions:
+    if (None in entry.contexts or context_id in entry.contexts) and \
+       not conditions:
       return True
     return self._check_conditions(instance, action, conditions)
 
@@ -346,6 +384,17 @@ class DefaultUserPermissions(UserPermissions):
     """Whether or not the user is allowed to update the given instance"""
     return self._is_allowed_for(instance, 'update')
 
+  def filter_allowed_update(self, resource_type, resource_ids, context_id):
+    """Ids of resources the user is allowed to update in the context.
+
+    Checks that don't depend on the resource id are done once for all ids.
+    """
+    if self._is_allowed(Permission('update', resource_type, None, context_id)):
+      return set(resource_ids)
+    entry = self._permission_index().get(('update', resource_type),
+                                         _EMPTY_INDEX_ENTRY)
+    return entry.resources.intersection(resource_ids)
+
   def is_allowed_delete(self, resource_type, resource_id, context_id):
     """Whether or not the user is allowed to delete a resource of the
     specified type in the context."""
@@ -359,9 +408,9 @@ class DefaultUserPermissions(UserPermissions):
   def _get_resources_for(self, action, resource_type):
     """Get resources resources (object ids) for a given action and
     resource_type"""
-    permissions = self._permissions()
+    index = self._permission_index()
 
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
+    if self._permission_match(self.ADMIN_PERMISSION, index):
       return None
 
     # Get the list of resources for a given resource type and any
@@ -370,19 +419,16 @@ class DefaultUserPermissions(UserPermissions):
 
     ret = []
     for resource_type in resource_types:
-      ret.extend(
-          permissions
-          .get(action, {})
-          .get(resource_type, {})
-          .get('resources', []))
+      ret.extend(index.get((action, resource_type),
+                           _EMPTY_INDEX_ENTRY).resources)
     return ret
 
   def _get_contexts_for(self, action, resource_type):
     # FIXME: (Security) When applicable, we should explicitly assert that no
     #   permissions are expected (e.g. that every user has ADMIN_PERMISSION).
-    permissions = self._permissions()
+    index = self._permission_index()
 
-    if self._permission_match(self.ADMIN_PERMISSION, permissions):
+    if self._permission_match(self.ADMIN_PERMISSION, index):
       return None
 
     # Get the list of contexts for a given resource type and any
@@ -391,16 +437,14 @@ class DefaultUserPermissions(UserPermissions):
 
     ret = []
     for resource_type in resource_types:
-      ret.extend(permissions.get(action, {})
-                            .get(resource_type, {})
-                            .get('contexts', []))
+      ret.extend(index.get((action, resource_type),
+                           _EMPTY_INDEX_ENTRY).contexts)
 
     # Extend with the list of all contexts for which the user is an ADMIN
-    admin_list = list(
-        permissions.get(self.ADMIN_PERMISSION.action, {})
-        .get(self.ADMIN_PERMISSION.resource_type, {})
-        .get('contexts', ()))
-    ret.extend(admin_list)
+    ret.extend(index.get(
+        (self.ADMIN_PERMISSION.action, self.ADMIN_PERMISSION.resource_type),
+        _EMPTY_INDEX_ENTRY,
+    ).contexts)
     if None in ret:
       return None
     return ret
@@ -37,6 +37,12 @@ class UserPermissions(object):
     """
     raise NotImplementedError()
 
+  def filter_allowed_update(self, resource_type, resource_ids, context_id):
+    """Ids of resources of the specified type the user is allowed to update
+    in the context."""
+    return {resource_id for resource_id in resource_ids
+            if self.is_allowed_update(resource_type, resource_id, context_id)}
+
   def is_allowed_delete(self, resource_type, resource_id, context_id):
     """Whether or not the user is allowed to delete a resource of the specified
     type in the context."""
@@ -38,6 +38,7 @@ from ggrc.login import get_current_user_id, get_current_user
 from ggrc.models.cache import Cache
 from ggrc.models.exceptions import ValidationError, translate_message
 from ggrc.rbac import permissions, context_query_filter
+from ggrc.rbac import resource_query_filter
 from ggrc.services.attribute_query import AttributeQueryBuilder
 from ggrc.services import signals
 from ggrc.models.background_task import BackgroundTask, create_task
@@ -229,7 +230,7 @@ def update_memcache_after_commit(context):
       related_objs.append((obj_list[0], None))
   memcache_mark_for_deletion(context, related_objs)
 
-  # TODO(dan): check for duplicates in marked_for_delete
+  cache_manager.marked_for_delete = list(set(cache_manager.marked_for_delete))
   if cache_manager.marked_for_delete:
     delete_result = cache_manager.bulk_delete(
         cache_manager.marked_for_delete, 0)
@@ -446,7 +447,8 @@ class ModelView(View):
       resources = permissions.read_resources_for(self.model.__name__)
       filter_expr = context_query_filter(self.model.context_id, contexts)
       if resources:
-        filter_expr = or_(filter_expr, self.model.id.in_(resources))
+        filter_expr = or_(filter_expr, resource_query_filter(
+            self.model.id, resources, self.model.__name__))
       query = query.filter(filter_expr)
       for j in joinlist:
         j_class = j.property.mapper.class_
@@ -900,7 +902,7 @@ class Resource(ModelView):
 
     database_objs = {}
     if database_matches:
-      database_objs = self.get_resources_from_database(matches)
+      database_objs = self.get_resources_from_database(database_matches)
       if self.has_cache():
         with benchmark("Add resources to cache"):
           self.add_resources_to_cache(database_objs)
@@ -986,15 +988,18 @@ class Resource(ModelView):
       return resources
     # Skip right to memcache
     memcache_client = self.request.cache_manager.cache_object.memcache_client
-    for match in matches:
-      key = get_cache_key(None, id=match[0], type=match[1])
-      val = memcache_client.get(key)
-      if val:
-        val = json.loads(val)
-      else:
-        val = {}
+    key_matches = {get_cache_key(None, id=match[0], type=match[1]): match
+                   for match in matches}
+    cached = {}
+    for keys in utils.list_chunks(key_matches.keys(),
+                                  settings.MEMCACHE_BATCH_SIZE):
+      cached.update(memcache_client.get_multi(keys))
+    for key, val in cached.iteritems():
+      if not val:
+        continue
+      val = json.loads(val)
       if "selfLink" in val:
-        resources[match] = val
+        resources[key_matches[key]] = val
     return resources
 
   def add_resources_to_cache(self, match_obj_pairs):
@@ -1002,11 +1007,22 @@ class Resource(ModelView):
     # Skip right to memcache
     cache_manager = self.request.cache_manager
     memcache_client = cache_manager.cache_object.memcache_client
-    for match, obj in match_obj_pairs.items():
-      if obj.__class__.__name__ in cache_manager.supported_classes:
-        memcache_client.add(
-            get_cache_key(None, id=match[0], type=match[1]),
-            as_json(obj))
+    entries = {
+        get_cache_key(None, id=match[0], type=match[1]): obj
+        for match, obj in match_obj_pairs.items()
+        if obj.__class__.__name__ in cache_manager.supported_classes
+    }
+    if not entries:
+      return
+    blocked = {}
+    for keys in utils.list_chunks(entries.keys(),
+                                  settings.MEMCACHE_BATCH_SIZE):
+      blocked.update(memcache_client.get_multi(keys, key_prefix='DeleteOp:'))
+    entries = {key: as_json(obj) for key, obj in entries.iteritems()
+               if key not in blocked}
+    for keys in utils.list_chunks(entries.keys(),
+                                  settings.MEMCACHE_BATCH_SIZE):
+      memcache_client.add_multi({key: entries[key] for key in keys})
 
   def invalidate_cache_to(self, obj):
     """Invalidate api cache for sent object."""
@@ -6,11 +6,11 @@ import json
 from flask import request, current_app
 from werkzeug.exceptions import BadRequest
 
-import ggrc.models.relationship
+from ggrc.models import relationship_cache
+from ggrc.models.relationship import Stub
 
 from ggrc.fulltext import get_indexer
 from ggrc.utils import GrcEncoder, url_for, benchmark
-from ggrc import db
 
 
 def search():
@@ -100,24 +100,14 @@ def do_counts(terms, types=None, contact_id=None,
 def _build_relevant_filter(types, relevant_objects):
   if relevant_objects is None:
     relevant_objects = []
-  filters = []
-  for relevant_type, relevant_id in relevant_objects:
-    relationship = ggrc.models.relationship.Relationship
-    src_query = db.session.query(
-        relationship.source_type, relationship.source_id
-    ).filter(
-        relationship.source_type.in_(types) | (types is None),
-        relationship.destination_type == relevant_type,
-        relationship.destination_id == relevant_id
-    )
-    dst_query = db.session.query(
-        relationship.destination_type, relationship.destination_id
-    ).filter(
-        relationship.destination_type.in_(types) | (types is None),
-        relationship.source_type == relevant_type,
-        relationship.source_id == relevant_id
-    )
-    filters.append(set(src_query.union(dst_query)))
+  stubs = [Stub(relevant_type, relevant_id)
+           for relevant_type, relevant_id in relevant_objects]
+  related = relationship_cache.get_related(stubs)
+  filters = [
+      {(stub.type, stub.id) for stub in related[relevant]
+       if types is None or stub.type in types}
+      for relevant in stubs
+  ]
 
   def check(result_pair):
     return all(result_pair in bucket for bucket in filters)
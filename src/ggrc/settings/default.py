@@ -18,7 +18,13 @@ SQLALCHEMY_POOL_RECYCLE = 120
 AUTOBUILD_ASSETS = False
 ENABLE_JASMINE = False
 DEBUG_ASSETS = False
+# Set to "ggrc.fulltext.mysql.MysqlFulltextIndexer" to search with the FULLTEXT
+# index of fulltext_record_properties
 FULLTEXT_INDEXER = None
+# Minimal length of words in FULLTEXT indexes, must match the
+# innodb_ft_min_token_size setting of the MySQL server
+FULLTEXT_MIN_TOKEN_SIZE = int(os.environ.get("GGRC_FULLTEXT_MIN_TOKEN_SIZE",
+                                             "3"))
 USER_PERMISSIONS_PROVIDER = \
     'ggrc_basic_permissions.CompletePermissionsProvider'
 EXTENSIONS = [
@@ -89,6 +95,19 @@ SQLALCHEMY_DATABASE_URI = os.environ.get('GGRC_DATABASE_URI', '')
 SECRET_KEY = os.environ.get('GGRC_SECRET_KEY', 'Replace-with-something-secret')
 
 MEMCACHE_MECHANISM = True
+# Maximum number of keys sent to memcache in one multi-key operation
+MEMCACHE_BATCH_SIZE = int(os.environ.get("GGRC_MEMCACHE_BATCH_SIZE", "500"))
+# Cache backend used when MEMCACHE_MECHANISM is enabled, see
+# ggrc.cache.backends: "appengine", "memcached" or "local"
+CACHE_BACKEND = os.environ.get("GGRC_CACHE_BACKEND", "appengine")
+MEMCACHED_SERVERS = os.environ.get(
+    "GGRC_MEMCACHED_SERVERS", "127.0.0.1:11211").split(",")
+# Maximum number of entries of the "local" backend
+CACHE_LOCAL_SIZE = int(os.environ.get("GGRC_CACHE_LOCAL_SIZE", "10000"))
+# In-process tier in front of the cache backend, disabled if size is 0
+CACHE_LOCAL_TIER_SIZE = int(os.environ.get("GGRC_CACHE_LOCAL_TIER_SIZE",
+                                           "0"))
+CACHE_LOCAL_TIER_TTL = int(os.environ.get("GGRC_CACHE_LOCAL_TIER_TTL", "5"))
 
 # AppEngine Email
 APPENGINE_EMAIL = os.environ.get('APPENGINE_EMAIL', '')
@@ -111,6 +130,72 @@ USE_APP_ENGINE_ASSETS_SUBDOMAIN = False
 
 BACKGROUND_COLLECTION_POST_SLEEP = 0
 
+# Maximum number of independent /query API object blocks evaluated
+# concurrently within a single request. Each worker uses its own database
+# connection, values below 2 disable concurrent evaluation.
+QUERY_API_MAX_WORKERS = int(os.environ.get("GGRC_QUERY_API_MAX_WORKERS", "1"))
+
+# Results of /query API "count" and "ids" object blocks are cached for
+# QUERY_RESULT_CACHE_TTL seconds (0 disables the cache) in a per-process LRU
+# cache holding at most QUERY_RESULT_CACHE_SIZE results.
+QUERY_RESULT_CACHE_TTL = int(os.environ.get("GGRC_QUERY_RESULT_CACHE_TTL",
+                                            "0"))
+QUERY_RESULT_CACHE_SIZE = int(os.environ.get("GGRC_QUERY_RESULT_CACHE_SIZE",
+                                             "1000"))
+
+# Neighbourhoods of objects in the relationships graph are cached in a
+# per-process LRU cache of RELATIONSHIP_CACHE_SIZE objects (0 disables the
+# cache). Without MEMCACHE_MECHANISM changes made by other processes are seen
+# after at most RELATIONSHIP_CACHE_TTL seconds.
+RELATIONSHIP_CACHE_SIZE = int(os.environ.get("GGRC_RELATIONSHIP_CACHE_SIZE",
+                                             "0"))
+RELATIONSHIP_CACHE_TTL = int(os.environ.get("GGRC_RELATIONSHIP_CACHE_TTL",
+                                            "300"))
+
+# Number of imported rows whose objects are flushed to the database together
+IMPORT_BATCH_SIZE = int(os.environ.get("GGRC_IMPORT_BATCH_SIZE", "100"))
+# Number of imported rows of a block committed together by background
+# imports, 0 commits every block at once. Synchronous imports always commit
+# every block at once.
+IMPORT_COMMIT_SIZE = int(os.environ.get("GGRC_IMPORT_COMMIT_SIZE", "1000"))
+
+# Maximal number of characters in cells of a file imported in background, the
+# file is stored in the parameters of the import task until it finishes
+IMPORT_BACKGROUND_MAX_SIZE = int(os.environ.get(
+    "GGRC_IMPORT_BACKGROUND_MAX_SIZE", "2000000"))
+
+# Number of processes validating blocks of dry run imports running as
+# background tasks, values below 2 validate all blocks in the task process
+IMPORT_DRY_RUN_WORKERS = int(os.environ.get("GGRC_IMPORT_DRY_RUN_WORKERS",
+                                            "1"))
+
+# Number of objects loaded at once while rows of an export are generated
+EXPORT_CHUNK_SIZE = int(os.environ.get("GGRC_EXPORT_CHUNK_SIZE", "1000"))
+
+# Number of children of a parent object that are snapshotted together, and
+# number of objects whose latest revisions are selected with a single query
+SNAPSHOT_CHUNK_SIZE = int(os.environ.get("GGRC_SNAPSHOT_CHUNK_SIZE", "1000"))
+
+# Permission filters inline ids of objects the user has access control list
+# entries for up to this number of ids and use a subquery above it
+PERMISSION_RESOURCES_INLINE_LIMIT = int(os.environ.get(
+    "GGRC_PERMISSION_RESOURCES_INLINE_LIMIT", "1000"))
+
+# Compression of new revision contents, "zlib" stores them compressed and an
+# empty value stores them as plain Json text. Both formats are always readable.
+REVISION_CONTENT_COMPRESSION = os.environ.get(
+    "GGRC_REVISION_CONTENT_COMPRESSION", "")
+
+# Full reindex splits ids of every model into shards of REINDEX_SHARD_SIZE
+# ids that are reindexed by a pool of REINDEX_WORKERS processes, values below
+# 2 reindex all shards in the task process.
+REINDEX_WORKERS = int(os.environ.get("GGRC_REINDEX_WORKERS", "1"))
+REINDEX_SHARD_SIZE = int(os.environ.get("GGRC_REINDEX_SHARD_SIZE", "10000"))
+
+# Automappings of relationships POSTed through the API are generated in a
+# background task after the relationships are committed if set to 1
+AUTOMAPPING_ASYNC = int(os.environ.get("GGRC_AUTOMAPPING_ASYNC", "0"))
+
 
 LOGGING_HANDLER = {
     "class": "logging.StreamHandler",
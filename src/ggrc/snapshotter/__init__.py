@@ -8,6 +8,7 @@ snapshot object represent a join between parent object (Audit),
 child object (e.g. Control, Regulation, ...) and a particular revision.
 """
 
+import collections
 from logging import getLogger
 
 import sqlalchemy as sa
@@ -16,19 +17,22 @@ from sqlalchemy.sql.expression import bindparam
 
 from ggrc import db
 from ggrc import models
+from ggrc import settings
 from ggrc.login import get_current_user_id
 from ggrc.models import all_models
+from ggrc.models import latest_revision
 from ggrc.utils import benchmark
+from ggrc.utils import list_chunks
 
 from ggrc.snapshotter.acl import get_acl_payload
 from ggrc.snapshotter.datastructures import Attr
 from ggrc.snapshotter.datastructures import Pair
 from ggrc.snapshotter.datastructures import Stub
 from ggrc.snapshotter.datastructures import OperationResponse
-from ggrc.snapshotter.helpers import create_relationship_dict
 from ggrc.snapshotter.helpers import create_relationship_revision_dict
-from ggrc.snapshotter.helpers import create_snapshot_dict
+from ggrc.snapshotter.helpers import create_relationships_insert
 from ggrc.snapshotter.helpers import create_snapshot_revision_dict
+from ggrc.snapshotter.helpers import create_snapshots_insert
 from ggrc.snapshotter.helpers import get_relationships
 from ggrc.snapshotter.helpers import get_revisions
 from ggrc.snapshotter.helpers import get_snapshots
@@ -253,7 +257,7 @@ class SnapshotGenerator(object):
           revision_payload += [data]
 
       with benchmark("Insert Snapshot entries into Revision"):
-        self._execute(models.Revision.__table__.insert(), revision_payload)
+        self._execute_revisions(revision_payload)
       return OperationResponse("update", True, for_update, response_data)
 
   def analyze(self):
@@ -318,20 +322,40 @@ class SnapshotGenerator(object):
         "dry-run": self.dry_run
     })
 
-  def _execute(self, operation, data):
+  def _execute(self, operation, data=None):
     """Execute bulk operation on data if not in dry mode
 
     Args:
       operation: sqlalchemy operation
       data: a list of dictionaries with keys representing column names and
-        values to insert with operation
+        values to insert with operation, None for operations that don't
+        need any data, such as INSERT ... SELECT
     Returns:
       True if successful.
     """
-    if data and not self.dry_run:
-      engine = db.engine
+    if self.dry_run or (data is not None and not data):
+      return
+    engine = db.engine
+    if data is None:
+      engine.execute(operation)
+    else:
       engine.execute(operation, data)
-      db.session.commit()
+    db.session.commit()
+
+  def _execute_revisions(self, revision_payload):
+    """Insert revisions if not in dry mode and index them as the latest ones.
+
+    Args:
+      revision_payload: a list of revision dictionaries to insert
+    """
+    if self.dry_run or not revision_payload:
+      return
+    self._execute(models.Revision.__table__.insert(), revision_payload)
+    latest_revision.refresh(db.session, {
+        (revision["resource_type"], revision["resource_id"])
+        for revision in revision_payload
+    })
+    db.session.commit()
 
   def create(self, event, revisions, _filter=None):
     """Create snapshots of parent object's neighborhood per provided rules
@@ -350,6 +374,10 @@ class SnapshotGenerator(object):
     """Create snapshots of parent objects neighhood and create revisions for
     snapshots.
 
+    Snapshots are created in chunks of at most SNAPSHOT_CHUNK_SIZE children of
+    a single parent, so that memory used for payloads doesn't depend on the
+    size of the scope.
+
     Args:
       event: A ggrc.models.Event instance
       revisions: A set of tuples of pairs with revisions to which it should
@@ -358,15 +386,10 @@ class SnapshotGenerator(object):
     Returns:
       OperationResponse
     """
-    # pylint: disable=too-many-locals,too-many-statements
     with benchmark("Snapshot._create"):
       with benchmark("Snapshot._create init"):
         user_id = get_current_user_id()
-        missed_keys = set()
-        data_payload = list()
-        revision_payload = list()
-        relationship_payload = list()
-        response_data = dict()
+        response_data = {"revisions": dict()}
 
         if self.dry_run and event is None:
           event_id = 0
@@ -377,80 +400,81 @@ class SnapshotGenerator(object):
         if _filter:
           for_create = {elem for elem in for_create if _filter(elem)}
 
-      with benchmark("Snapshot._create._get_revisions"):
-        revision_id_cache = get_revisions(for_create, revisions)
-
-      response_data["revisions"] = revision_id_cache
-
-      with benchmark("Snapshot._create.create payload"):
-        for pair in for_create:
-          if pair in revision_id_cache:
-            revision_id = revision_id_cache[pair]
-            context_id = self.context_cache[pair.parent]
-            data = create_snapshot_dict(pair, revision_id, user_id, context_id)
-            data_payload += [data]
-          else:
-            missed_keys.add(pair)
-
-      if missed_keys:
-        logger.warning(
-            "Tried to create snapshots for the following objects but "
-            "found no revisions: %s", missed_keys)
+      children_cache = collections.defaultdict(list)
+      for parent, child in for_create:
+        children_cache[parent].append(child)
 
-      with benchmark("Snapshot._create.write to database"):
-        self._execute(
-            models.Snapshot.__table__.insert(),
-            data_payload)
-
-      with benchmark("Snapshot._create.retrieve inserted snapshots"):
-        snapshots = get_snapshots(for_create)
+      for parent, children in children_cache.iteritems():
+        for chunk in list_chunks(sorted(children),
+                                 settings.SNAPSHOT_CHUNK_SIZE):
+          response_data["revisions"].update(self._create_chunk(
+              parent, chunk, event_id, revisions, user_id))
+      return OperationResponse("create", True, for_create, response_data)
 
-      with benchmark("Snapshot._create.access control list"):
-        acl_payload = get_acl_payload(snapshots)
+  def _create_chunk(self, parent, children, event_id, revisions, user_id):
+    """Create snapshots of children of a parent object and their revisions.
 
-      with benchmark("Snapshot._create.write acls to database"):
-        self._execute(all_models.AccessControlList.__table__.insert(),
-                      acl_payload)
+    Snapshots and parent -> child relationships are inserted with
+    INSERT ... SELECT statements, only their revisions are built in Python.
 
-      with benchmark("Snapshot._create.create parent object -> snapshot rels"):
-        for snapshot in snapshots:
-          parent = Stub(snapshot.parent_type, snapshot.parent_id)
-          base = Stub(snapshot.child_type, snapshot.child_id)
-          relationship = create_relationship_dict(
-              parent, base, user_id, self.context_cache[parent])
-          relationship_payload += [relationship]
-
-      with benchmark("Snapshot._create.write relationships to database"):
-        self._execute(models.Relationship.__table__.insert(),
-                      relationship_payload)
-
-      with benchmark("Snapshot._create.get created relationships"):
-        created_relationships = {
-            (rel["source_type"], rel["source_id"],
-             rel["destination_type"], rel["destination_id"])
-            for rel in relationship_payload}
-        relationships = get_relationships(created_relationships)
-
-      with benchmark("Snapshot._create.create revision payload"):
-        with benchmark("Snapshot._create.create snapshots revision payload"):
-          for snapshot in snapshots:
-            parent = Stub(snapshot.parent_type, snapshot.parent_id)
-            context_id = self.context_cache[parent]
-            data = create_snapshot_revision_dict("created", event_id, snapshot,
-                                                 user_id, context_id)
-            revision_payload += [data]
-
-        with benchmark("Snapshot._create.create rel revision payload"):
-          for relationship in relationships:
-            parent = Stub(relationship.source_type, relationship.source_id)
-            context_id = self.context_cache[parent]
-            data = create_relationship_revision_dict(
-                "created", event_id, relationship, user_id, context_id)
-            revision_payload += [data]
-
-      with benchmark("Snapshot._create.write revisions to database"):
-        self._execute(models.Revision.__table__.insert(), revision_payload)
-      return OperationResponse("create", True, for_create, response_data)
+    Returns:
+      dict of revision ids of snapshotted pairs.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    context_id = self.context_cache[parent]
+    pairs = {Pair(parent, child) for child in children}
+
+    with benchmark("Snapshot._create._get_revisions"):
+      revision_id_cache = get_revisions(pairs, revisions)
+
+    missed_keys = pairs - set(revision_id_cache)
+    if missed_keys:
+      logger.warning(
+          "Tried to create snapshots for the following objects but "
+          "found no revisions: %s", missed_keys)
+
+    if self.dry_run or not revision_id_cache:
+      return revision_id_cache
+
+    with benchmark("Snapshot._create.write to database"):
+      self._execute(create_snapshots_insert(
+          parent, revision_id_cache.values(), user_id, context_id))
+
+    with benchmark("Snapshot._create.retrieve inserted snapshots"):
+      snapshots = get_snapshots(revision_id_cache).all()
+
+    with benchmark("Snapshot._create.access control list"):
+      acl_payload = get_acl_payload(snapshots)
+
+    with benchmark("Snapshot._create.write acls to database"):
+      self._execute(all_models.AccessControlList.__table__.insert(),
+                    acl_payload)
+
+    with benchmark("Snapshot._create.write relationships to database"):
+      self._execute(create_relationships_insert(
+          [snapshot.id for snapshot in snapshots], user_id, context_id))
+
+    with benchmark("Snapshot._create.get created relationships"):
+      relationships = get_relationships({
+          (snapshot.parent_type, snapshot.parent_id,
+           snapshot.child_type, snapshot.child_id)
+          for snapshot in snapshots})
+
+    with benchmark("Snapshot._create.create revision payload"):
+      revision_payload = [
+          create_snapshot_revision_dict("created", event_id, snapshot,
+                                        user_id, context_id)
+          for snapshot in snapshots
+      ]
+      revision_payload.extend(
+          create_relationship_revision_dict(
+              "created", event_id, relationship, user_id, context_id)
+          for relationship in relationships
+      )
+
+    with benchmark("Snapshot._create.write revisions to database"):
+      self._execute_revisions(revision_payload)
+    return revision_id_cache
 
   def _copy_snapshot_relationships(self):
     """Add relationships between snapshotted objects.
@@ -6,13 +6,17 @@
 import collections
 from logging import getLogger
 
+import sqlalchemy as sa
 from sqlalchemy.sql.expression import tuple_
 
 from ggrc import db
 from ggrc import models
+from ggrc import settings
+from ggrc.models import latest_revision
 from ggrc.snapshotter.datastructures import Stub
 from ggrc.snapshotter.datastructures import Pair
 from ggrc.utils import benchmark
+from ggrc.utils import list_chunks
 
 logger = getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -20,8 +24,10 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 def get_revisions(pairs, revisions, filters=None):
   """Retrieve revision ids for pairs
 
-  If revisions dictionary is provided it will validate that the selected
-  revision exists in the objects revision history.
+  Latest revisions of children are taken from the latest revisions index for
+  at most SNAPSHOT_CHUNK_SIZE children at once. If revisions
+  dictionary is provided it will validate that the selected revision exists
+  in the objects revision history.
 
   Args:
     pairs: set([(parent_1, child_1), (parent_2, child_2), ...])
@@ -32,43 +38,64 @@ def get_revisions(pairs, revisions, filters=None):
     revision_id_cache = dict()
 
     if pairs:
-      with benchmark("get_revisions.create caches"):
-        child_stubs = {pair.child for pair in pairs}
+      with benchmark("get_revisions.create child -> parents cache"):
+        parents_cache = collections.defaultdict(set)
+        for parent, child in pairs:
+          parents_cache[child].add(parent)
+
+      for children in list_chunks(sorted(parents_cache),
+                                  settings.SNAPSHOT_CHUNK_SIZE):
+        requested = {revisions[Pair(parent, child)]
+                     for child in children
+                     for parent in parents_cache[child]
+                     if Pair(parent, child) in revisions}
+        with benchmark("get_revisions.retrieve revisions"):
+          latest, existing = _get_chunk_revisions(children, requested,
+                                                  filters)
+
+        with benchmark("get_revisions.create revision_id cache"):
+          for child in children:
+            for parent in parents_cache[child]:
+              key = Pair(parent, child)
+              if key in revisions:
+                if (child, revisions[key]) in existing:
+                  revision_id_cache[key] = revisions[key]
+                else:
+                  logger.warning(
+                      "Specified revision for object %s but couldn't find the"
+                      "revision '%s' in object history", key, revisions[key])
+              elif child in latest:
+                revision_id_cache[key] = latest[child]
+    return revision_id_cache
+
 
-        with benchmark("get_revisions.create child -> parents cache"):
-          parents_cache = collections.defaultdict(set)
-          for parent, child in pairs:
-            parents_cache[child].add(parent)
+def _get_chunk_revisions(children, requested, filters):
+  """Get latest and requested revision ids of children.
 
-      with benchmark("get_revisions.retrieve revisions"):
-        query = db.session.query(
-            models.Revision.id,
+  Returns:
+    dict of latest revision ids by children and set of (child, revision id)
+    tuples of requested revisions that exist in histories of the children.
+  """
+  latest = latest_revision.get_ids(children, filters)
+
+  existing = set()
+  if requested:
+    query = db.session.query(
+        models.Revision.resource_type,
+        models.Revision.resource_id,
+        models.Revision.id,
+    ).filter(
+        tuple_(
             models.Revision.resource_type,
-            models.Revision.resource_id).filter(
-            tuple_(
-                models.Revision.resource_type,
-                models.Revision.resource_id).in_(child_stubs)
-        ).order_by(models.Revision.id.desc())
-        if filters:
-          for _filter in filters:
-            query = query.filter(_filter)
-
-      with benchmark("get_revisions.create revision_id cache"):
-        for revid, restype, resid in query:
-          child = Stub(restype, resid)
-          for parent in parents_cache[child]:
-            key = Pair(parent, child)
-            if key in revisions:
-              if revid == revisions[key]:
-                revision_id_cache[key] = revid
-              else:
-                logger.warning(
-                    "Specified revision for object %s but couldn't find the"
-                    "revision '%s' in object history", key, revisions[key])
-            else:
-              if key not in revision_id_cache:
-                revision_id_cache[key] = revid
-    return revision_id_cache
+            models.Revision.resource_id,
+        ).in_(children),
+        models.Revision.id.in_(requested),
+    )
+    for _filter in filters or []:
+      query = query.filter(_filter)
+    existing = {(Stub(restype, resid), revid)
+                for restype, resid, revid in query}
+  return latest, existing
 
 
 def get_relationships(relationships):
@@ -156,18 +183,31 @@ def create_json_stub(model_, context_id, object_id):
   }
 
 
-def create_snapshot_dict(pair, revision_id, user_id, context_id):
-  """Create dictionary representation of snapshot"""
-  parent, child = pair.to_2tuple()
-  return {
-      "parent_type": parent.type,
-      "parent_id": parent.id,
-      "child_type": child.type,
-      "child_id": child.id,
-      "revision_id": revision_id,
-      "modified_by_id": user_id,
-      "context_id": context_id
-  }
+def create_snapshots_insert(parent, revision_ids, user_id, context_id):
+  """Create INSERT ... SELECT statement for snapshots of given revisions"""
+  revisions = models.Revision.__table__
+  select = sa.select([
+      sa.literal(parent.type),
+      sa.literal(parent.id),
+      revisions.c.resource_type,
+      revisions.c.resource_id,
+      revisions.c.id,
+      sa.literal(user_id),
+      sa.literal(context_id),
+      sa.func.now(),
+      sa.func.now(),
+  ]).where(revisions.c.id.in_(revision_ids))
+  return models.Snapshot.__table__.insert().from_select([
+      "parent_type",
+      "parent_id",
+      "child_type",
+      "child_id",
+      "revision_id",
+      "modified_by_id",
+      "context_id",
+      "created_at",
+      "updated_at",
+  ], select)
 
 
 def create_snapshot_revision_dict(action, event_id, snapshot,
@@ -197,16 +237,30 @@ def create_snapshot_revision_dict(action, event_id, snapshot,
   }
 
 
-def create_relationship_dict(source, destination, user_id, context_id):
-  """Create dictionary representation of relationship"""
-  return {
-      "source_type": source.type,
-      "source_id": source.id,
-      "destination_type": destination.type,
-      "destination_id": destination.id,
-      "modified_by_id": user_id,
-      "context_id": context_id,
-  }
+def create_relationships_insert(snapshot_ids, user_id, context_id):
+  """Create INSERT ... SELECT statement for parent -> child relationships of
+  given snapshots"""
+  snapshots = models.Snapshot.__table__
+  select = sa.select([
+      snapshots.c.parent_type,
+      snapshots.c.parent_id,
+      snapshots.c.child_type,
+      snapshots.c.child_id,
+      sa.literal(user_id),
+      sa.literal(context_id),
+      sa.func.now(),
+      sa.func.now(),
+  ]).where(snapshots.c.id.in_(snapshot_ids))
+  return models.Relationship.__table__.insert().from_select([
+      "source_type",
+      "source_id",
+      "destination_type",
+      "destination_id",
+      "modified_by_id",
+      "context_id",
+      "created_at",
+      "updated_at",
+  ], select)
 
 
 def create_relationship_revision_dict(action, event_id, relationship,  # noqa # pylint: disable=invalid-name
@@ -109,6 +109,14 @@ def get_searchable_attributes(attributes, cads, content):
   return searchable_values
 
 
+def _get_indexed_keys(resource_types):
+  """Get revision content keys read by get_searchable_attributes."""
+  keys = {"custom_attributes"}
+  for resource_type in resource_types:
+    keys.update(attr.alias for attr in CLASS_PROPERTIES[resource_type])
+  return keys
+
+
 def reindex():
   """Reindex all snapshots."""
   columns = db.session.query(
@@ -318,7 +326,8 @@ def reindex_pairs(pairs):
           "id",
           "resource_type",
           "resource_id",
-          "_content",
+          "created_at",
+          "updated_at",
       ),
       orm.load_only(
           "id",
@@ -331,7 +340,11 @@ def reindex_pairs(pairs):
       )
   )
   cad_dict = _get_custom_attribute_dict()
-  for snapshot in snapshot_query:
+  snapshot_list = snapshot_query.all()
+  revisions = [snapshot.revision for snapshot in snapshot_list]
+  contents = models.Revision.get_projected_contents(
+      revisions, _get_indexed_keys({r.resource_type for r in revisions}))
+  for snapshot in snapshot_list:
     revision = snapshot.revision
     snapshots[snapshot.id] = {
         "id": snapshot.id,
@@ -343,7 +356,7 @@ def reindex_pairs(pairs):
         "revision": get_searchable_attributes(
             CLASS_PROPERTIES[revision.resource_type],
             cad_dict[revision.resource_type],
-            revision.content)
+            contents[revision.id])
     }
   search_payload = []
   for snapshot in snapshots.values():
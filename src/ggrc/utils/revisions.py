@@ -13,6 +13,7 @@ from ggrc import db
 from ggrc.utils import benchmark
 from ggrc.login import get_current_user_id
 from ggrc.models import all_models
+from ggrc.models import latest_revision
 from ggrc.snapshotter.rules import Types
 
 logger = getLogger(__name__)  # pylint: disable=invalid-name
@@ -61,12 +62,14 @@ def _fix_type_revisions(event, type_, obj_rev_map):
   all_objects = model.eager_query().order_by(model.id)
   all_objects_count = model.query.count()
 
+  recovered_ids = set()
   for i in range(all_objects_count // chunk + 1):
     objects_chunk = all_objects.limit(chunk).offset(i * chunk)
     chunk_with_revisions = [
         obj for obj in objects_chunk if obj.id in obj_rev_map]
     chunk_without_revisions = [
         obj for obj in objects_chunk if obj.id not in obj_rev_map]
+    recovered_ids.update(obj.id for obj in chunk_without_revisions)
 
     # 1. Update the object's latest revision using the value of the up to date
     # log_json function
@@ -83,7 +86,10 @@ def _fix_type_revisions(event, type_, obj_rev_map):
   _recover_delete_revisions(
       # Every revision present in obj_rev_map has no object in the DB
       revisions_table, event, list(obj_rev_map.values()))
+  recovered_ids.update(obj_rev_map)
 
+  latest_revision.refresh(db.session,
+                          [(type_, obj_id) for obj_id in recovered_ids])
   db.session.commit()
 
 
@@ -15,19 +15,13 @@ from ggrc.models import mixins
 
 def get_latest_revision_content(instance):
   """Returns latest revision for instance."""
-  from ggrc.models import all_models
+  from ggrc.models import latest_revision
   if not hasattr(g, "latest_revision_content"):
     g.latest_revision_content = {}
   key = (instance.type, instance.id)
   content = g.latest_revision_content.get(key)
   if not content:
-    content = all_models.Revision.query.filter(
-        all_models.Revision.resource_id == instance.id,
-        all_models.Revision.resource_type == instance.type
-    ).order_by(
-        all_models.Revision.created_at.desc(),
-        all_models.Revision.id.desc(),
-    ).first().content
+    content = latest_revision.query_for([key]).first().content
     g.latest_revision_content[key] = content
   return content
 
@@ -41,7 +35,7 @@ def mark_for_latest_content(type_, id_):
 
 def rewarm_latest_content():
   """Rewarm cache for latest content for marked objects."""
-  from ggrc.models import all_models
+  from ggrc.models import latest_revision
   if not hasattr(g, "latest_revision_content_markers"):
     return
   if not hasattr(g, "latest_revision_content"):
@@ -50,26 +44,10 @@ def rewarm_latest_content():
   del g.latest_revision_content_markers
   if not cache:
     return
-  query = all_models.Revision.query.filter(
-      all_models.Revision.resource_type == cache.keys()[0],
-      all_models.Revision.resource_id.in_(cache[cache.keys()[0]])
+  query = latest_revision.query_for(
+      (type_, id_) for type_, ids in cache.iteritems() for id_ in ids
   )
-  for type_, ids in cache.items()[1:]:
-    query = query.union_all(
-        all_models.Revision.query.filter(
-            all_models.Revision.resource_type == type_,
-            all_models.Revision.resource_id.in_(ids)
-        ))
-  query = query.order_by(
-      all_models.Revision.resource_id,
-      all_models.Revision.resource_type,
-      all_models.Revision.created_at.desc(),
-      all_models.Revision.id.desc(),
-  )
-  key = None
   for revision in query:
-    if key == (revision.resource_type, revision.resource_id):
-      continue
     key = (revision.resource_type, revision.resource_id)
     g.latest_revision_content[key] = revision.content
 
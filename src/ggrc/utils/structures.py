@@ -4,6 +4,8 @@
 """Collection if ggrc specific structures."""
 
 import collections
+import threading
+import time
 
 
 class CaseInsensitiveDict(collections.MutableMapping):
@@ -102,3 +104,97 @@ class CaseInsensitiveDefaultDict(CaseInsensitiveDict):
 
   def copy(self):
     return CaseInsensitiveDefaultDict(self._default, data=self._store.values())
+
+
+class LRUCache(object):
+  """Bounded thread-safe cache with LRU eviction and expiring entries.
+
+  The least recently used entry is evicted when a new entry is added to a full
+  cache. Expired entries are dropped when they are accessed.
+
+  Attributes:
+    hits, misses, evictions: counters of lookups that found a live entry,
+      lookups that did not, and entries evicted to free space.
+  """
+
+  def __init__(self, max_size, ttl=None, clock=time.time):
+    """Initialize an empty cache.
+
+    Args:
+      max_size: maximum number of entries kept in the cache.
+      ttl: default number of seconds an entry stays valid, None means that
+        entries never expire.
+      clock: function returning current time in seconds.
+    """
+    self.max_size = max_size
+    self.ttl = ttl
+    self._clock = clock
+    self._store = collections.OrderedDict()
+    self._lock = threading.RLock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def _is_live(self, entry):
+    """Check if (value, expires_at) entry has not expired yet."""
+    return entry[1] is None or entry[1] > self._clock()
+
+  def get(self, key, default=None):
+    """Get a live value for key and mark it as the most recently used."""
+    with self._lock:
+      entry = self._store.pop(key, None)
+      if entry is None or not self._is_live(entry):
+        self.misses += 1
+        return default
+      self._store[key] = entry
+      self.hits += 1
+      return entry[0]
+
+  def set(self, key, value, ttl=None):
+    """Store value for key, evicting the least recently used entries.
+
+    Args:
+      key: hashable key of the entry.
+      value: value to store.
+      ttl: number of seconds the entry stays valid, defaults to self.ttl.
+    """
+    if ttl is None:
+      ttl = self.ttl
+    expires_at = self._clock() + ttl if ttl is not None else None
+    with self._lock:
+      self._store.pop(key, None)
+      while self._store and len(self._store) >= self.max_size:
+        self._store.popitem(last=False)
+        self.evictions += 1
+      if self.max_size > 0:
+        self._store[key] = (value, expires_at)
+
+  def delete(self, key):
+    """Remove entry for key and return True if it was present."""
+    with self._lock:
+      return self._store.pop(key, None) is not None
+
+  def clear(self):
+    """Remove all entries, counters are preserved."""
+    with self._lock:
+      self._store.clear()
+
+  def stats(self):
+    """Get a dict with cache counters and current size."""
+    with self._lock:
+      return {
+          "hits": self.hits,
+          "misses": self.misses,
+          "evictions": self.evictions,
+          "size": len(self._store),
+      }
+
+  def __contains__(self, key):
+    """Check for a live entry without touching LRU order or counters."""
+    with self._lock:
+      entry = self._store.get(key)
+      return entry is not None and self._is_live(entry)
+
+  def __len__(self):
+    with self._lock:
+      return len(self._store)
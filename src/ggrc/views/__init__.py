@@ -18,6 +18,7 @@ from flask import url_for
 from flask import request
 from werkzeug.exceptions import Forbidden
 
+from ggrc import automapper
 from ggrc import models
 from ggrc import settings
 from ggrc.app import app
@@ -26,13 +27,15 @@ from ggrc.builder.json import publish
 from ggrc.builder.json import publish_representation
 from ggrc.converters import get_importables, get_exportables
 from ggrc.extensions import get_extension_modules
-from ggrc.fulltext import get_indexer, mixin
+from ggrc.fulltext import get_indexer
+from ggrc.fulltext import reindex as fulltext_reindex
 from ggrc.integrations import issues
 from ggrc.integrations import integrations_errors
 from ggrc.login import get_current_user
 from ggrc.login import login_required
 from ggrc.login import admin_required
 from ggrc.models import all_models
+from ggrc.models import user_object_index
 from ggrc.models.background_task import create_task
 from ggrc.models.background_task import make_task_response
 from ggrc.models.background_task import queued_task
@@ -49,8 +52,8 @@ from ggrc.views import filters
 from ggrc.views import notifications
 from ggrc.views.registry import object_view
 from ggrc.utils import benchmark
-from ggrc.utils import generate_query_chunks
 from ggrc.utils import revisions
+from ggrc.utils.log_event import log_event
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -66,12 +69,35 @@ def refresh_revisions(_):
 
 @app.route("/_background_tasks/reindex", methods=["POST"])
 @queued_task
-def reindex(_):
+def reindex(task):
   """Web hook to update the full text search index."""
-  do_reindex()
+  do_reindex(task, task.parameters.get("resume_from"))
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
+@app.route("/_background_tasks/rebuild_user_object_index", methods=["POST"])
+@queued_task
+def rebuild_user_object_index(_):
+  """Web hook to rebuild the index of objects related to people."""
+  with benchmark("Run rebuild_user_object_index background task"):
+    user_object_index.rebuild()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+@app.route("/_background_tasks/generate_automappings", methods=["POST"])
+@queued_task
+def generate_automappings(task):
+  """Web hook to generate automappings of committed relationships."""
+  with benchmark("Run generate_automappings background task"):
+    limit_exceeded = automapper.generate_deferred_automappings(
+        task.parameters["relationship_ids"])
+    log_event(db.session)
+    db.session.commit()
+  return app.make_response((
+      json.dumps({"automapping_limit_exceeded": limit_exceeded}), 200,
+      [("Content-Type", "application/json")]))
+
+
 @app.route("/_background_tasks/compute_attributes", methods=["POST"])
 @queued_task
 def compute_attributes(args):
@@ -144,6 +170,17 @@ def start_compute_attributes(revision_ids):
   task.start()
 
 
+def start_generate_automappings(relationship_ids):
+  """Start a background task generating automappings of relationships."""
+  return create_task(
+      name="generate_automappings",
+      url=url_for(generate_automappings.__name__),
+      parameters={"relationship_ids": relationship_ids},
+      method=u"POST",
+      queued_callback=generate_automappings,
+  )
+
+
 def start_update_audit_issues(audit_id, message):
   """Start a background task to update IssueTracker issues related to Audit."""
   task = create_task(
@@ -159,34 +196,27 @@ def start_update_audit_issues(audit_id, message):
   task.start()
 
 
-def do_reindex():
-  """Update the full text search index."""
+def do_reindex(task=None, resume_from=None):
+  """Update the full text search index.
 
-  indexer = get_indexer()
-  indexed_models = {
-      m.__name__: m for m in all_models.all_models
-      if issubclass(m, mixin.Indexed) and m.REQUIRED_GLOBAL_REINDEX
-  }
-  people_query = db.session.query(all_models.Person.id,
-                                  all_models.Person.name,
-                                  all_models.Person.email)
-  indexer.cache["people_map"] = {p.id: (p.name, p.email) for p in people_query}
-  indexer.cache["ac_role_map"] = dict(db.session.query(
-      all_models.AccessControlRole.id,
-      all_models.AccessControlRole.name,
-  ))
-  for model_name in sorted(indexed_models.keys()):
-    logger.info("Updating index for: %s", model_name)
-    with benchmark("Create records for %s" % model_name):
-      model = indexed_models[model_name]
-      for query_chunk in generate_query_chunks(db.session.query(model.id)):
-        model.bulk_record_update_for([i.id for i in query_chunk])
-        db.session.commit()
-
-  logger.info("Updating index for: %s", "Snapshot")
-  with benchmark("Create records for %s" % "Snapshot"):
-    reindex_snapshots()
-  indexer.invalidate_cache()
+  Args:
+    task: BackgroundTask of the reindex, used to save the progress;
+    resume_from: id of a failed reindex task to continue, see
+                 ggrc.fulltext.reindex.
+  """
+  progress = None
+  if resume_from:
+    progress = fulltext_reindex.get_progress(
+        all_models.BackgroundTask.query.get(resume_from))
+  progress = fulltext_reindex.reindex_models(task, progress)
+
+  if not progress.get("snapshots_done"):
+    logger.info("Updating index for: %s", "Snapshot")
+    with benchmark("Create records for %s" % "Snapshot"):
+      reindex_snapshots()
+    progress["snapshots_done"] = True
+    fulltext_reindex.save_progress(task, progress)
+  get_indexer().invalidate_cache()
   start_compute_attributes("all_latest")
 
 
@@ -441,11 +471,22 @@ def object_browser():
 @admin_required
 def admin_reindex():
   """Calls a webhook that reindexes indexable objects
+
+  If the latest reindex task has failed, the new one continues from its last
+  completed shard.
   """
+  parameters = {}
+  last_task = all_models.BackgroundTask.query.filter(
+      all_models.BackgroundTask.name.like("reindex%"),
+  ).order_by(all_models.BackgroundTask.id.desc()).first()
+  if (last_task and last_task.status == "Failure" and
+          fulltext_reindex.get_progress(last_task)):
+    parameters["resume_from"] = last_task.id
   task_queue = create_task(
       name="reindex",
       url=url_for(reindex.__name__),
-      queued_callback=reindex
+      queued_callback=reindex,
+      parameters=parameters,
   )
   return task_queue.make_response(
       app.make_response(("scheduled %s" % task_queue.name, 200,
@@ -468,6 +509,21 @@ def admin_refresh_revisions():
                          [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/rebuild_user_object_index", methods=["POST"])
+@login_required
+@admin_required
+def admin_rebuild_user_object_index():
+  """Calls a webhook that rebuilds the index of objects related to people."""
+  task_queue = create_task(
+      "rebuild_user_object_index",
+      url_for(rebuild_user_object_index.__name__),
+      rebuild_user_object_index,
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
 @app.route("/admin/compute_attributes", methods=["POST"])
 @login_required
 @admin_required
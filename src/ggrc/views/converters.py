@@ -7,33 +7,42 @@ This module handles all view related function to import and export pages
 including the import/export api endponts.
 """
 
+import itertools
 from logging import getLogger
 
 from apiclient.errors import HttpError
 
 from flask import current_app
+from flask import url_for
 from flask import request
 from flask import json
 from flask import render_template
+from flask import stream_with_context
 from werkzeug.exceptions import (
     BadRequest, InternalServerError, Unauthorized
 )
 
+from ggrc import db
 from ggrc import settings
 from ggrc.gdrive import verify_credentials
 from ggrc.gdrive import file_actions as fa
 from ggrc.app import app
 from ggrc.converters.base import Converter
-from ggrc.converters.import_helper import generate_csv_string
 from ggrc.query.exceptions import BadQueryException
 from ggrc.query.builder import QueryHelper
 from ggrc.login import login_required
+from ggrc.models.background_task import create_task
+from ggrc.models.background_task import queued_task
 from ggrc.utils import benchmark
 
 
 # pylint: disable=invalid-name
 logger = getLogger(__name__)
 
+# Last row of exported csv files that failed after their streaming started
+EXPORT_STREAM_ERROR = ("Export failed due to internal server error. "
+                       "The file is incomplete.")
+
 
 def check_required_headers(required_headers):
   """Check required headers to the current request"""
@@ -70,25 +79,28 @@ def handle_export_request():
       current_time = data.get("current_time")
       query_helper = QueryHelper(objects)
       ids_by_type = query_helper.get_ids()
-    with benchmark("Generate CSV array"):
-      converter = Converter(ids_by_type=ids_by_type)
-      csv_data = converter.to_array()
-    with benchmark("Generate CSV string"):
-      csv_string = generate_csv_string(csv_data)
-    with benchmark("Make response."):
-      object_names = "_".join(converter.get_object_names())
-      filename = "{}_{}.csv".format(object_names, current_time)
-      if export_to == "gdrive":
-        gfile = fa.create_gdrive_file(csv_string, filename)
-        headers = [('Content-Type', 'application/json'), ]
-        return current_app.make_response((json.dumps(gfile), 200, headers))
-      if export_to == "csv":
-        headers = [
-            ("Content-Type", "text/csv"),
-            ("Content-Disposition",
-             "attachment; filename='{}'".format(filename)),
-        ]
-        return current_app.make_response((csv_string, 200, headers))
+    converter = Converter(ids_by_type=ids_by_type)
+    # CSV parts are generated while they are uploaded or sent. The first one
+    # is generated before the response starts, so that early errors still
+    # get an error response.
+    csv_chunks = converter.to_csv_chunks()
+    csv_chunks = itertools.chain([next(csv_chunks, "")], csv_chunks)
+    object_names = "_".join(converter.get_object_names())
+    filename = "{}_{}.csv".format(object_names, current_time)
+    if export_to == "gdrive":
+      with benchmark("Generate CSV and upload it to GDrive"):
+        gfile = fa.create_gdrive_file(csv_chunks, filename)
+      headers = [('Content-Type', 'application/json'), ]
+      return current_app.make_response((json.dumps(gfile), 200, headers))
+    if export_to == "csv":
+      headers = [
+          ("Content-Type", "text/csv"),
+          ("Content-Disposition",
+           "attachment; filename='{}'".format(filename)),
+      ]
+      return current_app.response_class(
+          stream_with_context(_stream_csv(csv_chunks)),
+          headers=headers)
   except BadQueryException as exception:
     raise BadRequest(exception.message)
   except HttpError as e:
@@ -101,6 +113,22 @@ def handle_export_request():
     raise InternalServerError("Export failed due to internal server error.")
 
 
+def _stream_csv(chunks):
+  """Stream csv parts, marking the file as incomplete on errors.
+
+  The status of a streamed response can't be changed once it has started, so
+  if an error is raised, the file ends with EXPORT_STREAM_ERROR row and the
+  stream is aborted.
+  """
+  try:
+    for chunk in chunks:
+      yield chunk
+  except Exception as e:  # pylint: disable=broad-except
+    logger.exception("Export failed: %s", e.message)
+    yield "{}\r\n".format(EXPORT_STREAM_ERROR)
+    raise
+
+
 def check_import_file():
   """Check if imported file format and type is valid"""
   if "file" not in request.files or not request.files["file"]:
@@ -127,9 +155,15 @@ def parse_import_request():
 
 
 def handle_import_request():
-  """Import request handler"""
+  """Import request handler
+
+  With "X-import-in-background: true" header the import runs as a background
+  task and its info is returned, see run_import_task.
+  """
   dry_run, file_data = parse_import_request()
   csv_data = fa.get_gdrive_file(file_data)
+  if request.headers.get("X-import-in-background") == "true":
+    return schedule_import(dry_run, csv_data)
   try:
     converter = Converter(dry_run=dry_run, csv_data=csv_data)
     converter.import_csv()
@@ -142,6 +176,79 @@ def handle_import_request():
   raise BadRequest("Import failed due to server error.")
 
 
+def get_csv_size(csv_data):
+  """Get the number of characters in all cells of csv data."""
+  return sum(len(cell) for row in csv_data for cell in row)
+
+
+def schedule_import(dry_run, csv_data):
+  """Create a background task importing csv data.
+
+  The csv data is stored in the task parameters until the task finishes, so
+  files larger than IMPORT_BACKGROUND_MAX_SIZE are rejected.
+  """
+  if get_csv_size(csv_data) > settings.IMPORT_BACKGROUND_MAX_SIZE:
+    raise BadRequest(
+        "The file is too large to be imported in background, its cells may "
+        "contain at most {} characters. Please split the file and import "
+        "the parts separately.".format(settings.IMPORT_BACKGROUND_MAX_SIZE))
+  task = create_task(
+      name="import",
+      url=url_for("run_import_task"),
+      queued_callback=run_import_task,
+      parameters={"dry_run": dry_run, "csv_data": csv_data},
+  )
+  response_json = json.dumps({
+      "id": task.id,
+      "name": task.name,
+      "status": task.status,
+  })
+  headers = [("Content-Type", "application/json")]
+  return current_app.make_response((response_json, 200, headers))
+
+
+def save_import_progress(task, info):
+  """Save info of imported blocks as the current result of the task."""
+  task.result = {
+      "content": json.dumps(info),
+      "status_code": 200,
+      "headers": [("Content-Type", "application/json")],
+  }
+  db.session.add(task)
+  db.session.commit()
+
+
+@queued_task
+def run_import_task(task):
+  """Import csv data of a background task.
+
+  Blocks are committed in chunks and info of all blocks is saved in the task
+  result after every commit, so it can be polled on /background_task/<id>.
+  Blocks of dry runs are validated in IMPORT_DRY_RUN_WORKERS processes. The
+  final result is the same as the response of a synchronous import.
+
+  The csv data is removed from the task parameters once the import ends.
+  """
+  dry_run = task.parameters["dry_run"]
+  try:
+    converter = Converter(
+        dry_run=dry_run,
+        csv_data=task.parameters["csv_data"],
+        progress_callback=lambda info: save_import_progress(task, info),
+        commit_size=settings.IMPORT_COMMIT_SIZE,
+        dry_run_workers=settings.IMPORT_DRY_RUN_WORKERS,
+    )
+    converter.import_csv()
+  finally:
+    db.session.rollback()
+    task.parameters = {"dry_run": dry_run}
+    db.session.add(task)
+    db.session.commit()
+  response_json = json.dumps(converter.get_info())
+  headers = [("Content-Type", "application/json")]
+  return current_app.make_response((response_json, 200, headers))
+
+
 def init_converter_views():
   """Initialize views for import and export."""
 
@@ -161,6 +268,9 @@ def init_converter_views():
     with benchmark("handle import request"):
       return handle_import_request()
 
+  app.add_url_rule("/_background_tasks/import_csv",
+                   view_func=run_import_task, methods=["POST"])
+
   @app.route("/import")
   @login_required
   def import_view():
@@ -22,6 +22,7 @@ from ggrc.models import all_models
 from ggrc.models.audit import Audit
 from ggrc.models.program import Program
 from ggrc.rbac import permissions as rbac_permissions
+from ggrc.rbac.permissions_provider import CompiledPermissions
 from ggrc.rbac.permissions_provider import DefaultUserPermissions
 from ggrc.services.common import _get_cache_manager
 from ggrc.services import signals
@@ -392,6 +393,9 @@ def load_permissions_for(user):
     keys.
   'condition' is the string name of a conditional operator, such as 'contains'.
   'terms' are the arguments to the 'condition'.
+
+  The dictionary is returned as CompiledPermissions together with the index
+  used for permission checks, and both are stored in the permissions cache.
   """
   permissions = {}
   key = 'permissions:{}'.format(user.id)
@@ -399,6 +403,8 @@ def load_permissions_for(user):
   with benchmark("load_permissions > query memcache"):
     cache, result = query_memcache(key)
     if result:
+      if not isinstance(result, CompiledPermissions):
+        result = CompiledPermissions(result)
       return result
 
   with benchmark("load_permissions > load default permissions"):
@@ -419,6 +425,9 @@ def load_permissions_for(user):
   with benchmark("load_permissions > load backlog workflows"):
     load_backlog_workflows(permissions)
 
+  with benchmark("load_permissions > compile permissions"):
+    permissions = CompiledPermissions(permissions)
+
   with benchmark("load_permissions > store results into memcache"):
     store_results_into_memcache(permissions, cache, key)
 
@@ -10,6 +10,7 @@ from sqlalchemy.sql.expression import or_, and_
 from ggrc import db
 from ggrc import login
 from ggrc.models import all_models
+from ggrc.models import user_object_index
 from ggrc.access_control.role import get_custom_roles_for
 
 
@@ -73,8 +74,10 @@ def remove_related_acl(related_to_del):
         all_models.AccessControlList.object_type == rtype,
         all_models.AccessControlList.object_id.in_(ids)))
 
+  index_keys = user_object_index.get_acl_keys(db.session, or_(*qfilter))
   db.session.query(all_models.AccessControlList).filter(or_(*qfilter)).delete(
       synchronize_session='fetch')
+  user_object_index.refresh(db.session, index_keys)
 
 
 def _add_children_to_context(child_model, foreign_key, parent_wf_map,
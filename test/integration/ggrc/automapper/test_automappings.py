@@ -5,6 +5,8 @@
 
 import itertools
 from contextlib import contextmanager
+
+import mock
 from sqlalchemy.orm import load_only
 
 import ggrc
@@ -13,6 +15,7 @@ from ggrc import models
 from ggrc.models import all_models
 from ggrc.models import Automapping
 from integration.ggrc import TestCase
+from integration.ggrc import api_helper
 from integration.ggrc import generator
 from integration.ggrc.models import factories
 from integration.ggrc.models.factories import random_str
@@ -121,6 +124,33 @@ class TestAutomappings(TestCase):
         implied=(obj1, obj3),
     )
 
+  @mock.patch("ggrc.settings.AUTOMAPPING_ASYNC", 1)
+  def test_async_automapping(self):
+    """Test automappings generated in a background task"""
+    program = self.create_object(models.Program, {
+        'title': make_name('Program')
+    })
+    regulation = self.create_object(models.Regulation, {
+        'title': make_name('Test PD Regulation')
+    })
+    objective = self.create_object(models.Objective, {
+        'title': make_name('Objective')
+    })
+    self.create_mapping(program, regulation)
+    response, relationship = self.gen.generate_relationship(regulation,
+                                                            objective)
+    self.assertEqual(response.json["relationship"]["extras"],
+                     {"automapping_pending": True})
+    self.assert_mapping(program, objective)
+    task = all_models.BackgroundTask.query.filter(
+        all_models.BackgroundTask.name.like("generate_automappings%"),
+    ).order_by(all_models.BackgroundTask.id.desc()).first()
+    self.assertEqual(task.status, "Success")
+
+    relationships_count = models.Relationship.query.count()
+    automapper.generate_deferred_automappings([relationship.id])
+    self.assertEqual(models.Relationship.query.count(), relationships_count)
+
   def test_directive_program_mapping(self):
     """Test mapping directive to a program"""
     self.with_permutations(
@@ -543,3 +573,44 @@ class TestIssueAutomappings(TestCase):
                                   destination=self.asmt)
 
     self.assertEqual(all_models.Automapping.query.count(), 0)
+
+  @mock.patch("ggrc.settings.AUTOMAPPING_ASYNC", 1)
+  def test_async_add_related(self):
+    """Relationships added by PUT actions are automapped in one task."""
+    factories.RelationshipFactory(source=self.issue_audit,
+                                  destination=self.asmt)
+    with factories.single_commit():
+      snapshots = []
+      for _ in range(2):
+        snapshottable = factories.ControlFactory()
+        revision = all_models.Revision.query.filter(
+            all_models.Revision.resource_id == snapshottable.id,
+            all_models.Revision.resource_type == snapshottable.type,
+        ).first()
+        snapshots.append(factories.SnapshotFactory(
+            parent=self.audit,
+            revision_id=revision.id,
+            child_type=snapshottable.type,
+            child_id=snapshottable.id,
+        ))
+    snapshot_ids = [snapshot.id for snapshot in snapshots]
+    tasks_count = all_models.BackgroundTask.query.count()
+
+    response = api_helper.Api().put(self.asmt, {"actions": {"add_related": [
+        {"id": snapshot_id, "type": "Snapshot"}
+        for snapshot_id in snapshot_ids
+    ]}})
+    self.assert200(response)
+
+    tasks = all_models.BackgroundTask.query.order_by(
+        all_models.BackgroundTask.id,
+    ).all()[tasks_count:]
+    self.assertEqual(len(tasks), 1)
+    self.assertTrue(tasks[0].name.startswith("generate_automappings"))
+    self.assertEqual(tasks[0].status, "Success")
+    self.assertEqual(len(tasks[0].parameters["relationship_ids"]), 2)
+    issue = all_models.Issue.query.get(self.issue_audit.id)
+    for snapshot_id in snapshot_ids:
+      snapshot = all_models.Snapshot.query.get(snapshot_id)
+      self.assertIsNotNone(
+          all_models.Relationship.find_related(issue, snapshot))
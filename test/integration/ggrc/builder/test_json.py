@@ -1,13 +1,16 @@
 # Copyright (C) 2018 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
+import mock
 from mock import MagicMock
 
 import ggrc.builder
 import ggrc.models
+from ggrc.builder import json
 from ggrc.builder.json import publish
 from ggrc.services.common import Resource
 from integration.ggrc import TestCase
+from integration.ggrc.models import factories
 
 
 class TestBuilder(TestCase):
@@ -111,3 +114,32 @@ class TestBuilder(TestCase):
     self.assertDictContainsSubset(
         {'prop_b': 'prop_b', 'mixin': 'mixin_b'},
         json_obj)
+
+
+class TestPublishPlans(TestCase):
+  """Tests for publish plans compiled once per class."""
+
+  def test_plan_reuse(self):
+    """Plans are compiled for the first published object of a class."""
+    # pylint: disable=protected-access
+    with factories.single_commit():
+      for _ in range(3):
+        factories.ControlFactory()
+    controls = ggrc.models.Control.eager_query().all()
+    builder = json.get_json_builder(ggrc.models.Control)
+    builder._publish_plans.clear()
+
+    with mock.patch.object(builder, "_compile_publish_plan",
+                           wraps=builder._compile_publish_plan) as compile_:
+      compiled = [publish(controls[0])]
+      first_count = compile_.call_count
+      compiled.extend(publish(control) for control in controls[1:])
+    self.assertGreater(first_count, 0)
+    self.assertEqual(compile_.call_count, first_count)
+
+    dispatched = []
+    for control in controls:
+      builder._publish_plans.clear()
+      dispatched.append(publish(control))
+    self.assertEqual(json.publish_representation(compiled),
+                     json.publish_representation(dispatched))
@@ -4,11 +4,13 @@ from os.path import abspath, dirname, join
 
 import collections
 import ddt
+import mock
 from flask.json import dumps
 
 from ggrc.converters import get_importables
 from ggrc.models import inflector
 from ggrc.models.reflection import AttributeInfo
+from ggrc.views import converters
 from integration.ggrc import TestCase
 from integration.ggrc.models import factories
 
@@ -583,3 +585,47 @@ class TestExportMultipleObjects(TestCase):
     }]
     exported_data = self.export_parsed_csv(search_request)[model]
     self.assertEqual(exported_data, obj_dicts)
+
+
+class TestExportStreamError(TestCase):
+  """Tests for errors raised while an export is streamed."""
+
+  def setUp(self):
+    super(TestExportStreamError, self).setUp()
+    self.client.get("/login")
+
+  def test_mid_stream_error(self):
+    """Files failed after the first part end with an error row."""
+    def failing_chunks(rows, width):
+      # pylint: disable=unused-argument
+      yield "Object type,\r\n"
+      raise ValueError("Export error")
+
+    factories.PolicyFactory()
+    with mock.patch("ggrc.converters.base.generate_csv_chunks",
+                    failing_chunks):
+      response = self.export_csv([{"object_name": "Policy",
+                                   "fields": "all"}])
+      self.assertEqual(response.status_code, 200)
+      chunks = []
+      with self.assertRaises(ValueError):
+        for chunk in response.response:
+          chunks.append(chunk)
+
+    self.assertEqual(chunks, [
+        "Object type,\r\n",
+        "{}\r\n".format(converters.EXPORT_STREAM_ERROR),
+    ])
+
+  def test_first_part_error(self):
+    """Errors raised before the first part get an error response."""
+    def failing_chunks(rows, width):
+      # pylint: disable=unused-argument
+      raise ValueError("Export error")
+      yield  # pylint: disable=unreachable
+
+    with mock.patch("ggrc.converters.base.generate_csv_chunks",
+                    failing_chunks):
+      response = self.export_csv([{"object_name": "Policy",
+                                   "fields": "all"}])
+    self.assertEqual(response.status_code, 500)
@@ -0,0 +1,111 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for imports running as background tasks."""
+
+import csv
+import json
+import os
+import tempfile
+
+import mock
+import sqlalchemy as sa
+
+from ggrc import models
+from ggrc.services import signals
+from ggrc.views import converters
+from integration.ggrc import TestCase
+from integration.ggrc import read_imported_file
+from integration.ggrc.models import factories
+
+
+class TestBackgroundImport(TestCase):
+  """Tests for imports with X-import-in-background header."""
+
+  def setUp(self):
+    super(TestBackgroundImport, self).setUp()
+    self.client.get("/login")
+
+  @mock.patch("ggrc.gdrive.file_actions.get_gdrive_file",
+              new=read_imported_file)
+  def _post_import_in_background(self, filename):
+    """Send a request to import the csv file in background."""
+    with open(os.path.join(self.CSV_DIR, filename)) as csv_file:
+      return self.client.post(
+          "/_service/import_csv",
+          data={"file": (csv_file, filename)},
+          headers={
+              "X-test-only": "false",
+              "X-requested-by": "GGRC",
+              "X-import-in-background": "true",
+          },
+      )
+
+  def _import_in_background(self, filename):
+    """Schedule an import of the csv file and get the task info."""
+    response = self._post_import_in_background(filename)
+    self.assert200(response)
+    return json.loads(response.data)
+
+  @mock.patch("ggrc.settings.IMPORT_COMMIT_SIZE", 1)
+  def test_import_progress(self):
+    """Import result and progress are saved in the task."""
+    with mock.patch.object(converters, "save_import_progress",
+                           wraps=converters.save_import_progress) as progress:
+      task_info = self._import_in_background("controls_no_warnings.csv")
+
+    task = models.BackgroundTask.query.get(task_info["id"])
+    self.assertEqual(task.status, "Success")
+    self.assertGreater(progress.call_count, 1)
+    self.assertEqual(task.parameters, {"dry_run": False})
+
+    response = self.client.get("/background_task/{}".format(task.id))
+    self.assert200(response)
+    result = json.loads(response.data)
+    self._check_csv_response(result, {})
+    self.assertEqual(sum(block["created"] for block in result),
+                     models.Control.query.count())
+
+  @mock.patch("ggrc.settings.IMPORT_COMMIT_SIZE", 1)
+  def test_later_chunk_history(self):
+    """Pre-commit signals of later chunks see changes of updated objects."""
+    with factories.single_commit():
+      for index in range(3):
+        factories.ControlFactory(slug="CONTROL-{}".format(index),
+                                 title="Old title {}".format(index))
+    changes = {}
+
+    def record_change(sender, obj=None, src=None, service=None):
+      # pylint: disable=unused-argument
+      changes[obj.slug] = sa.inspect(obj).attrs.title.history.deleted
+
+    with tempfile.NamedTemporaryFile(dir=self.CSV_DIR, suffix=".csv") as tmp:
+      writer = csv.writer(tmp)
+      writer.writerow(["Object type"])
+      writer.writerow(["Control", "Code", "Title"])
+      for index in range(3):
+        writer.writerow(["", "CONTROL-{}".format(index),
+                         "New title {}".format(index)])
+      tmp.flush()
+      with signals.Restful.model_put.connected_to(record_change,
+                                                  sender=models.Control):
+        self._import_in_background(os.path.basename(tmp.name))
+
+    self.assertEqual(changes, {
+        "CONTROL-{}".format(index): ["Old title {}".format(index)]
+        for index in range(3)
+    })
+    self.assertEqual(
+        {control.title for control in models.Control.query},
+        {"New title {}".format(index) for index in range(3)},
+    )
+
+  @mock.patch("ggrc.settings.IMPORT_BACKGROUND_MAX_SIZE", 10)
+  def test_too_large_file(self):
+    """Files too large to be stored in a task are rejected."""
+    response = self._post_import_in_background("controls_no_warnings.csv")
+
+    self.assert400(response)
+    self.assertIn("too large", response.data)
+    self.assertEqual(models.BackgroundTask.query.count(), 0)
+    self.assertEqual(models.Control.query.count(), 0)
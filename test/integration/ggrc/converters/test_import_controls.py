@@ -7,7 +7,14 @@
 
 import collections
 
+import mock
+from sqlalchemy import and_
+from sqlalchemy import exc
+
+from ggrc import db
 from ggrc import models
+from ggrc.converters import base_row
+from ggrc.services import signals
 
 from integration.ggrc import TestCase
 from integration.ggrc.models import factories
@@ -102,3 +109,141 @@ class TestControlsImport(TestCase):
     fail_response = {u'message': u'Import failed due to server error.',
                      u'code': 400}
     self.assertNotEqual(response, fail_response)
+
+
+class TestBatchedControlsImport(TestCase):
+  """Tests for flushing imported objects in batches."""
+
+  def setUp(self):
+    super(TestBatchedControlsImport, self).setUp()
+    self.client.get("/login")
+
+  @staticmethod
+  def _control_rows(count):
+    return [collections.OrderedDict([
+        ("object_type", "Control"),
+        ("code", "CONTROL-{}".format(index)),
+        ("title", "Control {}".format(index)),
+        ("Admin", "user@example.com"),
+    ]) for index in range(count)]
+
+  @mock.patch("ggrc.settings.IMPORT_BATCH_SIZE", 2)
+  def test_import_in_batches(self):
+    """All rows are imported when they are flushed in batches."""
+    response = self.import_data(*self._control_rows(5))
+    self.assertEqual(response[0]["created"], 5)
+    self.assertEqual(models.Control.query.count(), 5)
+
+  @mock.patch("ggrc.settings.IMPORT_BATCH_SIZE", 2)
+  def test_failed_batch(self):
+    """Only the failing row of a failed batch gets an error."""
+    insert_object = base_row.RowConverter.insert_object
+
+    def failing_insert_object(row_converter):
+      if row_converter.obj.slug == "CONTROL-3":
+        raise exc.SQLAlchemyError("Failed insert")
+      insert_object(row_converter)
+
+    with mock.patch.object(base_row.RowConverter, "insert_object",
+                           failing_insert_object):
+      response = self.import_data(*self._control_rows(5))
+
+    self.assertEqual(len(response[0]["row_errors"]), 1)
+    self.assertEqual(
+        sorted(control.slug for control in models.Control.query),
+        ["CONTROL-0", "CONTROL-1", "CONTROL-2", "CONTROL-4"],
+    )
+
+  def _import_with_failing_row(self, method_name):
+    """Import rows of controls mapped to a program failing on CONTROL-2.
+
+    CONTROL-0 exists and gets a new title, the method of the row converter
+    with method_name raises an error for CONTROL-2.
+
+    Returns:
+      import response and id of the program.
+    """
+    with factories.single_commit():
+      factories.ControlFactory(slug="CONTROL-0", title="Old title")
+      program = factories.ProgramFactory()
+    program_id = program.id
+    rows = self._control_rows(3)
+    for row in rows:
+      row["map:program"] = program.slug
+    method = getattr(base_row.RowConverter, method_name)
+
+    def failing_method(row_converter):
+      if row_converter.obj.slug == "CONTROL-2":
+        raise exc.SQLAlchemyError("Failed insert")
+      method(row_converter)
+
+    with mock.patch.object(base_row.RowConverter, method_name,
+                           failing_method):
+      return self.import_data(*rows), program_id
+
+  @staticmethod
+  def _get_mapped_slugs(program_id):
+    """Get slugs of controls mapped to the program, once per mapping."""
+    rel = models.Relationship
+    sources = db.session.query(models.Control.slug).join(
+        rel, and_(rel.source_type == "Control",
+                  rel.source_id == models.Control.id),
+    ).filter(rel.destination_type == "Program",
+             rel.destination_id == program_id)
+    destinations = db.session.query(models.Control.slug).join(
+        rel, and_(rel.destination_type == "Control",
+                  rel.destination_id == models.Control.id),
+    ).filter(rel.source_type == "Program",
+             rel.source_id == program_id)
+    return sorted(slug for slug, in sources.union_all(destinations))
+
+  @mock.patch("ggrc.settings.IMPORT_BATCH_SIZE", 3)
+  def test_failed_batch_rows(self):
+    """Retried rows of a failed batch keep their changes."""
+    response, program_id = self._import_with_failing_row("insert_object")
+
+    self.assertEqual(len(response[0]["row_errors"]), 1)
+    self.assertEqual(response[0]["updated"], 1)
+    self.assertEqual(
+        models.Control.query.filter_by(slug="CONTROL-0").one().title,
+        "Control 0",
+    )
+    self.assertEqual(
+        sorted(control.slug for control in models.Control.query),
+        ["CONTROL-0", "CONTROL-1"],
+    )
+    self.assertEqual(self._get_mapped_slugs(program_id),
+                     ["CONTROL-0", "CONTROL-1"])
+
+  @mock.patch("ggrc.settings.IMPORT_BATCH_SIZE", 3)
+  def test_failed_batch_signals(self):
+    """Retried rows of a failed batch get pre-commit signals once."""
+    signalled = collections.Counter()
+
+    def count_signal(sender, obj=None, **kwargs):
+      """Count pre-commit signals of every control."""
+      # pylint: disable=unused-argument
+      signalled[obj.slug] += 1
+
+    with signals.Restful.model_posted.connected_to(count_signal,
+                                                   sender=models.Control):
+      with signals.Restful.model_put.connected_to(count_signal,
+                                                  sender=models.Control):
+        self._import_with_failing_row("insert_object")
+
+    self.assertEqual(signalled, {"CONTROL-0": 1, "CONTROL-1": 1,
+                                 "CONTROL-2": 1})
+
+  @mock.patch("ggrc.settings.IMPORT_BATCH_SIZE", 3)
+  def test_failed_mappings_batch(self):
+    """Retried rows of a failed batch of mappings are mapped once."""
+    response, program_id = self._import_with_failing_row(
+        "insert_secondary_objects")
+
+    self.assertEqual(len(response[0]["row_errors"]), 1)
+    self.assertEqual(
+        models.Control.query.filter_by(slug="CONTROL-0").one().title,
+        "Control 0",
+    )
+    self.assertEqual(self._get_mapped_slugs(program_id),
+                     ["CONTROL-0", "CONTROL-1"])
@@ -0,0 +1,76 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for dry run imports validated in worker processes."""
+
+import json
+import os
+
+import ddt
+import mock
+
+from ggrc import models
+from ggrc.converters import dry_run
+from integration.ggrc import TestCase
+from integration.ggrc import read_imported_file
+
+
+@ddt.ddt
+class TestParallelDryRun(TestCase):
+  """Blocks validated in workers get the same info as sequentially."""
+
+  def setUp(self):
+    super(TestParallelDryRun, self).setUp()
+    self.client.get("/login")
+
+  @mock.patch("ggrc.gdrive.file_actions.get_gdrive_file",
+              new=read_imported_file)
+  def _dry_run_in_background(self, filename):
+    """Validate the csv file in a background task and get its result."""
+    with open(os.path.join(self.CSV_DIR, filename)) as csv_file:
+      response = self.client.post(
+          "/_service/import_csv",
+          data={"file": (csv_file, filename)},
+          headers={
+              "X-test-only": "true",
+              "X-requested-by": "GGRC",
+              "X-import-in-background": "true",
+          },
+      )
+    self.assert200(response)
+    task_id = json.loads(response.data)["id"]
+    response = self.client.get("/background_task/{}".format(task_id))
+    self.assert200(response)
+    return json.loads(response.data)
+
+  @ddt.data(
+      "comprehensive_sheet1.csv",
+      "multi_basic_policy_orggroup_product_with_mappings.csv",
+  )
+  @mock.patch("ggrc.settings.IMPORT_DRY_RUN_WORKERS", 3)
+  def test_dry_run_info(self, filename):
+    """Info of {} is the same for sequential and parallel validation."""
+    expected = self.import_file(filename, dry_run=True)
+    with mock.patch.object(dry_run, "validate_blocks",
+                           wraps=dry_run.validate_blocks) as validate_blocks:
+      response = self._dry_run_in_background(filename)
+    self.assertEqual(validate_blocks.call_count, 1)
+    self.assertEqual(response, expected)
+    self.assertEqual(models.Policy.query.count(), 0)
+
+  @mock.patch("ggrc.settings.IMPORT_DRY_RUN_WORKERS", 3)
+  def test_no_workers_in_requests(self):
+    """Dry runs of import requests are validated in the request process."""
+    with mock.patch.object(dry_run.multiprocessing, "Pool") as pool:
+      self.import_file("comprehensive_sheet1.csv", dry_run=True)
+    self.assertFalse(pool.called)
+
+  @mock.patch("ggrc.settings.IMPORT_DRY_RUN_WORKERS", 3)
+  def test_cleaned_columns(self):
+    """Columns removed from blocks don't shift cells validated in workers."""
+    filename = "dry_run_cleaned_columns.csv"
+    expected = self.import_file(filename, dry_run=True)
+    response = self._dry_run_in_background(filename)
+    self.assertEqual(response, expected)
+    warnings = [block["block_warnings"] for block in expected]
+    self.assertTrue(all(warnings), warnings)
@@ -0,0 +1,55 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for prefetching of objects referenced in imported files."""
+
+from collections import OrderedDict
+
+from ggrc import models
+from ggrc.utils import QueryCounter
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestImportPrefetch(TestCase):
+  """Referenced people and objects are resolved once for all rows."""
+
+  MARKETS_COUNT = 10
+
+  def setUp(self):
+    super(TestImportPrefetch, self).setUp()
+    self.client.get("/login")
+    with factories.single_commit():
+      self.emails = [factories.PersonFactory().email for _ in range(2)]
+      self.product_slugs = [factories.ProductFactory().slug
+                            for _ in range(2)]
+
+  def _import_markets(self):
+    """Import markets with owners and mapped products and count queries."""
+    markets = [OrderedDict([
+        ("object_type", "Market"),
+        ("code", "market-{}".format(index)),
+        ("title", "Market {}".format(index)),
+        ("Admin", "\n".join(self.emails + ["missing@example.com"])),
+        ("map:product", "\n".join(self.product_slugs + ["missing-slug"])),
+    ]) for index in range(self.MARKETS_COUNT)]
+    with QueryCounter() as counter:
+      response = self.import_data(*markets)
+    return response, counter.queries
+
+  def test_single_lookup_per_kind(self):
+    """Emails and slugs of all rows are looked up with IN queries."""
+    response, queries = self._import_markets()
+
+    self.assertEqual(response[0]["created"], self.MARKETS_COUNT)
+    self.assertEqual(
+        [query for query in queries
+         if "products.slug = " in query or "people.email = " in query],
+        [],
+    )
+    self.assertEqual(
+        len([query for query in queries if "products.slug IN" in query]), 1)
+    market = models.Market.query.filter_by(slug="market-0").one()
+    products = market.related_objects(_types={"Product"})
+    self.assertEqual({product.slug for product in products},
+                     set(self.product_slugs))
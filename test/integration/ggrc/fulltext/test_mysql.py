@@ -9,6 +9,7 @@ import sqlalchemy.exc
 from ggrc import db
 from ggrc.models import all_models
 from ggrc.fulltext import mysql
+from ggrc.utils import QueryCounter
 from integration.ggrc import TestCase
 from integration.ggrc.models import factories
 
@@ -177,3 +178,41 @@ class TestCAD(TestCase):
             (searchable_person.email, "__sort__"),
         ]),
         sorted(searchable_contents))
+
+
+class TestIncrementalReindex(TestCase):
+  """Tests for writing only changed index rows."""
+
+  @staticmethod
+  def _index_writes(queries):
+    return [q for q in queries
+            if "fulltext_record_properties" in q and
+            q.lstrip().split(None, 1)[0] in ("INSERT", "UPDATE", "DELETE")]
+
+  def test_unchanged_object(self):
+    """Reindexing an unchanged object doesn't write to the index."""
+    control = factories.ControlFactory()
+    with QueryCounter() as counter:
+      all_models.Control.bulk_record_update_for([control.id])
+    self.assertEqual(self._index_writes(counter.queries), [])
+
+  def test_changed_title(self):
+    """Only rows of changed properties are updated."""
+    control = factories.ControlFactory()
+    control_id = control.id
+    db.session.execute(all_models.Control.__table__.update().where(
+        all_models.Control.id == control_id
+    ).values(title="new title"))
+    with QueryCounter() as counter:
+      all_models.Control.bulk_record_update_for([control_id])
+    writes = self._index_writes(counter.queries)
+    self.assertEqual(len(writes), 1)
+    self.assertTrue(writes[0].lstrip().startswith("UPDATE"))
+    self.assertIn(
+        "new title",
+        [row.content for row in mysql.MysqlRecordProperty.query.filter(
+            mysql.MysqlRecordProperty.type == "Control",
+            mysql.MysqlRecordProperty.key == control_id,
+            mysql.MysqlRecordProperty.property == "title",
+        )],
+    )
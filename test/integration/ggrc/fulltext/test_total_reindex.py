@@ -8,7 +8,9 @@ from sqlalchemy import orm
 
 from ggrc import db
 from ggrc import fulltext
+from ggrc.fulltext import reindex
 from ggrc.fulltext.mysql import MysqlRecordProperty
+from ggrc.models import all_models
 from ggrc.utils import QueryCounter
 from ggrc.fulltext import mysql
 
@@ -133,3 +135,41 @@ class TestTotalReindex(TestCase):
               obj_count=obj_count,
           )
       )
+
+
+class TestResumableReindex(TestCase):
+  """Tests for sharded and resumable reindex."""
+
+  def setUp(self):
+    super(TestResumableReindex, self).setUp()
+    with ggrc_factories.single_commit():
+      self.control_ids = sorted(
+          ggrc_factories.ControlFactory().id for _ in range(5))
+    self.indexer = fulltext.get_indexer()
+
+  def _indexed_ids(self):
+    """Get ids of Controls that have full text records."""
+    return sorted(key for key, in db.session.query(
+        self.indexer.record_type.key.distinct(),
+    ).filter(self.indexer.record_type.type == "Control"))
+
+  def test_get_shards(self):
+    """Ids are split into shards by keyset and the last one is open."""
+    shards = reindex.get_shards(all_models.Control, 2)
+    self.assertEqual(shards, [
+        ["Control", None, self.control_ids[1]],
+        ["Control", self.control_ids[1], self.control_ids[3]],
+        ["Control", self.control_ids[3], None],
+    ])
+
+  def test_resume(self):
+    """Completed shards of a previous run are not reindexed again."""
+    self.indexer.record_type.query.delete()
+    db.session.commit()
+    progress = {
+        "shards": reindex.get_shards(all_models.Control, 2),
+        "done": [0],
+    }
+    progress = reindex.reindex_models(progress=progress)
+    self.assertEqual(sorted(progress["done"]), [0, 1, 2])
+    self.assertEqual(self._indexed_ids(), self.control_ids[2:])
@@ -5,6 +5,7 @@
 import ddt
 
 import ggrc.models
+from ggrc.models import latest_revision
 import integration.ggrc.generator
 from integration.ggrc import TestCase
 
@@ -62,6 +63,33 @@ class TestRevisions(TestCase):
     actual = {(r.action, r.content["title"]) for r in revisions}
     self.assertEqual(actual, expected)
 
+  def test_latest_revisions_index(self):
+    """Latest revisions index is updated when revisions are created."""
+    cls = ggrc.models.DataAsset
+    name = cls._inflector.table_singular  # pylint: disable=protected-access
+    _, obj = self.gen.generate(cls, name, {name: {
+        "title": "revisioned v1",
+        "context": None,
+    }})
+    created_id = _get_revisions(obj)[0].id
+    key = (obj.type, obj.id)
+    self.assertEqual(latest_revision.get_ids([key]), {key: created_id})
+
+    _, obj = self.gen.modify(obj, name, {name: {
+        "slug": obj.slug,
+        "title": "revisioned v2",
+        "context": None,
+    }})
+    modified_id = max(revision.id for revision in _get_revisions(obj))
+    self.assertEqual(latest_revision.get_ids([key]), {key: modified_id})
+    self.assertEqual(
+        latest_revision.query_for([key]).one().content["title"],
+        "revisioned v2")
+    self.assertEqual(
+        latest_revision.get_ids(
+            [key], filters=[ggrc.models.Revision.action == "created"]),
+        {key: created_id})
+
   def test_relevant_revisions(self):
     """ Test revision creation for mapping to an object """
     cls = ggrc.models.DataAsset
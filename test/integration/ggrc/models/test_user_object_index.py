@@ -0,0 +1,142 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the index of objects related to people."""
+
+from ggrc import db
+from ggrc.models import all_models
+from ggrc.models import user_object_index
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from integration.ggrc_workflows.models import factories as wf_factories
+
+
+class TestUserObjectIndex(TestCase):
+  """Index rows follow their sources and match a rebuilt index."""
+
+  def setUp(self):
+    super(TestUserObjectIndex, self).setUp()
+    with factories.single_commit():
+      self.person = factories.PersonFactory()
+      self.control = factories.ControlFactory()
+      self.role = factories.AccessControlRoleFactory(object_type="Control",
+                                                     my_work=True)
+
+  def _get_rows(self):
+    """Get index rows of the person."""
+    index = user_object_index.UserObjectIndex
+    return set(db.session.query(
+        index.object_type, index.object_id, index.source,
+    ).filter(index.person_id == self.person.id))
+
+  def test_sources_maintained(self):
+    """Rows are added and removed with ACL entries and relationships."""
+    with factories.single_commit():
+      acl = factories.AccessControlListFactory(
+          ac_role=self.role, person=self.person, object=self.control)
+      relationship = factories.RelationshipFactory(
+          source=self.control, destination=self.person)
+    control_id = self.control.id
+    self.assertEqual(self._get_rows(), {
+        ("Control", control_id, user_object_index.ACL_SOURCE),
+        ("Control", control_id, user_object_index.RELATIONSHIP_SOURCE),
+    })
+
+    db.session.delete(acl)
+    db.session.commit()
+    self.assertEqual(self._get_rows(), {
+        ("Control", control_id, user_object_index.RELATIONSHIP_SOURCE),
+    })
+
+    db.session.delete(relationship)
+    self.role.my_work = False
+    factories.AccessControlListFactory(
+        ac_role=self.role, person=self.person, object=self.control)
+    db.session.commit()
+    self.assertEqual(self._get_rows(), set())
+
+    role = all_models.AccessControlRole.query.get(self.role.id)
+    role.my_work = True
+    db.session.commit()
+    rows = self._get_rows()
+    self.assertEqual(rows, {
+        ("Control", control_id, user_object_index.ACL_SOURCE),
+    })
+
+    user_object_index.rebuild()
+    self.assertEqual(self._get_rows(), rows)
+
+  def test_replaced_person_value(self):
+    """Rows follow Map:Person values replaced by the legacy setter."""
+    with factories.single_commit():
+      other_person = factories.PersonFactory()
+      cad = factories.CustomAttributeDefinitionFactory(
+          definition_type="control",
+          attribute_type="Map:Person",
+          title="Reviewer",
+      )
+      factories.CustomAttributeValueFactory(
+          custom_attribute=cad,
+          attributable=self.control,
+          attribute_value="Person",
+          attribute_object_id=self.person.id,
+      )
+    control_id = self.control.id
+    other_person_id = other_person.id
+    self.assertEqual(self._get_rows(), {
+        ("Control", control_id, user_object_index.CUSTOM_ATTRIBUTE_SOURCE),
+    })
+
+    control = all_models.Control.query.get(control_id)
+    control.custom_attributes({
+        "custom_attributes": {cad.id: "Person:{}".format(other_person_id)},
+    })
+    db.session.commit()
+    index = user_object_index.UserObjectIndex
+    rows = set(db.session.query(
+        index.person_id, index.object_type, index.object_id, index.source,
+    ))
+    self.assertEqual(self._get_rows(), set())
+    self.assertIn(
+        (other_person_id, "Control", control_id,
+         user_object_index.CUSTOM_ATTRIBUTE_SOURCE),
+        rows,
+    )
+
+    user_object_index.rebuild()
+    self.assertEqual(rows, set(db.session.query(
+        index.person_id, index.object_type, index.object_id, index.source,
+    )))
+
+  def test_deleted_workflow_child(self):
+    """Rows of propagated workflow roles are removed with the child."""
+    role_ids = {
+        role.name: role.id
+        for role in all_models.AccessControlRole.query.filter_by(
+            object_type="Workflow")
+    }
+    mapped_role = all_models.AccessControlRole.query.get(
+        role_ids["Admin Mapped"])
+    mapped_role.my_work = True
+    with factories.single_commit():
+      workflow = wf_factories.WorkflowFactory()
+      factories.AccessControlListFactory(
+          ac_role_id=role_ids["Admin"], person=self.person, object=workflow)
+    task_group = wf_factories.TaskGroupFactory(workflow=workflow)
+    task_group_id = task_group.id
+    user_object_index.rebuild()
+    self.assertIn(
+        ("TaskGroup", task_group_id, user_object_index.ACL_SOURCE),
+        self._get_rows(),
+    )
+
+    db.session.delete(all_models.TaskGroup.query.get(task_group_id))
+    db.session.commit()
+    rows = self._get_rows()
+    self.assertNotIn(
+        ("TaskGroup", task_group_id, user_object_index.ACL_SOURCE),
+        rows,
+    )
+
+    user_object_index.rebuild()
+    self.assertEqual(self._get_rows(), rows)
@@ -0,0 +1,52 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for filtering of objects readable through access control list."""
+
+import ddt
+import mock
+
+from ggrc.utils import QueryCounter
+from integration.ggrc import TestCase
+from integration.ggrc.api_helper import Api
+from integration.ggrc.generator import ObjectGenerator
+from integration.ggrc.models import factories
+from integration.ggrc.query_helper import WithQueryApi
+
+
+@ddt.ddt
+class TestAclResources(TestCase, WithQueryApi):
+  """Creators get objects with ACL entries with inlined ids or a subquery."""
+
+  def setUp(self):
+    super(TestAclResources, self).setUp()
+    self.api = Api()
+    _, self.creator = ObjectGenerator().generate_person(user_role="Creator")
+    with factories.single_commit():
+      role = factories.AccessControlRoleFactory(object_type="Control",
+                                                read=True)
+      controls = [factories.ControlFactory() for _ in range(3)]
+      for control in controls[:2]:
+        factories.AccessControlListFactory(ac_role=role, person=self.creator,
+                                           object=control)
+    self.readable_ids = {control.id for control in controls[:2]}
+
+  @ddt.data(1000, 1)
+  def test_query_readable_ids(self, inline_limit):
+    """Creator gets controls with ACL entries with any inline limit."""
+    self.api.set_user(self.creator)
+    with mock.patch("ggrc.settings.PERMISSION_RESOURCES_INLINE_LIMIT",
+                    inline_limit):
+      with QueryCounter() as counter:
+        response = self.api.send_request(
+            self.api.client.post,
+            data=[self._make_query_dict_base("Control", type_="ids")],
+            api_link="/query",
+        )
+    self.assert200(response)
+    self.assertEqual(set(response.json[0]["Control"]["ids"]),
+                     self.readable_ids)
+    acl_subqueries = [query for query in counter.queries
+                      if "FROM access_control_list" in query and
+                      "controls" in query]
+    self.assertEqual(bool(acl_subqueries), inline_limit == 1)
@@ -5,6 +5,7 @@
 
 import collections
 
+import mock
 import sqlalchemy as sa
 
 from ggrc import db
@@ -414,6 +415,56 @@ class TestSnapshoting(SnapshotterBaseTestCase):
     )
     self.assertEqual(control_snapshot_revisions.count(), 2)
 
+  @mock.patch("ggrc.settings.SNAPSHOT_CHUNK_SIZE", 2)
+  def test_snapshot_create_in_chunks(self):
+    """Test snapshots of latest revisions are created in several chunks"""
+    program = self.create_object(models.Program, {
+        "title": "Test Program Snapshot 1"
+    })
+    controls = []
+    for index in range(5):
+      control = self.create_object(models.Control, {
+          "title": "Test Control Snapshot {}".format(index)
+      })
+      self.create_mapping(program, control)
+      controls.append(self.refresh_object(control))
+    self.api.modify_object(controls[0], {
+        "title": "Test Control Snapshot 0 EDIT 1"
+    })
+
+    audit = self.create_audit(program)
+
+    snapshots = db.session.query(models.Snapshot).filter(
+        models.Snapshot.parent_type == "Audit",
+        models.Snapshot.parent_id == audit.id,
+    ).all()
+    self.assertEqual({snapshot.child_id for snapshot in snapshots},
+                     {control.id for control in controls})
+    latest_revisions = dict(db.session.query(
+        models.Revision.resource_id,
+        sa.func.max(models.Revision.id),
+    ).filter(
+        models.Revision.resource_type == "Control",
+    ).group_by(models.Revision.resource_id))
+    for snapshot in snapshots:
+      self.assertEqual(snapshot.revision_id,
+                       latest_revisions[snapshot.child_id])
+    edited_snapshot = next(snapshot for snapshot in snapshots
+                           if snapshot.child_id == controls[0].id)
+    self.assertEqual(edited_snapshot.revision.content["title"],
+                     "Test Control Snapshot 0 EDIT 1")
+
+    self.assertEqual(models.Revision.query.filter(
+        models.Revision.resource_type == "Snapshot",
+        models.Revision.resource_id.in_(
+            [snapshot.id for snapshot in snapshots]),
+    ).count(), len(controls))
+    self.assertEqual(models.Relationship.query.filter(
+        models.Relationship.source_type == "Audit",
+        models.Relationship.source_id == audit.id,
+        models.Relationship.destination_type == "Control",
+    ).count(), len(controls))
+
   def test_creation_of_snapshots_for_multiple_parent_objects(self):
     pass
 
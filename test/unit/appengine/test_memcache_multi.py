@@ -0,0 +1,44 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Test chunked multi-key operations of MemCache."""
+
+from unittest import TestCase
+
+import mock
+
+from appengine import base
+from ggrc.cache import MemCache
+
+
+@base.with_memcache
+class TestMemcacheMulti(TestCase):
+  """Multi-key operations split keys into batches."""
+
+  KEYS_COUNT = 7
+
+  def setUp(self):
+    self.cache = MemCache()
+    self.data = {"key{}".format(i): i for i in range(self.KEYS_COUNT)}
+    patcher = mock.patch("ggrc.settings.MEMCACHE_BATCH_SIZE", 3, create=True)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_add_get_remove(self):
+    """Entries are added, read and removed in several batches."""
+    with mock.patch.object(self.cache.memcache_client, "add_multi",
+                           wraps=self.cache.memcache_client.add_multi) as add:
+      self.assertEqual(self.cache.add_multi(self.data), [])
+    self.assertEqual(add.call_count, 3)
+    self.assertEqual(self.cache.get_multi(self.data.keys()), self.data)
+    self.assertTrue(self.cache.remove_multi(self.data.keys(), 0))
+    self.assertEqual(self.cache.get_multi(self.data.keys()), {})
+
+  def test_update(self):
+    """Only existing entries are updated."""
+    self.cache.add_multi(self.data)
+    cached = self.cache.get_multi(self.data.keys())
+    self.assertEqual(
+        self.cache.update_multi({key: -1 for key in cached}), [])
+    self.assertEqual(self.cache.get_multi(self.data.keys()),
+                     {key: -1 for key in self.data})
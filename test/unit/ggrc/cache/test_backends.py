@@ -0,0 +1,65 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for cache backend clients."""
+
+import unittest
+
+from ggrc.cache import backends
+
+
+class TestLocalClient(unittest.TestCase):
+  """Tests for the in-process memcache client."""
+
+  def setUp(self):
+    self.client = backends.LocalClient(10)
+
+  def test_add_and_get(self):
+    """Entries are added only once and returned as copies."""
+    self.assertEqual(self.client.add_multi({"a": {1}, "b": 2}), [])
+    self.assertEqual(self.client.add_multi({"a": 3}), ["a"])
+    self.client.get("a").add(5)
+    self.assertEqual(self.client.get_multi(["a", "b", "c"]),
+                     {"a": {1}, "b": 2})
+
+  def test_prefix_and_delete(self):
+    """Key prefixes are applied and deletes report missing items."""
+    self.client.set_multi({"a": 1}, key_prefix="x:")
+    self.assertEqual(self.client.get("x:a"), 1)
+    self.assertEqual(self.client.delete("x:a"), backends.DELETE_SUCCESSFUL)
+    self.assertEqual(self.client.delete("x:a"), backends.DELETE_ITEM_MISSING)
+
+  def test_offset(self):
+    """Missing counters start from the initial value."""
+    self.assertEqual(self.client.offset_multi({"a": 1}), {"a": None})
+    self.assertEqual(self.client.offset_multi({"a": 1}, initial_value=0),
+                     {"a": 1})
+    self.assertEqual(self.client.offset_multi({"a": 2}), {"a": 3})
+
+
+class TestTieredClient(unittest.TestCase):
+  """Tests for the in-process tier in front of a shared backend."""
+
+  def setUp(self):
+    self.remote = backends.LocalClient(10)
+    self.client = backends.TieredClient(backends.LocalClient(10), self.remote)
+
+  def test_read_through(self):
+    """Collection entries are kept locally, status entries are not."""
+    self.remote.set_multi({"collection:a": 1, "DeleteOp:a": 2})
+    self.assertEqual(
+        self.client.get_multi(["collection:a", "DeleteOp:a"]),
+        {"collection:a": 1, "DeleteOp:a": 2},
+    )
+    self.assertEqual(self.client.local.get_multi(["collection:a",
+                                                  "DeleteOp:a"]),
+                     {"collection:a": 1})
+
+  def test_write_drops_local_copy(self):
+    """Writes through the client are visible immediately."""
+    self.remote.set("collection:a", 1)
+    self.client.get("collection:a")
+    self.client.delete("collection:a")
+    self.assertIsNone(self.client.get("collection:a"))
+    self.client.set("collection:a", 2)
+    self.assertEqual(self.client.get("collection:a"), 2)
@@ -42,3 +42,18 @@ class TestGetGDRiveFile(unittest.TestCase):
                                              "v3",
                                              http=auth_mock.return_value)
     disco_files.get.assert_called_once_with(fileId=file_data["id"])
+
+
+class TestIterableUpload(unittest.TestCase):
+  """Test resumable upload of generated data."""
+
+  def test_getbytes(self):
+    """Data is read in chunks and can be re-read from an uploaded offset."""
+    upload = file_actions.IterableUpload(iter(["abc", "defg", "hi"]),
+                                         mimetype="text/csv", chunksize=4)
+    self.assertIsNone(upload.size())
+    self.assertEqual(upload.getbytes(0, 4), "abcd")
+    # the server has accepted only 2 bytes of the previous chunk
+    self.assertEqual(upload.getbytes(2, 4), "cdef")
+    self.assertEqual(upload.getbytes(6, 4), "ghi")
+    self.assertEqual(upload.getbytes(9, 4), "")
@@ -185,3 +185,31 @@ class TestModelColumntHandler(unittest.TestCase):
       self.assertEqual(
           {"col_a": test_custom_handler, "col_b": test_handler},
           model_column_handlers(test_custom_class))
+
+
+class TestGenerateCsvChunks(unittest.TestCase):
+  """Tests for streamed csv generation."""
+
+  ROWS = [
+      [u"Object type", u"Code", u"Title"],
+      [u"Control", u"CONTROL-1"],
+      [u"", u"CONTROL-2", u"T\xeftle"],
+      [],
+  ]
+
+  def test_string_equals_chunks(self):
+    """Joined chunks are equal to the whole csv string."""
+    chunks = list(import_helper.generate_csv_chunks(self.ROWS, 3,
+                                                    chunk_size=10))
+    self.assertGreater(len(chunks), 1)
+    self.assertEqual("".join(chunks),
+                     import_helper.generate_csv_string(self.ROWS))
+
+  def test_padding(self):
+    """Rows are padded to the same width."""
+    csv_string = "".join(import_helper.generate_csv_chunks([[u"a"]], 3))
+    self.assertEqual(csv_string, "a,,\r\n")
+
+  def test_empty(self):
+    """Nothing is generated for no rows."""
+    self.assertEqual(list(import_helper.generate_csv_chunks([], 0)), [])
@@ -0,0 +1,51 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for MySQL fulltext indexers."""
+
+import unittest
+
+import mock
+from sqlalchemy.dialects import mysql as mysql_dialect
+
+from ggrc.fulltext import mysql
+
+
+class TestMysqlFulltextIndexer(unittest.TestCase):
+  """Tests for search filters using the FULLTEXT index."""
+
+  def setUp(self):
+    self.indexer = mysql.MysqlFulltextIndexer(
+        mock.Mock(FULLTEXT_MIN_TOKEN_SIZE=3))
+
+  @staticmethod
+  def _compile(clause):
+    return str(clause.compile(dialect=mysql_dialect.dialect()))
+
+  def test_boolean_query(self):
+    """All indexed words are required as prefixes."""
+    self.assertEqual(self.indexer.get_boolean_query(u"Control-12 of audit"),
+                     u"+Control* +audit*")
+
+  def test_match_filter(self):
+    """Terms with indexed words are matched against the FULLTEXT index."""
+    self.assertEqual(
+        self._compile(self.indexer.get_content_filter(u"audit")),
+        "MATCH (fulltext_record_properties.content) "
+        "AGAINST (%s IN BOOLEAN MODE) > %s",
+    )
+
+  def test_short_terms(self):
+    """Terms without indexed words are searched as substrings."""
+    self.assertIn(
+        "LIKE",
+        self._compile(self.indexer.get_content_filter(u"12")),
+    )
+
+  def test_mixed_terms(self):
+    """Short words are required as substrings of matched records."""
+    clause = self._compile(self.indexer.get_content_filter(u"Control 12"))
+    self.assertIn("MATCH (fulltext_record_properties.content)", clause)
+    self.assertIn("LIKE", clause)
+    self.assertEqual(self.indexer.get_boolean_query(u"Control 12"),
+                     u"+Control*")
@@ -0,0 +1,73 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for the relationship neighbourhoods cache."""
+
+import unittest
+
+import mock
+
+from ggrc.models import relationship_cache
+from ggrc.models.relationship import Stub
+
+
+PROGRAM = Stub("Program", 1)
+CONTROL = Stub("Control", 2)
+AUDIT = Stub("Audit", 3)
+
+
+@mock.patch("ggrc.settings.MEMCACHE_MECHANISM", False)
+@mock.patch("ggrc.settings.RELATIONSHIP_CACHE_TTL", 0)
+@mock.patch("ggrc.settings.RELATIONSHIP_CACHE_SIZE", 10)
+class TestGetRelated(unittest.TestCase):
+  """Tests for cached neighbourhoods of objects."""
+
+  GRAPH = {PROGRAM: {CONTROL}, CONTROL: {PROGRAM}, AUDIT: set()}
+
+  def setUp(self):
+    super(TestGetRelated, self).setUp()
+    for name in ("_neighbours", "_local_stamps"):
+      patcher = mock.patch.object(relationship_cache, name, None)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+    relationship_cache._clear_pending()
+    self.addCleanup(relationship_cache._clear_pending)
+    patcher = mock.patch.object(
+        relationship_cache, "_query_related",
+        side_effect=lambda stubs: {stub: set(self.GRAPH[stub])
+                                   for stub in stubs},
+    )
+    self.query = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_cached(self):
+    """Neighbourhoods are queried once."""
+    relationship_cache.get_related([PROGRAM, AUDIT])
+    related = relationship_cache.get_related([PROGRAM, CONTROL, AUDIT])
+    self.assertEqual(related, self.GRAPH)
+    self.assertEqual(self.query.call_args_list,
+                     [mock.call({PROGRAM, AUDIT}), mock.call({CONTROL})])
+
+  def test_declared_writes(self):
+    """Declared writes invalidate only their endpoints after commit."""
+    relationship_cache.get_related([PROGRAM, AUDIT])
+    with relationship_cache.declare_writes([PROGRAM, CONTROL]):
+      pass
+    relationship_cache.get_related([PROGRAM, AUDIT])
+    relationship_cache._pending.bump(clear=True)
+    relationship_cache.get_related([PROGRAM, AUDIT])
+    self.assertEqual(self.query.call_args_list, [
+        mock.call({PROGRAM, AUDIT}),
+        mock.call({PROGRAM}),
+        mock.call({PROGRAM}),
+    ])
+
+  def test_unknown_writes(self):
+    """Writes with unknown endpoints invalidate all neighbourhoods."""
+    relationship_cache.get_related([PROGRAM, AUDIT])
+    relationship_cache._pending.get().add(relationship_cache.GRAPH_STAMP)
+    relationship_cache._pending.bump(clear=True)
+    relationship_cache.get_related([PROGRAM, AUDIT])
+    self.assertEqual(self.query.call_args_list,
+                     [mock.call({PROGRAM, AUDIT})] * 2)
+    self.assertGreater(relationship_cache.get_stats()["stale"], 0)
@@ -263,3 +263,38 @@ class TestCheckPopulatedContent(unittest.TestCase):
     obj.__class__.__name__ = self.object_type
     revision = all_models.Revision(obj, mock.Mock(), mock.Mock(), content)
     self.assertEqual(expected_content, revision.populate_cavs())
+
+  def test_content_memoized(self):
+    """Test content is populated once until saved content is set."""
+    obj = mock.Mock()
+    obj.id = self.object_id
+    obj.__class__.__name__ = self.object_type
+    revision = all_models.Revision(obj, mock.Mock(), mock.Mock(),
+                                   {"title": "title 1"})
+
+    with mock.patch("ggrc.access_control.role.get_custom_roles_for",
+                    return_value={}) as get_roles:
+      self.assertEqual(revision.content["title"], "title 1")
+      self.assertIs(revision.content, revision.content)
+      get_roles.assert_called_once_with(self.object_type)
+
+      revision.content = {"title": "title 2"}
+      self.assertEqual(revision.content["title"], "title 2")
+      self.assertEqual(get_roles.call_count, 2)
+
+  def test_populate_contents(self):
+    """Test roles are resolved once per type for a list of revisions."""
+    revisions = []
+    for object_id in range(3):
+      obj = mock.Mock()
+      obj.id = object_id
+      obj.__class__.__name__ = self.object_type
+      revisions.append(all_models.Revision(obj, mock.Mock(), mock.Mock(),
+                                           {"id": object_id}))
+
+    with mock.patch("ggrc.access_control.role.get_custom_roles_for",
+                    return_value={}) as get_roles:
+      all_models.Revision.populate_contents(revisions)
+      self.assertEqual([revision.content["id"] for revision in revisions],
+                       [0, 1, 2])
+      get_roles.assert_called_once_with(self.object_type)
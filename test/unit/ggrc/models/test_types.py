@@ -0,0 +1,64 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unittests for custom ORM data types."""
+
+import json
+import unittest
+
+import ddt
+import mock
+
+from ggrc.models import types
+
+
+@ddt.ddt
+class TestCompressedJsonType(unittest.TestCase):
+  """Tests for stored formats of CompressedJsonType."""
+
+  CONTENT = {
+      "title": u"Control \u2013 1",
+      "custom_attributes": [{"id": 1, "attribute_value": "value"}],
+      "status": None,
+  }
+
+  def setUp(self):
+    super(TestCompressedJsonType, self).setUp()
+    self.type_ = types.CompressedJsonType("REVISION_CONTENT_COMPRESSION")
+
+  def _store(self, value, compression):
+    """Get value bound to the column with the given compression setting."""
+    with mock.patch("ggrc.settings.REVISION_CONTENT_COMPRESSION",
+                    compression):
+      return self.type_.process_bind_param(value, None)
+
+  @ddt.data("", "zlib")
+  def test_round_trip(self, compression):
+    """Stored value is read back."""
+    stored = self._store(self.CONTENT, compression)
+    tag = types.CompressedJsonType.COMPRESSED_TAG
+    self.assertEqual(stored.startswith(tag), bool(compression))
+    self.assertEqual(self.type_.process_result_value(stored, None),
+                     self.CONTENT)
+
+  def test_plain_json_read(self):
+    """Values stored by LongJsonType are read."""
+    stored = types.LongJsonType().process_bind_param(self.CONTENT, None)
+    self.assertEqual(self.type_.process_result_value(stored, None),
+                     self.CONTENT)
+
+  @ddt.data("", "zlib")
+  def test_projection(self, compression):
+    """Only requested keys are returned."""
+    stored = self._store(self.CONTENT, compression)
+    self.assertEqual(
+        types.CompressedJsonType.loads(stored, {"title", "missing"}),
+        {"title": self.CONTENT["title"]},
+    )
+
+  def test_projection_decodes_selected_values(self):
+    """Values of keys that are not requested are not parsed."""
+    stored = self._store(self.CONTENT, "zlib")
+    with mock.patch("json.loads", wraps=json.loads) as loads:
+      types.CompressedJsonType.loads(stored, {"status"})
+    self.assertEqual(loads.call_count, 2)
@@ -0,0 +1,91 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for /query object block executor."""
+
+import threading
+import unittest
+
+import flask
+import mock
+
+from ggrc.query import executor
+
+
+def _block(*previous):
+  """Make an object query block referencing given previous blocks."""
+  expression = {}
+  for index in previous:
+    relevant = {
+        "object_name": "__previous__",
+        "op": {"name": "relevant"},
+        "ids": [index],
+    }
+    if expression:
+      expression = {"left": expression, "op": {"name": "AND"},
+                    "right": relevant}
+    else:
+      expression = relevant
+  return {"object_name": "Control", "filters": {"expression": expression}}
+
+
+class TestExecutor(unittest.TestCase):
+  """Tests for dependency aware block evaluation."""
+
+  def test_dependencies(self):
+    """Nested __previous__ references are found."""
+    self.assertEqual(executor.get_dependencies(_block(0, 2)), {0, 2})
+    self.assertEqual(executor.get_dependencies(_block()), set())
+
+  def test_waves(self):
+    """Independent blocks are grouped together."""
+    query = [_block(), _block(), _block(0), _block(1, 2), _block()]
+    self.assertEqual(executor.get_waves(query), [[0, 1, 4], [2], [3]])
+
+  def test_forward_reference(self):
+    """Blocks referencing following blocks are evaluated sequentially."""
+    query = [_block(), _block(2), _block()]
+    self.assertEqual(executor.get_waves(query), [[0], [1], [2]])
+
+  def test_sequential(self):
+    """Blocks are evaluated in order when concurrency is disabled."""
+    query = [_block(), _block()]
+    run_block = mock.Mock()
+    executor.execute(query, run_block, max_workers=1)
+    self.assertEqual(run_block.call_args_list,
+                     [mock.call(query[0]), mock.call(query[1])])
+
+  @mock.patch("ggrc.query.executor.permissions")
+  def test_worker_context(self, _):
+    """Workers get their own g with a copy of the permissions."""
+    # pylint: disable=protected-access
+    app = flask.Flask(__name__)
+    seen = {}
+    lock = threading.Lock()
+
+    def run_block(block):
+      """Record the g of the worker and modify it."""
+      with lock:
+        seen[block["object_name"]] = (
+            id(flask.g),
+            hasattr(flask.g, "cache"),
+            set(flask.g._request_permissions["read"]),
+        )
+      flask.g._request_permissions["read"].add(block["object_name"])
+      flask.g.cache = block["object_name"]
+
+    with app.test_request_context():
+      flask.g._request_permissions = {"read": {"Control"}}
+      flask.g.cache = "parent"
+      query = [dict(_block(), object_name=name) for name in ("A", "B")]
+      executor.execute(query, run_block, max_workers=2)
+
+      self.assertEqual(flask.g._request_permissions, {"read": {"Control"}})
+      self.assertEqual(flask.g.cache, "parent")
+      parent_g = id(flask.g)
+
+    self.assertEqual(sorted(seen), ["A", "B"])
+    for g_id, has_cache, read in seen.values():
+      self.assertNotEqual(g_id, parent_g)
+      self.assertFalse(has_cache)
+      self.assertEqual(read, {"Control"})
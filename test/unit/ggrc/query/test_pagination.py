@@ -0,0 +1,63 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for keyset pagination helpers."""
+
+import datetime
+import unittest
+
+import sqlalchemy as sa
+
+from ggrc.query import pagination
+from ggrc.query.exceptions import BadQueryException
+
+
+class TestCursor(unittest.TestCase):
+  """Tests for continuation token encoding."""
+
+  ORDER_BY = [{"name": "title"}, {"name": "updated_at", "desc": True}]
+
+  def test_round_trip(self):
+    """Cursor values and total survive encoding."""
+    values = [u"Control 1", datetime.datetime(2018, 1, 2, 3, 4, 5, 6), 7]
+    token = pagination.encode_cursor(self.ORDER_BY, values, 100)
+    self.assertEqual(
+        pagination.decode_cursor(self.ORDER_BY, token),
+        (values, 100),
+    )
+
+  def test_date_and_null_values(self):
+    """Dates and NULLs are restored with their types."""
+    order_by = [{"name": "start_date"}, {"name": "due_on"}]
+    values = [datetime.date(2018, 5, 6), None, 1]
+    token = pagination.encode_cursor(order_by, values)
+    self.assertEqual(pagination.decode_cursor(order_by, token),
+                     (values, None))
+
+  def test_other_ordering(self):
+    """Cursor issued for another ordering is rejected."""
+    token = pagination.encode_cursor(self.ORDER_BY, [u"a", None, 1])
+    with self.assertRaises(BadQueryException):
+      pagination.decode_cursor([{"name": "title"}], token)
+
+  def test_garbage(self):
+    """Malformed cursor is rejected."""
+    with self.assertRaises(BadQueryException):
+      pagination.decode_cursor(self.ORDER_BY, "not a cursor")
+
+
+class TestSeekPredicate(unittest.TestCase):
+  """Tests for the seek predicate builder."""
+
+  def test_predicate(self):
+    """Predicate respects sort direction of every column."""
+    title, updated, id_ = sa.column("title"), sa.column("upd"), sa.column("id")
+    predicate = pagination.seek_predicate(
+        [(title, False), (updated, True), (id_, False)],
+        [u"a", 5, 7],
+    )
+    self.assertEqual(
+        str(predicate.compile(compile_kwargs={"literal_binds": True})),
+        "title > 'a' OR title = 'a' AND (upd < 5 OR upd IS NULL) OR "
+        "title = 'a' AND upd = 5 AND id > 7",
+    )
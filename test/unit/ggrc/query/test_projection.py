@@ -0,0 +1,40 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for "values" projection of /query API."""
+
+import datetime
+import unittest
+
+import mock
+
+from ggrc.query import projection
+
+
+class TestGetValues(unittest.TestCase):
+  """Tests for building values from selected rows."""
+
+  def setUp(self):
+    self.plan = mock.Mock(
+        getters=[("id", lambda row: row[0]), ("title", lambda row: row[2])],
+        last_modified_index=1,
+    )
+
+  @mock.patch("ggrc.query.projection.db")
+  def test_order_and_last_modified(self, db_mock):
+    """Values follow the order of ids and missing rows are skipped."""
+    rows = [
+        (1, datetime.datetime(2018, 1, 1), u"a"),
+        (3, datetime.datetime(2018, 3, 1), u"c"),
+    ]
+    db_mock.session.query.return_value.filter.return_value = rows
+    values, last_modified = projection.get_values(self.plan, [3, 2, 1])
+    self.assertEqual(values, [{"id": 3, "title": u"c"},
+                              {"id": 1, "title": u"a"}])
+    self.assertEqual(last_modified, datetime.datetime(2018, 3, 1))
+
+  @mock.patch("ggrc.query.projection.db")
+  def test_no_ids(self, db_mock):
+    """Nothing is selected for empty ids."""
+    self.assertEqual(projection.get_values(self.plan, []), ([], None))
+    self.assertFalse(db_mock.session.query.called)
@@ -0,0 +1,80 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for /query result cache helpers."""
+
+import unittest
+
+import ddt
+
+from ggrc.cache import backends
+from ggrc.query import result_cache
+
+
+@ddt.ddt
+class TestWrittenTables(unittest.TestCase):
+  """Tests for detection of tables written by SQL statements."""
+
+  @ddt.data(
+      ("SELECT controls.id FROM controls", set()),
+      ("INSERT INTO controls (title) VALUES (%s)", {"controls"}),
+      ("INSERT IGNORE INTO `relationships` (id) VALUES (1)",
+       {"relationships"}),
+      ("UPDATE controls SET title=%s WHERE controls.id = %s", {"controls"}),
+      ("DELETE FROM fulltext_record_properties WHERE key = 1",
+       {"fulltext_record_properties"}),
+      ("UPDATE controls JOIN audits ON 1 SET audits.title = ''",
+       {result_cache.UNKNOWN_TABLE}),
+      ("DELETE r FROM relationships r JOIN snapshots",
+       {result_cache.UNKNOWN_TABLE}),
+      ("ALTER TABLE controls ADD COLUMN x INT", {result_cache.UNKNOWN_TABLE}),
+  )
+  @ddt.unpack
+  def test_written_tables(self, statement, tables):
+    """Tables written by {0}"""
+    self.assertEqual(result_cache.get_written_tables(statement), tables)
+
+
+class TestLocalStamps(unittest.TestCase):
+  """Tests for bounded change stamps."""
+
+  def test_forgotten_stamps_change(self):
+    """Stamps of forgotten names don't return to old values."""
+    stamps = result_cache.LocalStamps(2)
+    old = stamps.get(["a", "b", "c"])
+    stamps.bump(["a"])
+    stamps.bump(["b", "c"])
+    new = stamps.get(["a", "b", "c"])
+    self.assertTrue(all(old_stamp != new_stamp
+                        for old_stamp, new_stamp in zip(old, new)))
+
+
+class TestMemcacheStamps(unittest.TestCase):
+  """Tests for change stamps kept in memcache."""
+
+  def setUp(self):
+    super(TestMemcacheStamps, self).setUp()
+    self.client = backends.LocalClient(10)
+    self.stamps = result_cache.MemcacheStamps(self.client)
+
+  def test_stored(self):
+    """Stamps are stored on first read and change when bumped."""
+    old = self.stamps.get(["a", "b"])
+    self.assertEqual(self.stamps.get(["a", "b"]), old)
+    self.stamps.bump(["a"])
+    new = self.stamps.get(["a", "b"])
+    self.assertNotEqual(new[0], old[0])
+    self.assertEqual(new[1], old[1])
+
+  def test_evicted_stamps_change(self):
+    """Stamps of evicted keys don't return to old values."""
+    old = self.stamps.get(["a"])
+    self.client.delete(result_cache.STAMP_KEY_PREFIX + "a")
+    self.assertNotEqual(self.stamps.get(["a"]), old)
+
+  def test_bump_missing(self):
+    """Bumped missing stamps don't match stamps read before eviction."""
+    old = self.stamps.get(["a"])
+    self.client.flush_all()
+    self.stamps.bump(["a"])
+    self.assertNotEqual(self.stamps.get(["a"]), old)
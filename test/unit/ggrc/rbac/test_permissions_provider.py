@@ -0,0 +1,123 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for permission checks with compiled permissions."""
+
+import logging
+import pickle
+import timeit
+import unittest
+
+import mock
+
+from ggrc.rbac import permissions_provider
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Permissions(permissions_provider.DefaultUserPermissions):
+  """User permissions with a fixed permissions dict."""
+
+  def __init__(self, permissions):
+    self.permissions = permissions
+
+  def _permissions(self):
+    return self.permissions
+
+
+class TestCompiledPermissions(unittest.TestCase):
+  """Tests for permission checks using the compiled index."""
+
+  CONTEXTS_COUNT = 1000
+  RESOURCES_COUNT = 5000
+
+  def setUp(self):
+    super(TestCompiledPermissions, self).setUp()
+    self.raw_permissions = {
+        "read": {
+            "Control": {
+                "contexts": range(1, self.CONTEXTS_COUNT + 1),
+                "resources": range(1, self.RESOURCES_COUNT + 1),
+            },
+            "Person": {"contexts": [None]},
+        },
+        "update": {
+            "Control": {
+                "contexts": [None],
+                "conditions": {None: [{
+                    "condition": "forbid",
+                    "terms": {"blacklist": {"update": ["Control"]}},
+                }]},
+            },
+        },
+        "__GGRC_ADMIN__": {"__GGRC_ALL__": {"contexts": [7]}},
+    }
+    self.permissions = _Permissions(
+        permissions_provider.CompiledPermissions(self.raw_permissions))
+
+  def test_is_allowed(self):
+    """Contexts, resources and admin contexts grant permissions."""
+    check = self.permissions.is_allowed_read
+    self.assertTrue(check("Control", None, 1))
+    self.assertTrue(check("Control", 1, 0))
+    self.assertFalse(check("Control", self.RESOURCES_COUNT + 1, 0))
+    self.assertTrue(check("Person", 12, 12))
+    self.assertTrue(check("Market", 1, 7))
+    self.assertFalse(check("Market", 1, 8))
+
+  def test_is_allowed_for_conditions(self):
+    """Compiled conditions are checked for instances."""
+    instance = mock.Mock(id=1, type="Control", context=None)
+    instance._inflector.model_singular = "Control"
+    self.assertFalse(self.permissions.is_allowed_update_for(instance))
+    instance.type = "Market"
+    self.assertTrue(self.permissions.is_allowed_update_for(instance))
+
+  def test_contexts_and_resources_for(self):
+    """Contexts include admin contexts and None grants all contexts."""
+    self.assertEqual(sorted(self.permissions.read_contexts_for("Control")),
+                     sorted(range(1, self.CONTEXTS_COUNT + 1) + [7]))
+    self.assertEqual(self.permissions.read_contexts_for("Person"), None)
+    self.assertEqual(self.permissions.read_resources_for("Market"), [])
+
+  def test_plain_dict(self):
+    """Plain permissions dicts get the same results."""
+    permissions = _Permissions(self.raw_permissions)
+    self.assertTrue(permissions.is_allowed_read("Control", 1, 0))
+    self.assertFalse(permissions.is_allowed_read("Market", 1, 8))
+
+  def test_pickle(self):
+    """Compiled permissions are stored in the cache with the index."""
+    compiled = self.permissions.permissions
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+      loaded = pickle.loads(pickle.dumps(compiled, protocol))
+      self.assertEqual(loaded, self.raw_permissions)
+      self.assertEqual(loaded.index, compiled.index)
+
+  def test_filter_allowed_update(self):
+    """Batched update checks match checks of single resources."""
+    self.raw_permissions["update"]["Market"] = {"resources": [1, 3]}
+    permissions = _Permissions(
+        permissions_provider.CompiledPermissions(self.raw_permissions))
+    ids = range(1, 6)
+    for resource_type, context_id in [("Control", 1), ("Market", 1),
+                                      ("Market", 7), ("Person", None)]:
+      self.assertEqual(
+          permissions.filter_allowed_update(resource_type, ids, context_id),
+          {id_ for id_ in ids
+           if permissions.is_allowed_update(resource_type, id_, context_id)},
+      )
+
+  def test_filter_benchmark(self):
+    """Benchmark read checks of 10k resources."""
+    resources = [("Control", index, index % (2 * self.CONTEXTS_COUNT))
+                 for index in range(2 * self.RESOURCES_COUNT)]
+
+    def filter_resources():
+      return [resource for resource in resources
+              if self.permissions.is_allowed_read(*resource)]
+
+    self.assertEqual(len(filter_resources()), 7000)
+    duration = min(timeit.repeat(filter_resources, number=1, repeat=3))
+    logger.info("Checked %s resources in %.3fs", len(resources), duration)
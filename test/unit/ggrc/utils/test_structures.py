@@ -93,3 +93,38 @@ class TestCaseInsensitiveDefDict(unittest.TestCase):
         sorted(self.ci_dict.lower_items()),
         sorted([("hello", "World"), ("foo", "BAR")])
     )
+
+
+class TestLRUCache(unittest.TestCase):
+  """Tests for bounded LRU cache."""
+
+  def setUp(self):
+    self.now = 0
+    self.cache = structures.LRUCache(2, ttl=10, clock=lambda: self.now)
+
+  def test_eviction(self):
+    """Least recently used entry is evicted first."""
+    self.cache.set("a", 1)
+    self.cache.set("b", 2)
+    self.assertEqual(self.cache.get("a"), 1)
+    self.cache.set("c", 3)
+    self.assertNotIn("b", self.cache)
+    self.assertEqual(self.cache.get("a"), 1)
+    self.assertEqual(self.cache.get("c"), 3)
+    self.assertEqual(self.cache.stats()["evictions"], 1)
+
+  def test_expiration(self):
+    """Expired entries are not returned."""
+    self.cache.set("a", 1)
+    self.cache.set("b", 2, ttl=20)
+    self.now = 15
+    self.assertIsNone(self.cache.get("a"))
+    self.assertEqual(self.cache.get("b"), 2)
+
+  def test_counters(self):
+    """Hits and misses are counted."""
+    self.cache.set("a", None)
+    self.assertIsNone(self.cache.get("a", "default"))
+    self.assertEqual(self.cache.get("b", "default"), "default")
+    self.assertEqual(self.cache.stats(),
+                     {"hits": 1, "misses": 1, "evictions": 0, "size": 1})